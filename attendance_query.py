@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# attendance_query.py — bitmap index over attendance records for filtered queries
+#
+# For every employee and year the index keeps one bitmap (a Python int, bit d =
+# day-of-year offset d) per observaciones category. Month, quarter and weekday
+# filters are global per-year masks, so "Tarde in marzo" for one employee is a
+# single `cats["Tarde"] & months_mask` plus a popcount, and a query over the
+# whole staff is one of those per employee instead of a walk over every record.
+#
+# The index persists to public/attendance_index.json and is refreshed
+# incrementally (per-employee hash, as attendance_summary.py does) whenever
+# randomize_attendace.py rewrites the store, or by `build`. Queries never write:
+# employees changed since the last build are re-indexed in memory only.
+#
+#   python attendance_query.py build
+#   python attendance_query.py count --cat Tarde --months marzo --min 4
+#   python attendance_query.py list  --cat "Ausencia Injustificada" --months Q2
+#   python attendance_query.py top   --cat Tarde -n 5 [--weekdays lunes viernes]
+
+import argparse, json, os, sys
+from datetime import date, timedelta
+
+import attendance_store
+import attendance_summary
+import data_access
+from textnorm import fold
+
+INDEX_PATH = attendance_store.ROOT / "public" / "attendance_index.json"
+VERSION = 1
+YEAR = "2025"   # default year for queries, as YEAR_KEY in randomize_attendace.py
+
+WEEKDAYS_ES = ["lunes", "martes", "miercoles", "jueves", "viernes", "sabado", "domingo"]
+QUARTERS = {"q1": (1, 2, 3), "q2": (4, 5, 6), "q3": (7, 8, 9), "q4": (10, 11, 12)}
+
+# ---------- calendar masks ----------
+
+_MASKS = {}
+
+def year_masks(year: int):
+    """(month → mask, weekday → mask, all-days mask) over day-of-year offsets, cached per year."""
+    masks = _MASKS.get(year)
+    if masks is None:
+        months, weekdays = [0] * 13, [0] * 7
+        d, off = date(year, 1, 1), 0
+        while d.year == year:
+            months[d.month] |= 1 << off
+            weekdays[d.weekday()] |= 1 << off
+            d += timedelta(days=1)
+            off += 1
+        masks = _MASKS[year] = (months, weekdays, (1 << off) - 1)
+    return masks
+
+def parse_months(tokens):
+    # ["marzo", "Q2", "11"] → {3, 4, 5, 6, 11}
+    months = set()
+    for tok in tokens or ():
+        key = fold(str(tok)).strip()
+        if key in QUARTERS:
+            months.update(QUARTERS[key])
+        elif key.isdigit() and 1 <= int(key) <= 12:
+            months.add(int(key))
+        elif key in attendance_store.MONTHS_ES:
+            months.add(attendance_store.MONTHS_ES[key])
+        else:
+            raise ValueError(f"Mes no reconocido: {tok}")
+    return months
+
+def parse_weekdays(tokens):
+    days = set()
+    for tok in tokens or ():
+        key = fold(str(tok)).strip()
+        if key.isdigit() and 0 <= int(key) <= 6:
+            days.add(int(key))
+        elif key in WEEKDAYS_ES:
+            days.add(WEEKDAYS_ES.index(key))
+        else:
+            raise ValueError(f"Día de la semana no reconocido: {tok}")
+    return days
+
+# ---------- building ----------
+
+def index_employee(entry, values) -> dict:
+    # {year: {"cats": {category: bitmap}, "extras": [[offset, category], ...]}}.
+    # "extras" holds records a bitmap cannot: a second record on the same day,
+    # or verbatim records (those are placed by their own day/month fields).
+    years = {}
+    for year_key, block in entry.get("years", {}).items():
+        if "verbatim" in block:
+            continue
+        year = int(year_key)
+        jan1 = date(year, 1, 1).toordinal()
+        days, obs = attendance_store.unpack(block["day"]), attendance_store.unpack(block["obs"])
+        raw = block.get("raw", {})
+        cats, extras, seen = {}, [], 0
+        pos = 0
+        for month_name, count in block["months"]:
+            month_num = attendance_store.MONTHS_ES.get(month_name.lower())
+            for i in range(pos, pos + count):
+                if raw and str(i) in raw:
+                    rec = raw[str(i)]
+                    try:
+                        off = date(year, month_num, int(rec["day"])).toordinal() - jan1
+                        label = rec.get("observaciones")
+                    except (TypeError, ValueError, KeyError, AttributeError):
+                        continue
+                    extras.append([off, label])
+                    continue
+                off, label = days[i], values[obs[i]]
+                bit = 1 << off
+                if seen & bit:
+                    extras.append([off, label])
+                    continue
+                seen |= bit
+                cats[label] = cats.get(label, 0) | bit
+            pos += count
+        years[year_key] = {"cats": cats, "extras": extras}
+    return years
+
+class AttendanceIndex:
+    """Per employee/year category bitmaps plus the queries over them."""
+
+    def __init__(self, employees=None):
+        # emp → {"hash": str, "years": {year: {"cats": {cat: int}, "extras": [...]}}}
+        self.employees = employees or {}
+        self._columns = {}
+
+    # --- persistence ---
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        if raw.get("version") != VERSION:
+            return cls()
+        employees = {}
+        for emp, entry in raw["employees"].items():
+            years = {y: {"cats": {c: int(h, 16) for c, h in blk["cats"]}, "extras": blk["extras"]}
+                     for y, blk in entry["years"].items()}
+            employees[emp] = {"hash": entry["hash"], "years": years}
+        return cls(employees)
+
+    def save(self, path=INDEX_PATH):
+        # Categories as [name, hex] pairs: a null observaciones is a valid category
+        out = {emp: {"hash": e["hash"],
+                     "years": {y: {"cats": [[c, format(b, "x")] for c, b in blk["cats"].items()],
+                                   "extras": blk["extras"]}
+                               for y, blk in e["years"].items()}}
+               for emp, e in self.employees.items()}
+        attendance_store.write_json(path, {"version": VERSION, "employees": out})
+
+    def update(self, store):
+        """Re-indexes employees whose records changed. Returns (reindexed, reused, removed)."""
+        values = store["values"]
+        employees, reindexed, reused = {}, 0, 0
+        for emp, entry in store["employees"].items():
+            digest = attendance_summary.employee_hash(entry, values)
+            old = self.employees.get(emp)
+            if old and old["hash"] == digest:
+                employees[emp] = old
+                reused += 1
+            else:
+                employees[emp] = {"hash": digest, "years": index_employee(entry, values)}
+                reindexed += 1
+        removed = len(set(self.employees) - set(employees))
+        self.employees = employees
+        self._columns = {}
+        return reindexed, reused, removed
+
+    # --- queries ---
+
+    def categories(self):
+        cats = set()
+        for e in self.employees.values():
+            for blk in e["years"].values():
+                cats.update(blk["cats"])
+                cats.update(label for _, label in blk["extras"])
+        return sorted(cats, key=lambda c: (c is None, str(c)))
+
+    def resolve_category(self, name):
+        # Exact, then accent/case-insensitive match against the indexed categories
+        cats = self.categories()
+        if name in cats:
+            return name
+        matches = [c for c in cats if c is not None and fold(c) == fold(name)]
+        if len(matches) == 1:
+            return matches[0]
+        raise ValueError(f"Categoría no encontrada: {name} (disponibles: {', '.join(map(str, cats))})")
+
+    def _mask(self, year, months, weekdays):
+        month_masks, weekday_masks, everything = year_masks(year)
+        mask = everything
+        if months:
+            mask &= sum(month_masks[m] for m in months)
+        if weekdays:
+            mask &= sum(weekday_masks[d] for d in weekdays)
+        return mask
+
+    def _column(self, year, category):
+        # (employees, bitmaps, {employee: extra offsets}) for one year/category,
+        # built on first use so staff-wide queries are a tight loop over ints
+        key = (year, category)
+        col = self._columns.get(key)
+        if col is None:
+            emps, bitmaps, extras = [], [], {}
+            for emp, e in self.employees.items():
+                blk = e["years"].get(year)
+                if blk is None:
+                    continue
+                emps.append(emp)
+                bitmaps.append(blk["cats"].get(category, 0))
+                offs = [off for off, label in blk["extras"] if label == category]
+                if offs:
+                    extras[emp] = offs
+            col = self._columns[key] = (emps, bitmaps, extras)
+        return col
+
+    def counts(self, category, year=YEAR, months=None, weekdays=None, employees=None):
+        """{employee: number of `category` records} for the filters (employees without any → 0)."""
+        year = str(year)
+        mask = self._mask(int(year), months, weekdays)
+        emps, bitmaps, extras = self._column(year, category)
+        out = dict(zip(emps, [(b & mask).bit_count() for b in bitmaps]))
+        for emp, offs in extras.items():
+            out[emp] += sum(1 for off in offs if mask >> off & 1)
+        if employees is not None:
+            out = {emp: out[emp] for emp in employees if emp in out}
+        return out
+
+    def matching(self, category, min_count=1, **filters):
+        """Employees with at least `min_count` records of `category`, most first."""
+        return sorted(((e, n) for e, n in self.counts(category, **filters).items() if n >= min_count),
+                      key=lambda item: (-item[1], item[0]))
+
+    def top(self, category, n=10, **filters):
+        return self.matching(category, 1, **filters)[:n]
+
+    def records(self, category, year=YEAR, months=None, weekdays=None, employees=None):
+        """[(employee, date), ...] of every `category` record, by employee then date."""
+        year = str(year)
+        mask = self._mask(int(year), months, weekdays)
+        jan1 = date(int(year), 1, 1)
+        out = []
+        for emp in (employees if employees is not None else self.employees):
+            blk = self.employees.get(emp, {}).get("years", {}).get(year)
+            if blk is None:
+                continue
+            bits = blk["cats"].get(category, 0) & mask
+            offs = []
+            while bits:
+                low = bits & -bits
+                offs.append(low.bit_length() - 1)
+                bits ^= low
+            offs += [off for off, label in blk["extras"] if label == category and mask >> off & 1]
+            out.extend((emp, jan1 + timedelta(days=off)) for off in sorted(offs))
+        return out
+
+def current(store, path=INDEX_PATH):
+    """The persisted index with changed employees re-indexed in memory; writes nothing.
+    Returns (index, (reindexed, reused, removed), whether the file is out of date)."""
+    index = AttendanceIndex.load(path)
+    previous_order = list(index.employees)
+    reindexed, reused, removed = index.update(store)
+    stale = bool(reindexed or removed) or previous_order != list(index.employees) or not os.path.exists(path)
+    return index, (reindexed, reused, removed), stale
+
+def refresh(store, path=INDEX_PATH):
+    """current() + saving the index if it was out of date."""
+    index, stats, stale = current(store, path)
+    if stale:
+        index.save(path)
+    return index, stats
+
+# ---------- CLI ----------
+
+def _load_store(path):
+    return data_access.load_attendance_store(path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consultas sobre la asistencia (índice de bitmaps).")
+    parser.add_argument("--store", default=str(attendance_store.STORE_PATH))
+    parser.add_argument("--index", default=str(INDEX_PATH))
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("build", help="Crea o actualiza el índice (las consultas no lo escriben)")
+    for name, help_text in (("count", "Empleados con al menos --min registros de la categoría"),
+                            ("list", "Cada registro de la categoría"),
+                            ("top", "Ranking de empleados por número de registros")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--cat", required=True, help='Valor de observaciones, p. ej. "Tarde"')
+        p.add_argument("--year", default=YEAR)
+        p.add_argument("--months", nargs="+", help="Meses (marzo, 3) o trimestres (Q2)")
+        p.add_argument("--weekdays", nargs="+", help="Días de la semana (lunes ... domingo)")
+        p.add_argument("--employee", nargs="+", help="Limitar a estos empleados")
+        if name == "count":
+            p.add_argument("--min", type=int, default=1)
+        if name == "top":
+            p.add_argument("-n", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "build":
+        _, (reindexed, reused, removed) = refresh(_load_store(args.store), args.index)
+        print(f"🗂️ Índice de asistencia: {reindexed} reindexados, {reused} sin cambios, {removed} eliminados → {args.index}")
+        return
+    index, (reindexed, _, removed), stale = current(_load_store(args.store), args.index)
+    if stale:
+        print(f"ℹ️ Índice desactualizado ({reindexed} reindexados y {removed} eliminados sólo en memoria); "
+              f"'attendance_query.py build' lo guarda", file=sys.stderr)
+    try:
+        category = index.resolve_category(args.cat)
+        filters = {"year": args.year, "months": parse_months(args.months),
+                   "weekdays": parse_weekdays(args.weekdays), "employees": args.employee}
+    except ValueError as exc:
+        sys.exit(f"❌ {exc}")
+
+    if args.cmd == "count":
+        rows = index.matching(category, args.min, **filters)
+        print(f"{len(rows)} empleado(s) con ≥{args.min} × {category}")
+        for emp, n in rows:
+            print(f"  {n:>4}  {emp}")
+    elif args.cmd == "top":
+        for rank, (emp, n) in enumerate(index.top(category, args.n, **filters), 1):
+            print(f"{rank:>3}. {n:>4}  {emp}")
+    else:
+        rows = index.records(category, **filters)
+        for emp, day in rows:
+            print(f"{day.isoformat()}  {emp}")
+        print(f"{len(rows)} registro(s) de {category}")
+
+if __name__ == "__main__":
+    main()
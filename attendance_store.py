@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# attendance_store.py — compact columnar form of attendance_2025.json
+#
+# The nested file (employee → year → Spanish month → [per-day dicts]) repeats
+# every key and a full ISO timestamp per record. The columnar store keeps, per
+# employee and year, one int16 column per field (base64 of the little-endian
+# bytes, so a load parses a handful of strings instead of thousands of objects):
+#
+#   day   day-of-year offset (0 = 1 January)
+#   in    hora_entrada as minutes since midnight (-1 = null)
+#   out   hora_salida  as minutes since midnight (-1 = null)
+#   obs   index into the shared "values" dictionary (observaciones)
+#   expl  index into the shared "values" dictionary (explicacion)
+#
+# plus "months": [[month_name, n_records], ...] to rebuild the month lists in
+# their original order. A record that does not fit the encoding (extra keys,
+# seconds, a timestamp on another day, ...) is kept verbatim in "raw" under its
+# position, and a block that is not shaped like the above at all is kept as
+# {"verbatim": ...}, so decode(encode(x)) == x for any input.
+#
+#   python attendance_store.py encode [attendance_2025.json] [attendance_2025.cols.json]
+#   python attendance_store.py decode [attendance_2025.cols.json] [attendance_2025.json]
+
+import base64, os, sys
+from array import array
+from datetime import date
+from pathlib import Path
+
+import jsonio
+
+ROOT = Path(__file__).resolve().parent
+JSON_PATH = ROOT / "public" / "attendance_2025.json"
+STORE_PATH = ROOT / "public" / "attendance_2025.cols.json"
+
+FORMAT = "attendance-columnar"
+VERSION = 1
+
+# Month name → number (the nested JSON is keyed in Spanish)
+MONTHS_ES = {
+    "enero": 1,
+    "febrero": 2,
+    "marzo": 3,
+    "abril": 4,
+    "mayo": 5,
+    "junio": 6,
+    "julio": 7,
+    "agosto": 8,
+    "septiembre": 9,
+    "octubre": 10,
+    "noviembre": 11,
+    "diciembre": 12,
+}
+
+RECORD_KEYS = ("day", "hora_entrada", "hora_salida", "observaciones", "explicacion")
+COLUMNS = ("day", "in", "out", "obs", "expl")
+NULL = -1
+TYPECODE = "h"   # int16: days ≤ 365, minutes < 1440, ≤ 32767 distinct values
+
+# ---------- columns ----------
+
+def pack(values) -> str:
+    col = array(TYPECODE, values)
+    if sys.byteorder == "big":
+        col.byteswap()
+    return base64.b64encode(col.tobytes()).decode("ascii")
+
+def unpack(packed) -> array:
+    if not isinstance(packed, str):
+        return packed  # already unpacked by load()
+    col = array(TYPECODE)
+    col.frombytes(base64.b64decode(packed))
+    if sys.byteorder == "big":
+        col.byteswap()
+    return col
+
+def unpack_block(block):
+    # In place: packed column strings → array('h'); verbatim blocks untouched
+    if "verbatim" not in block:
+        for name in COLUMNS:
+            block[name] = unpack(block[name])
+    return block
+
+def pack_block(block):
+    # Inverse of unpack_block(), before writing a loaded store back
+    if "verbatim" not in block:
+        for name in COLUMNS:
+            if not isinstance(block[name], str):
+                block[name] = pack(block[name])
+    return block
+
+# ---------- encode ----------
+
+class _Values:
+    # Dictionary encoding shared by observaciones and explicacion (str or null)
+    def __init__(self):
+        self.values = []
+        self._index = {}
+
+    def code(self, value):
+        if value is not None and type(value) is not str:
+            raise ValueError(value)
+        idx = self._index.get(value)
+        if idx is None:
+            if len(self.values) > 32767:
+                raise ValueError(value)
+            idx = self._index[value] = len(self.values)
+            self.values.append(value)
+        return idx
+
+def _minutes(value, prefix):
+    # "2025-01-03T09:20:00" on the record's own date → 560
+    if value is None:
+        return NULL
+    if type(value) is not str or not value.startswith(prefix):
+        raise ValueError(value)
+    hhmmss = value[len(prefix):]
+    if len(hhmmss) != 8 or hhmmss[2] != ":" or hhmmss[5:] != ":00" \
+            or not (hhmmss[:2].isdigit() and hhmmss[3:5].isdigit()):
+        raise ValueError(value)
+    h, m = int(hhmmss[:2]), int(hhmmss[3:5])
+    if h > 23 or m > 59:
+        raise ValueError(value)
+    return h * 60 + m
+
+def _encode_year(year_key, months, values: _Values):
+    year = int(year_key)  # ValueError → verbatim block
+    if str(year) != year_key or not isinstance(months, dict):
+        raise ValueError(year_key)
+    jan1 = date(year, 1, 1).toordinal()
+    cols = {name: [] for name in COLUMNS}
+    layout, raw = [], {}
+    pos = 0
+    for month_name, records in months.items():
+        if not isinstance(records, list):
+            raise ValueError(month_name)
+        layout.append([month_name, len(records)])
+        month_num = MONTHS_ES.get(month_name.lower())
+        for rec in records:
+            try:
+                if month_num is None or not isinstance(rec, dict) or tuple(rec) != RECORD_KEYS \
+                        or type(rec["day"]) is not int:
+                    raise ValueError(rec)
+                d = date(year, month_num, rec["day"])
+                prefix = d.isoformat() + "T"
+                row = (d.toordinal() - jan1, _minutes(rec["hora_entrada"], prefix),
+                       _minutes(rec["hora_salida"], prefix),
+                       values.code(rec["observaciones"]), values.code(rec["explicacion"]))
+            except (ValueError, TypeError):
+                raw[str(pos)] = rec
+                row = (NULL,) * len(COLUMNS)
+            for name, v in zip(COLUMNS, row):
+                cols[name].append(v)
+            pos += 1
+    block = {"months": layout, **{name: pack(col) for name, col in cols.items()}}
+    if raw:
+        block["raw"] = raw
+    return block
+
+def _encode_employee(years, values: _Values):
+    if not isinstance(years, dict):
+        return {"verbatim": years}
+    out = {}
+    for year_key, months in years.items():
+        try:
+            out[year_key] = _encode_year(year_key, months, values)
+        except (ValueError, TypeError):
+            out[year_key] = {"verbatim": months}
+    return {"years": out}
+
+def encode(data: dict) -> dict:
+    if not isinstance(data, dict):
+        raise ValueError("attendance JSON must be an object keyed by employee")
+    values = _Values()
+    employees = {emp: _encode_employee(years, values) for emp, years in data.items()}
+    return {"format": FORMAT, "version": VERSION, "values": values.values, "employees": employees}
+
+class StoreWriter:
+    """encode() for data that arrives one employee at a time.
+
+    Employees are encoded and written as they come; the shared value dictionary
+    goes last, once it is complete. Same temp file + finish()/commit()/abort()
+    contract as jsonio.ObjectWriter.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self.count = 0
+        self._values = _Values()
+        self._f = open(self.tmp_path, "w", encoding="utf-8")
+        self._f.write(f'{{"format":"{FORMAT}","version":{VERSION},"employees":{{')
+
+    def write(self, emp, years):
+        entry = _encode_employee(years, self._values)
+        self._f.write(("" if self.count == 0 else ",") + jsonio.dumps(emp, True).decode("utf-8") + ":"
+                      + jsonio.dumps(entry, True).decode("utf-8"))
+        self.count += 1
+
+    def finish(self):
+        self._f.write('},"values":' + jsonio.dumps(self._values.values, True).decode("utf-8") + "}")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+
+    def commit(self):
+        self.finish()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self._f.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+def store_path_for(json_path) -> Path:
+    # attendance_2024.json → attendance_2024.cols.json
+    json_path = Path(json_path)
+    return json_path.with_name(json_path.stem + ".cols.json")
+
+# ---------- decode ----------
+
+def is_store(obj) -> bool:
+    return isinstance(obj, dict) and obj.get("format") == FORMAT
+
+def _hhmm(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}:00"
+
+def decode_year(year_key, block, values):
+    if "verbatim" in block:
+        return block["verbatim"]
+    year = int(year_key)
+    jan1 = date(year, 1, 1).toordinal()
+    raw = block.get("raw", {})
+    days, ins, outs, obs, expl = (unpack(block[name]) for name in COLUMNS)
+    iso_days = {}
+    months, pos = {}, 0
+    for month_name, count in block["months"]:
+        records = months[month_name] = []
+        for i in range(pos, pos + count):
+            if raw and str(i) in raw:
+                rec = raw[str(i)]
+            else:
+                off = days[i]
+                prefix = iso_days.get(off)
+                if prefix is None:
+                    d = date.fromordinal(jan1 + off)
+                    prefix = iso_days[off] = (d.day, d.isoformat() + "T")
+                rec = {
+                    "day": prefix[0],
+                    "hora_entrada": None if ins[i] == NULL else prefix[1] + _hhmm(ins[i]),
+                    "hora_salida": None if outs[i] == NULL else prefix[1] + _hhmm(outs[i]),
+                    "observaciones": values[obs[i]],
+                    "explicacion": values[expl[i]],
+                }
+            records.append(rec)
+        pos += count
+    return months
+
+def decode(store: dict) -> dict:
+    if not is_store(store) or store.get("version") != VERSION:
+        raise ValueError("not an attendance columnar store (or unsupported version)")
+    values = store["values"]
+    data = {}
+    for emp, entry in store["employees"].items():
+        if "verbatim" in entry:
+            data[emp] = entry["verbatim"]
+            continue
+        data[emp] = {year_key: decode_year(year_key, block, values)
+                     for year_key, block in entry["years"].items()}
+    return data
+
+# ---------- files ----------
+
+def write_json(path: Path, obj, compact=True):
+    # Stores are always compact; the nested JSON passes compact=None (jsonio's switch)
+    jsonio.write_json(path, obj, compact)
+
+def load(path=STORE_PATH) -> dict:
+    """The columnar store with every column unpacked to array('h') (no per-record dicts)."""
+    store = jsonio.load(path)
+    if not is_store(store) or store.get("version") != VERSION:
+        raise ValueError(f"{path} no es un almacén columnar de asistencia")
+    for entry in store["employees"].values():
+        for block in entry.get("years", {}).values():
+            unpack_block(block)
+    return store
+
+def load_nested(path=JSON_PATH) -> dict:
+    """Attendance in the nested attendance_2025.json shape, from either format."""
+    obj = jsonio.load(path)
+    return decode(obj) if is_store(obj) else obj
+
+def save(data: dict, json_path=JSON_PATH, store_path=STORE_PATH):
+    """Writes the nested JSON (as before) and keeps the columnar store next to it in sync.
+    Returns the encoded store."""
+    if json_path:
+        write_json(json_path, data, compact=None)
+    store = encode(data)
+    if store_path:
+        write_json(store_path, store)
+    return store
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in ("encode", "decode"):
+        sys.exit("Uso: python attendance_store.py encode|decode [entrada] [salida]")
+    cmd, paths = argv[0], argv[1:]
+    if cmd == "encode":
+        src, dst = (list(map(Path, paths)) + [JSON_PATH, STORE_PATH][len(paths):])[:2]
+        data = load_nested(src)
+        store = encode(data)
+        if decode(store) != data:
+            sys.exit("❌ La conversión no es reversible; no se escribe nada.")
+        write_json(dst, store)
+    else:
+        src, dst = (list(map(Path, paths)) + [STORE_PATH, JSON_PATH][len(paths):])[:2]
+        write_json(dst, load_nested(src), compact=None)
+    print(f"✅ {src.name} ({src.stat().st_size:,} B) → {dst.name} ({dst.stat().st_size:,} B)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# attendance_summary.py — per employee/month attendance aggregates for the dashboards
+#
+# Reads the columnar attendance store (attendance_store.py) and writes a small
+# summary keyed by employee → year → month:
+#
+#   records       day records in the month
+#   worked_days   records with time worked > 0
+#   minutes       total minutes worked (salida - entrada, 0 if missing/negative)
+#   avg_minutes   minutes / worked_days, one decimal
+#   hours         sum of per-record hours rounded to 2 decimals, i.e. exactly
+#                 what Asistencia/MyProfile add up client-side
+#   observaciones counts per observaciones value
+#
+# Each employee carries a hash of its records; on the next run only employees
+# whose hash changed are recomputed, and the file is not rewritten at all when
+# nothing changed.
+#
+#   python attendance_summary.py [--store public/attendance_2025.cols.json] [--out public/attendance_summary.json]
+
+import argparse, hashlib, json, re
+from pathlib import Path
+
+import attendance_store
+import data_access
+
+SUMMARY_PATH = attendance_store.ROOT / "public" / "attendance_summary.json"
+VERSION = 1
+
+_HHMM = re.compile(r"(?:T|^)(\d{1,2}):(\d{2})")
+
+def _minutes_of(value):
+    # Raw (verbatim) records: same HH:MM reading the views do
+    if not isinstance(value, str):
+        return None
+    m = _HHMM.search(value)
+    return int(m.group(1)) * 60 + int(m.group(2)) if m else None
+
+def _worked(start, end):
+    if start is None or end is None or start == attendance_store.NULL or end == attendance_store.NULL:
+        return 0
+    return max(end - start, 0)
+
+def employee_hash(entry, values) -> str:
+    # Over what the records mean, not over dictionary codes, which can be
+    # renumbered from one encode() to the next
+    h = hashlib.sha256()
+    h.update(str(VERSION).encode())
+    if "verbatim" in entry:
+        h.update(json.dumps(entry["verbatim"], ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        return h.hexdigest()[:16]
+    for year_key, block in entry["years"].items():
+        h.update(json.dumps(year_key).encode("utf-8"))
+        if "verbatim" in block:
+            h.update(json.dumps(block["verbatim"], ensure_ascii=False, sort_keys=True).encode("utf-8"))
+            continue
+        h.update(json.dumps(block["months"], ensure_ascii=False).encode("utf-8"))
+        for name in ("day", "in", "out"):
+            col = block[name]
+            h.update(col.encode("ascii") if isinstance(col, str) else attendance_store.pack(col).encode("ascii"))
+        for name in ("obs", "expl"):
+            col = attendance_store.unpack(block[name])
+            h.update(json.dumps([values[i] if i != attendance_store.NULL else None for i in col],
+                                ensure_ascii=False).encode("utf-8"))
+        h.update(json.dumps(block.get("raw", {}), ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+def _month_summary():
+    return {"records": 0, "worked_days": 0, "minutes": 0, "avg_minutes": 0, "hours": 0, "observaciones": {}}
+
+def _add(month, worked, obs):
+    month["records"] += 1
+    if worked > 0:
+        month["worked_days"] += 1
+        month["minutes"] += worked
+        month["hours"] += round(worked / 60, 2)
+    if obs is not None:
+        month["observaciones"][obs] = month["observaciones"].get(obs, 0) + 1
+
+def _finish(month):
+    month["hours"] = round(month["hours"], 2)
+    month["avg_minutes"] = round(month["minutes"] / month["worked_days"], 1) if month["worked_days"] else 0
+    return month
+
+def summarize_employee(entry, values) -> dict:
+    years = {}
+    for year_key, block in entry.get("years", {}).items():
+        if "verbatim" in block:
+            continue
+        ins, outs, obs = (attendance_store.unpack(block[name]) for name in ("in", "out", "obs"))
+        raw = block.get("raw", {})
+        months, pos = {}, 0
+        for month_name, count in block["months"]:
+            month = _month_summary()
+            for i in range(pos, pos + count):
+                rec = raw.get(str(i)) if raw else None
+                if isinstance(rec, dict):
+                    worked = _worked(_minutes_of(rec.get("hora_entrada")), _minutes_of(rec.get("hora_salida")))
+                    label = rec.get("observaciones")
+                    _add(month, worked, label if isinstance(label, str) else None)
+                elif str(i) in raw:
+                    month["records"] += 1
+                else:
+                    _add(month, _worked(ins[i], outs[i]), values[obs[i]])
+            months[month_name] = _finish(month)
+            pos += count
+        years[year_key] = months
+    return years
+
+def load_summary(path=SUMMARY_PATH) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            summary = json.load(f)
+        if summary.get("version") == VERSION:
+            return summary
+    except (OSError, ValueError):
+        pass
+    return {"version": VERSION, "employees": {}}
+
+def update(store: dict, path=SUMMARY_PATH):
+    """Recomputes the summary entries whose records changed. Returns (recomputed, reused, removed)."""
+    previous = load_summary(path)["employees"]
+    values = store["values"]
+    employees, recomputed, reused = {}, 0, 0
+    for emp, entry in store["employees"].items():
+        digest = employee_hash(entry, values)
+        old = previous.get(emp)
+        if old and old.get("hash") == digest:
+            employees[emp] = old
+            reused += 1
+        else:
+            employees[emp] = {"hash": digest, "years": summarize_employee(entry, values)}
+            recomputed += 1
+    removed = len(set(previous) - set(employees))
+    if recomputed or removed or list(previous) != list(employees) or not Path(path).exists():
+        attendance_store.write_json(path, {"version": VERSION, "employees": employees})
+    return recomputed, reused, removed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera attendance_summary.json (agregados por empleado y mes).")
+    parser.add_argument("--store", default=str(attendance_store.STORE_PATH),
+                        help="Almacén columnar de asistencia (se usa el JSON anidado si no existe)")
+    parser.add_argument("--out", default=str(SUMMARY_PATH))
+    args = parser.parse_args(argv)
+
+    store = data_access.load_attendance_store(args.store)
+    recomputed, reused, removed = update(store, args.out)
+    print(f"📊 Resumen de asistencia: {recomputed} recalculados, {reused} sin cambios, {removed} eliminados → {args.out}")
+
+if __name__ == "__main__":
+    main()
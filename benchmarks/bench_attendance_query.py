@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# bench_attendance_query.py — attendance_query (bitmaps) vs recorrer el diccionario anidado
+#
+#   python benchmarks/bench_attendance_query.py [--employees 1000 10000] [--seed 5]
+#
+# Asistencia sintética (esqueleto de días laborables + simulate_store()), índice
+# construido una vez y tres consultas típicas; cada una se comprueba contra el
+# recorrido ingenuo de attendance_2025.json en forma anidada.
+
+import argparse, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import attendance_store
+import attendance_query
+import randomize_attendace as sim
+from bench_attendance_sim import skeleton_store
+
+YEAR = "2025"
+
+def naive_counts(nested, category, months):
+    names = {name for name, num in attendance_store.MONTHS_ES.items() if num in months} if months else None
+    out = {}
+    for emp, years in nested.items():
+        n = 0
+        for month_name, records in years.get(YEAR, {}).items():
+            if names is None or month_name in names:
+                n += sum(1 for r in records if r["observaciones"] == category)
+        out[emp] = n
+    return out
+
+def timed(fn, repeat=3):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    queries = [
+        ("Tarde ≥4 en marzo", "Tarde", {3}, 4),
+        ("Ausencias en Q2", "Ausencia Injustificada", {4, 5, 6}, 1),
+        ("Top Teletrabajo año", "Teletrabajo", set(), 1),
+    ]
+    print(f"{'empleados':>9} {'índice s':>9} {'consulta':<22} {'índice ms':>10} {'escaneo ms':>11} {'x':>6}")
+    for n in args.employees:
+        store = skeleton_store(n, [int(YEAR)])
+        sim.simulate_store(store, [YEAR], seed=args.seed)
+        nested = attendance_store.decode(store)
+        t0 = time.perf_counter()
+        index = attendance_query.AttendanceIndex()
+        index.update(store)
+        t_build = time.perf_counter() - t0
+        for label, cat, months, min_count in queries:
+            got, t_index = timed(lambda: index.matching(cat, min_count, year=YEAR, months=months))
+            want, t_scan = timed(lambda: sorted(((e, c) for e, c in naive_counts(nested, cat, months).items()
+                                                 if c >= min_count), key=lambda x: (-x[1], x[0])))
+            assert got == want, label
+            print(f"{n:>9} {t_build:>9.2f} {label:<22} {t_index * 1000:>10.2f} {t_scan * 1000:>11.1f} {t_scan / t_index:>6.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# bench_attendance_sim.py — randomize_attendace.py: motor escalar vs lote NumPy (simulate_store)
+#
+#   python benchmarks/bench_attendance_sim.py [--employees 1000 10000] [--years 2024 2025 2026] [--seed 3]
+#
+# Construye un almacén columnar sintético (días laborables de cada año, sin
+# registros "raw") y mide registros/s de simulate_store(). El motor escalar se
+# mide sobre --scalar-employees empleados en forma anidada y se compara por
+# registro. También comprueba determinismo y proporciones frente a los P_*.
+
+import argparse, base64, copy, random, sys, time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import attendance_store
+import randomize_attendace as sim
+
+def skeleton_block(year):
+    start = date(year, 1, 1)
+    n_days = (date(year + 1, 1, 1) - start).days
+    offsets = np.arange(n_days)
+    workdays = offsets[(start.weekday() + offsets) % 7 < 5]
+    months = np.array([date.fromordinal(start.toordinal() + int(o)).month for o in workdays])
+    layout = [[name, int((months == num).sum())] for name, num in attendance_store.MONTHS_ES.items()]
+    null = np.full(len(workdays), attendance_store.NULL)
+    zero = np.zeros(len(workdays))
+    pack = lambda a: base64.b64encode(a.astype("<i2").tobytes()).decode("ascii")
+    return {"months": layout, "day": pack(workdays), "in": pack(null), "out": pack(null),
+            "obs": pack(zero), "expl": pack(zero)}
+
+def skeleton_store(n_employees, years):
+    blocks = {str(y): skeleton_block(y) for y in years}
+    return {"format": attendance_store.FORMAT, "version": attendance_store.VERSION, "values": [""],
+            "employees": {f"Empleado {i}": {"years": copy.deepcopy(blocks)} for i in range(n_employees)}}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--years", type=int, nargs="+", default=[2024, 2025, 2026])
+    parser.add_argument("--scalar-employees", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+    year_keys = [str(y) for y in args.years]
+
+    # Scalar engine on the nested form, per record
+    nested = attendance_store.decode(skeleton_store(args.scalar_employees, args.years))
+    t0 = time.perf_counter()
+    sim.randomize_nested(nested, year_keys, random.Random(args.seed))
+    t_scalar = time.perf_counter() - t0
+    n_scalar = sum(len(m) for e in nested.values() for y in e.values() for m in y.values())
+    scalar_rate = n_scalar / t_scalar
+    print(f"escalar: {n_scalar:,} registros en {t_scalar:.2f}s → {scalar_rate:,.0f} reg/s")
+
+    # Determinism + category proportions on a small store
+    a, b = skeleton_store(50, args.years), skeleton_store(50, args.years)
+    sim.simulate_store(a, year_keys, seed=args.seed)
+    sim.simulate_store(b, year_keys, seed=args.seed)
+    assert a == b, "simulate_store no es determinista"
+    obs = [r["observaciones"] for e in attendance_store.decode(a).values()
+           for y in e.values() for m in y.values() for r in m]
+    expected = {"Ausencia Injustificada": sim.P_ABSENT, "Comisión de servicio": sim.P_MISSION,
+                "Teletrabajo": sim.P_REMOTE, "Tarde": sim.P_LATE, "Incompleto": sim.P_EARLY,
+                "Completo": sim.P_NORMAL}
+    print("proporciones: " + "  ".join(f"{k} {obs.count(k) / len(obs):.3f} (P={p:.2f})" for k, p in expected.items()))
+
+    print(f"{'empleados':>9} {'años':>5} {'registros':>11} {'numpy s':>9} {'reg/s':>12} {'x escalar':>10}")
+    for n in args.employees:
+        store = skeleton_store(n, args.years)
+        t0 = time.perf_counter()
+        records = sim.simulate_store(store, year_keys, seed=args.seed)
+        t = time.perf_counter() - t0
+        print(f"{n:>9} {len(args.years):>5} {records:>11,} {t:>9.2f} {records / t:>12,.0f} {records / t / scalar_rate:>10.0f}")
+
+if __name__ == "__main__":
+    main()
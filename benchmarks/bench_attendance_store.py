@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# bench_attendance_store.py — attendance_2025.json anidado vs almacén columnar (attendance_store.py)
+#
+#   python benchmarks/bench_attendance_store.py [--employees 12 500 5000] [--seed 11]
+#
+# Para cada tamaño mide bytes en disco, json.load del fichero anidado, load() del
+# columnar (lo que necesita quien trabaja con columnas) y load_nested() del
+# columnar (lo que necesita quien quiere la forma antigua). Comprueba además que
+# decode(encode(x)) == x. El primer tamaño usa el fichero real si cuadra.
+
+import argparse, json, random, sys, tempfile, time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import attendance_store
+
+MONTH_NAMES = list(attendance_store.MONTHS_ES)
+OUTCOMES = [  # (observaciones, explicacion, entrada, salida normal / viernes), as randomize_attendace.py
+    ("Completo", "", "09:00:00", None),
+    ("Tarde", "Retraso leve.", "09:20:00", None),
+    ("Incompleto", "Salida anticipada.", "09:00:00", "15:30:00"),
+    ("Ausencia Injustificada", "", None, None),
+    ("Comisión de servicio", "Visita/gestión fuera de oficina.", "09:00:00", None),
+    ("Teletrabajo", "Actividad remota autorizada.", "09:00:00", None),
+]
+WEIGHTS = [0.65, 0.12, 0.10, 0.05, 0.04, 0.04]
+
+def synthetic(n_employees, seed, year=2025):
+    rng = random.Random(seed)
+    data = {}
+    for e in range(n_employees):
+        months = {m: [] for m in MONTH_NAMES}
+        d = date(year, 1, 1)
+        while d.year == year:
+            if d.weekday() < 5:
+                obs, expl, entrada, salida = rng.choices(OUTCOMES, WEIGHTS)[0]
+                salida = salida or ("14:00:00" if d.weekday() == 4 else "17:00:00")
+                iso = d.isoformat()
+                months[MONTH_NAMES[d.month - 1]].append({
+                    "day": d.day,
+                    "hora_entrada": f"{iso}T{entrada}" if entrada else None,
+                    "hora_salida": f"{iso}T{salida}" if entrada else None,
+                    "observaciones": obs,
+                    "explicacion": expl,
+                })
+            d += timedelta(days=1)
+        data[f"Empleado {e}"] = {str(year): months}
+    return data
+
+def best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, nargs="+", default=[12, 500, 5000])
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    real = json.loads(attendance_store.JSON_PATH.read_text(encoding="utf-8"))
+    print(f"{'empleados':>9} {'anidado B':>11} {'columnar B':>11} {'x':>5} "
+          f"{'json.load ms':>13} {'load ms':>9} {'x':>5} {'load_nested ms':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        nested_path, store_path = Path(tmp) / "a.json", Path(tmp) / "a.cols.json"
+        for n in args.employees:
+            data = real if n == len(real) else synthetic(n, args.seed)
+            store = attendance_store.encode(data)
+            assert attendance_store.decode(store) == data, "la conversión no es reversible"
+            attendance_store.write_json(nested_path, data, compact=False)
+            attendance_store.write_json(store_path, store)
+            nested_b, store_b = nested_path.stat().st_size, store_path.stat().st_size
+
+            def load_nested_json():
+                with open(nested_path, "r", encoding="utf-8") as f:
+                    json.load(f)
+            t_json = best_of(load_nested_json)
+            t_store = best_of(lambda: attendance_store.load(store_path))
+            t_decode = best_of(lambda: attendance_store.load_nested(store_path))
+            print(f"{n:>9} {nested_b:>11,} {store_b:>11,} {nested_b / store_b:>5.1f} "
+                  f"{t_json * 1000:>13.1f} {t_store * 1000:>9.1f} {t_json / t_store:>5.1f} {t_decode * 1000:>15.1f}")
+
+if __name__ == "__main__":
+    main()
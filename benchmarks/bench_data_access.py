@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# bench_data_access.py — carga directa vs data_access.py (sidecar en disco y memo en proceso)
+#
+#   python benchmarks/bench_data_access.py [--employees 12 500 5000] [--seed 11]
+#
+# Para cada tamaño mide, sobre datos_empleados.json, el JSON anidado de asistencia y
+# el almacén columnar:
+#   directo   json.load + normalización, lo que hacía cada script por su cuenta
+#   sidecar   primera carga de un proceso nuevo con el .pickle ya escrito
+#   memo      cargas siguientes en el mismo proceso
+# y comprueba que los tres devuelven lo mismo y que tocar el fichero invalida la caché.
+
+import argparse, os, random, sys, tempfile, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import attendance_store
+import data_access
+from bench_attendance_store import best_of, synthetic
+
+def synthetic_employees(n, seed):
+    rng = random.Random(seed)
+    return {"empleados": [{
+        "id": 300000 + i,
+        "nombres": f"Nombre {i}",
+        "apellidos": f"Apellido {rng.randint(0, 999)}",
+        "puesto": rng.choice(["Técnico", "Administrativo", "Jefe de Área"]),
+        "salariomensual": rng.randint(300_000, 2_000_000),
+        "foto": f"./fotos_empleados/Nombre {i}.jpg",
+        "documentos": {f"doc_{k}_pdf": f"./documentos_empleados/{300000 + i}/doc_{k}.pdf" for k in range(5)},
+    } for i in range(n)]}
+
+def _direct_employees(path):
+    loaded = data_access._employees_file(path)
+    return loaded["empleados"], loaded["wrapped"]
+
+def measure(name, path, direct, cached):
+    t_direct = best_of(lambda: direct(path))
+    cached(path)                          # writes the sidecar
+    def sidecar():
+        data_access.clear()
+        cached(path)
+    t_sidecar = best_of(sidecar)
+    t_memo = best_of(lambda: cached(path))
+    assert cached(path) == direct(path), f"{name}: la caché no devuelve lo mismo"
+    return t_direct, t_sidecar, t_memo
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, nargs="+", default=[12, 500, 5000])
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    print(f"{'dataset':>10} {'empleados':>9} {'bytes':>12} {'directo ms':>11} {'sidecar ms':>11} "
+          f"{'x':>5} {'memo ms':>8} {'x':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        data_access.CACHE_DIR = Path(tmp) / "cache"
+        for n in args.employees:
+            emp_path, att_path = Path(tmp) / f"emp{n}.json", Path(tmp) / f"att{n}.json"
+            store_path = Path(tmp) / f"att{n}.cols.json"
+            attendance = synthetic(n, args.seed)
+            attendance_store.write_json(emp_path, synthetic_employees(n, args.seed), compact=False)
+            attendance_store.write_json(att_path, attendance, compact=False)
+            attendance_store.write_json(store_path, attendance_store.encode(attendance))
+            del attendance
+            cases = [
+                ("empleados", emp_path, _direct_employees, data_access.load_empleados),
+                ("asistencia", att_path, attendance_store.load_nested, data_access.load_attendance),
+                ("columnar", store_path, attendance_store.load, data_access.load_attendance_store),
+            ]
+            for name, path, direct, cached in cases:
+                t_direct, t_sidecar, t_memo = measure(name, path, direct, cached)
+                print(f"{name:>10} {n:>9} {path.stat().st_size:>12,} {t_direct * 1000:>11.1f} "
+                      f"{t_sidecar * 1000:>11.1f} {t_direct / t_sidecar:>5.1f} {t_memo * 1000:>8.2f} "
+                      f"{t_direct / t_memo:>6.1f}")
+
+            # A write to the file (new mtime/size) must invalidate memo and sidecar
+            data = synthetic_employees(n + 1, args.seed)
+            attendance_store.write_json(emp_path, data, compact=False)
+            os.utime(emp_path, ns=(time.time_ns(), time.time_ns()))
+            assert len(data_access.load_empleados(emp_path)[0]) == n + 1, "la caché no se invalidó"
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# bench_employee_journal.py — escribir datos_empleados.json entero vs diario de cambios
+#
+#   python benchmarks/bench_employee_journal.py [--employees 10000] [--changes 0 1 10 100 1000] [--seed 0]
+#
+# Con un datos_empleados.json de synthetic.py, para cada número de empleados
+# cambiados (un campo cada uno, como una foto renombrada en un sync):
+#   reescritura   lo de antes: jsonio.write_json() del fichero completo
+#   diario        employee_journal.record(): diff + entradas añadidas (sin compactar)
+#   lector        lo que paga un consumidor: volver a leer y parsear el fichero
+#                 completo vs leer el diario y aplicar sólo las entradas nuevas
+# con bytes escritos de cada forma. Con 0 cambios el diario no escribe nada.
+
+import argparse, copy, os, sys, tempfile, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import employee_journal
+import jsonio
+import synthetic
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--changes", type=int, nargs="+", default=[0, 1, 10, 100, 1000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    emps = synthetic.employees(args.employees, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = Path(tmp) / "datos_empleados.json"
+        journal = employee_journal.journal_path(snapshot)
+        jsonio.write_json(snapshot, emps)
+        size = os.path.getsize(snapshot)
+        print(f"{len(emps):,} empleados, datos_empleados.json {size / (1 << 20):.1f} MB")
+        print(f"{'cambios':>8} {'reescritura':>12} {'diario':>9} {'bytes diario':>13} "
+              f"{'lector: parsear todo':>21} {'lector: aplicar diario':>23}")
+        for n in args.changes:
+            before = copy.deepcopy(emps)
+            after = copy.deepcopy(emps)
+            for i, emp in enumerate(after[:n]):
+                emp["foto"] = f"public/fotos_empleados/renombrada_{i}.jpg"
+
+            t0 = time.perf_counter()
+            jsonio.write_json(Path(tmp) / "reescrito.json", after)
+            t_rewrite = time.perf_counter() - t0
+
+            journal.unlink(missing_ok=True)
+            jsonio.write_json(snapshot, before)
+            t0 = time.perf_counter()
+            stats = employee_journal.record(snapshot, after, before, after, compact_ratio=float("inf"))
+            t_journal = time.perf_counter() - t0
+            assert stats["entries"] == n and not stats["compacted"]
+            written = os.path.getsize(journal) if journal.exists() else 0
+
+            t0 = time.perf_counter()
+            jsonio.load(snapshot)
+            t_parse = time.perf_counter() - t0
+            cached = copy.deepcopy(before)   # what a reader already holds
+            t0 = time.perf_counter()
+            header, entries = employee_journal.read(journal)
+            employee_journal.apply(cached, entries, header["base"] if header else 0)
+            t_apply = time.perf_counter() - t0
+            assert cached == after
+
+            print(f"{n:>8,} {t_rewrite * 1000:>10.1f}ms {t_journal * 1000:>7.1f}ms {written:>13,} "
+                  f"{t_parse * 1000:>19.1f}ms {t_apply * 1000:>21.2f}ms")
+        print(f"(reescritura: {size:,} bytes cada vez)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# bench_jsonio.py — backends (json / orjson) y formato (pretty / compact) de jsonio.py
+#
+#   python benchmarks/bench_jsonio.py [--scale 20]
+#
+# Para cada fichero de public/ (y NOMINAS.json repetido --scale veces, del orden
+# de los ~1.5 MB que vamos a manejar) mide bytes, dumps(), loads() y
+# write_json() (temp + fsync + rename) con cada backend disponible, y comprueba
+# que todos los backends escriben exactamente los mismos bytes.
+
+import argparse, sys, tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import jsonio
+from bench_attendance_store import best_of
+
+PUBLIC = Path(__file__).resolve().parent.parent / "public"
+DATASETS = ["datos_empleados.json", "NOMINAS.json", "attendance_2025.json",
+            "attendance_2025.cols.json", "attendance_summary.json", "attendance_index.json"]
+
+def datasets(scale):
+    out = []
+    for name in DATASETS:
+        path = PUBLIC / name
+        if path.exists():
+            out.append((name, jsonio.load(path)))
+    nominas = dict(out).get("NOMINAS.json")
+    if nominas and scale > 1:
+        rows = [dict(row, employee_id=f"{row['employee_id']}-{k}") for k in range(scale) for row in nominas]
+        out.append((f"NOMINAS.json x{scale}", rows))
+    return out
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"backends: {', '.join(jsonio.BACKENDS)} (activo: {jsonio.BACKEND})")
+    print(f"{'dataset':>26} {'backend':>7} {'formato':>7} {'bytes':>11} {'dumps ms':>9} "
+          f"{'loads ms':>9} {'write ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        target = Path(tmp) / "out.json"
+        for name, obj in datasets(args.scale):
+            for compact in (False, True):
+                reference = None
+                for backend, (dumps, loads) in jsonio.BACKENDS.items():
+                    data = dumps(obj, compact)
+                    reference = reference or data
+                    assert data == reference, f"{name}: {backend} no escribe los mismos bytes"
+                    assert loads(data) == obj, f"{name}: {backend} no es reversible"
+                    t_dump = best_of(lambda: dumps(obj, compact))
+                    t_load = best_of(lambda: loads(data))
+                    jsonio.BACKEND = backend
+                    t_write = best_of(lambda: jsonio.write_json(target, obj, compact))
+                    print(f"{name:>26} {backend:>7} {'compact' if compact else 'pretty':>7} {len(data):>11,} "
+                          f"{t_dump * 1000:>9.2f} {t_load * 1000:>9.2f} {t_write * 1000:>9.2f}")
+
+if __name__ == "__main__":
+    main()
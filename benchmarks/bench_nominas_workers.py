@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# bench_nominas_workers.py — PDFs/segundo de render_all() con 1, 2, 4 y 8 procesos.
+#
+#   python benchmarks/bench_nominas_workers.py [--employees 200] [--months 12]
+#
+# Usa las plantillas reales de datos_empleados.json (repetidas hasta llegar a
+# --employees) y escribe en un directorio temporal, así que no toca public/.
+
+import argparse, sys, tempfile, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import generate_nominas_2025_ultralight as gen
+
+def build_jobs(n_employees, n_months):
+    base = gen.load_employees()
+    jobs = []
+    for mm_idx in range(1, n_months + 1):
+        periodo = f"{gen.YEAR}-{mm_idx:02d}"
+        for i in range(n_employees):
+            e = base[i % len(base)]
+            full_name = f"{e['nombre']} {e['apellidos']} {i}".strip()
+            bruto, neto, brk = gen.calc_nomina(e["salario_base"])
+            jobs.append((full_name, e["puesto"], e["salario_base"], periodo, bruto, neto, brk))
+    return jobs
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    jobs = build_jobs(args.employees, args.months)
+    print(f"{len(jobs)} nóminas por pasada")
+    print(f"{'workers':>8} {'segundos':>10} {'PDFs/s':>10}")
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            t0 = time.perf_counter()
+            paths = gen.render_all(jobs, workers=workers, out_dir=Path(tmp))
+            elapsed = time.perf_counter() - t0
+        assert len(paths) == len(jobs)
+        print(f"{workers:>8} {elapsed:>10.2f} {len(jobs) / elapsed:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# bench_payroll_attendance.py — descuentos de asistencia en nóminas: cruce de una pasada vs volver a recorrer los días
+#
+#   python benchmarks/bench_payroll_attendance.py [--employees 10000] [--naive-employees 500] [--seed 0]
+#
+# Empleados de synthetic.py y un almacén columnar de asistencia de 2025 simulado
+# con simulate_store(), con las claves como en producción: nombre completo (a veces
+# sin tildes) y el id detrás sólo en los homónimos. Mide, para empleados × 12 meses:
+#   cruce        payroll_attendance.join(): mapa id ↔ nombre y recuentos por mes, una vez
+#   consultas    month_counts() + apply() por nómina
+#   recorrido    con el mapa id ↔ clave ya hecho, recorrer por cada (empleado, periodo)
+#                los registros del mes (decode_year) contando categorías
+#   ingenuo      lo mismo, pero buscando además la clave del empleado entre todas
+#   (estos dos sobre --naive-employees y extrapolados: a 10k empleados tardan minutos)
+#   nóminas      calc_nomina() + build_row() del año sin y con --asistencia
+# y comprueba que el cruce y el recorrido ingenuo dan los mismos recuentos.
+
+import argparse, random, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import attendance_store
+import generate_nominas_2025_ultralight as gen
+import payroll_attendance
+import randomize_attendace as sim
+import synthetic
+from bench_attendance_sim import skeleton_store
+from textnorm import fold, tokenize
+
+def dataset(n, seed):
+    emps = synthetic.employees(n, seed)
+    employees = [{"employee_id": e["id"], "nombre": e["nombres"], "apellidos": e["apellidos"],
+                  "puesto": e["puesto"], "salario_base": e["salariomensual"]} for e in emps]
+    store = skeleton_store(n, [gen.YEAR])
+    rng = random.Random(seed)
+    names = {}
+    for e in employees:
+        names[f"{e['nombre']} {e['apellidos']}"] = names.get(f"{e['nombre']} {e['apellidos']}", 0) + 1
+    keyed = {}
+    for e, entry in zip(employees, store["employees"].values()):
+        name = f"{e['nombre']} {e['apellidos']}"
+        if rng.random() < 0.3:
+            name = fold(name)
+        keyed[name if names[f"{e['nombre']} {e['apellidos']}"] == 1 else f"{name} {e['employee_id']}"] = entry
+    store["employees"] = keyed
+    sim.simulate_store(store, [str(gen.YEAR)], seed=seed)
+    return employees, store
+
+def find_key(store, e):
+    target = " ".join(tokenize(f"{e['nombre']} {e['apellidos']}"))
+    for key in store["employees"]:
+        tokens = tokenize(key)
+        if tokens[-1] == str(e["employee_id"]) or " ".join(tokens) == target:
+            return key
+    return None
+
+def scan_month(store, key, mm_idx):
+    # Walk the employee's day log for one month, as a per-payslip lookup would
+    block = store["employees"][key]["years"][str(gen.YEAR)]
+    months = attendance_store.decode_year(str(gen.YEAR), block, store["values"])
+    counts = [0, 0, 0]
+    for rec in months[gen.MONTHS[mm_idx - 1]]:
+        cat = payroll_attendance.CATEGORIES.get(rec["observaciones"])
+        if cat is not None:
+            counts[cat] += 1
+    return tuple(counts)
+
+def payroll(employees, joined=None):
+    rng = random.Random(0)
+    rows = 0
+    for mm_idx in range(1, 13):
+        periodo = f"{gen.YEAR}-{mm_idx:02d}"
+        for e in employees:
+            bruto, neto, brk = gen.calc_nomina(e["salario_base"], rng)
+            if joined is not None:
+                counts = payroll_attendance.month_counts(joined, e["employee_id"], mm_idx)
+                neto, brk = payroll_attendance.apply(e["salario_base"], neto, brk, counts)
+            gen.build_row(e, mm_idx, periodo, bruto, neto, brk)
+            rows += 1
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--naive-employees", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    employees, store = dataset(args.employees, args.seed)
+    payslips = len(employees) * 12
+    print(f"{len(employees):,} empleados × 12 meses = {payslips:,} nóminas (datos en {time.perf_counter() - t0:.1f}s)")
+
+    t0 = time.perf_counter()
+    joined = payroll_attendance.join(store, employees, gen.YEAR)
+    t_join = time.perf_counter() - t0
+    assert not joined.unmatched and not joined.ambiguous, (joined.unmatched[:3], joined.ambiguous[:3])
+    assert len(joined.counts) == len(employees)
+
+    t0 = time.perf_counter()
+    for mm_idx in range(1, 13):
+        for e in employees:
+            counts = payroll_attendance.month_counts(joined, e["employee_id"], mm_idx)
+            payroll_attendance.apply(e["salario_base"], 0.0, {}, counts)
+    t_lookup = time.perf_counter() - t0
+
+    sample = employees[:args.naive_employees]
+    keys = {e["employee_id"]: find_key(store, e) for e in sample}
+    t0 = time.perf_counter()
+    scanned = {(e["employee_id"], m): scan_month(store, keys[e["employee_id"]], m) for m in range(1, 13) for e in sample}
+    t_scan = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for m in range(1, 13):
+        for e in sample:
+            scan_month(store, find_key(store, e), m)
+    t_naive = time.perf_counter() - t0
+    for (emp_id, m), counts in scanned.items():
+        assert payroll_attendance.month_counts(joined, emp_id, m) == counts, (emp_id, m)
+
+    print(f"cruce      {t_join:>9.3f}s  (una vez)")
+    print(f"consultas  {t_lookup:>9.3f}s  ({t_lookup / payslips * 1e6:.2f} µs/nómina)")
+    for name, secs in (("recorrido", t_scan), ("ingenuo", t_naive)):
+        total = secs / len(scanned) * payslips
+        print(f"{name:<10} {total:>9.1f}s  ({secs / len(scanned) * 1000:.3f} ms/nómina, extrapolado de "
+              f"{len(scanned):,} nóminas) → {total / (t_join + t_lookup):,.0f}x más lento")
+
+    t0 = time.perf_counter()
+    payroll(employees)
+    t_plain = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    payroll(employees, payroll_attendance.join(store, employees, gen.YEAR))
+    t_att = time.perf_counter() - t0
+    print(f"nóminas    {t_plain:>9.3f}s sin asistencia  |  {t_att:.3f}s con --asistencia (+{(t_att / t_plain - 1) * 100:.0f}%)")
+
+if __name__ == "__main__":
+    main()
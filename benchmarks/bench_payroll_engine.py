@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# bench_payroll_engine.py — calc_nomina() escalar vs payroll_engine (NumPy) para un año completo.
+#
+#   python benchmarks/bench_payroll_engine.py [--sizes 10000 100000] [--seed 2025]
+#
+# Ambas rutas terminan en filas con el esquema de NOMINAS.json (build_row() /
+# PayrollYear.rows()), así que el tiempo medido es el de producir el año entero,
+# no sólo el de sortear importes.
+
+import argparse, random, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import generate_nominas_2025_ultralight as gen
+import payroll_engine
+
+def synthetic_employees(n, seed):
+    rng = random.Random(seed)
+    return [{
+        "employee_id": i,
+        "nombre": f"Empleado {i}",
+        "apellidos": "Sintético",
+        "puesto": "Técnico",
+        "salario_base": round(rng.uniform(1200000, 4000000)),
+    } for i in range(n)]
+
+def scalar_year(employees, seed):
+    rng = random.Random(seed)
+    rows = []
+    for mm_idx in range(1, len(gen.MONTHS) + 1):
+        periodo = f"{gen.YEAR}-{mm_idx:02d}"
+        for e in employees:
+            bruto, neto, brk = gen.calc_nomina(e["salario_base"], rng)
+            rows.append(gen.build_row(e, mm_idx, periodo, bruto, neto, brk))
+    return rows
+
+def numpy_year(employees, seed):
+    amounts = payroll_engine.compute_year([e["salario_base"] for e in employees], len(gen.MONTHS), seed=seed)
+    return list(amounts.rows(employees, gen.YEAR))
+
+def check_schema(employees, seed):
+    # rows() must match build_row() fed with the same engine amounts, field for field
+    amounts = payroll_engine.compute_year([e["salario_base"] for e in employees], len(gen.MONTHS), seed=seed)
+    expected = []
+    for mm_idx in range(1, len(gen.MONTHS) + 1):
+        periodo = f"{gen.YEAR}-{mm_idx:02d}"
+        for i, e in enumerate(employees):
+            bruto, neto, brk = amounts.nomina(mm_idx - 1, i)
+            expected.append(gen.build_row(e, mm_idx, periodo, bruto, neto, brk))
+    got = list(amounts.rows(employees, gen.YEAR))
+    assert got == expected and all(list(a) == list(b) for a, b in zip(got, expected)), "rows() != build_row()"
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--seed", type=int, default=2025)
+    args = parser.parse_args()
+
+    check_schema(synthetic_employees(500, args.seed), args.seed)
+    print(f"{'empleados':>10} {'filas':>10} {'escalar s':>10} {'numpy s':>10} {'sólo arrays s':>14} {'x':>6}")
+    for n in args.sizes:
+        employees = synthetic_employees(n, args.seed)
+        salarios = [e["salario_base"] for e in employees]
+        rows_s, t_scalar = timed(scalar_year, employees, args.seed)
+        rows_n, t_numpy = timed(numpy_year, employees, args.seed)
+        _, t_arrays = timed(payroll_engine.compute_arrays, salarios, len(gen.MONTHS), args.seed)
+        # Determinism: a second run with the same seed must be bit-identical
+        again = payroll_engine.compute_arrays(salarios, len(gen.MONTHS), args.seed)
+        first = payroll_engine.compute_arrays(salarios, len(gen.MONTHS), args.seed)
+        assert all((again[k] == first[k]).all() for k in first), "payroll_engine no es determinista"
+        assert len(rows_s) == len(rows_n) and list(rows_s[0]) == list(rows_n[0])
+        print(f"{n:>10} {len(rows_n):>10} {t_scalar:>10.2f} {t_numpy:>10.2f} {t_arrays:>14.3f} {t_scalar / t_numpy:>6.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# bench_payroll_ledger.py — consultas de nóminas: libro SQLite vs recorrer NOMINAS.json
+#
+#   python benchmarks/bench_payroll_ledger.py [--employees 10000] [--queries 200] [--seed 0]
+#
+# Escribe con synthetic.py el NOMINAS.json de --employees empleados × 12 meses,
+# lo carga en un libro de payroll_ledger.py (tiempo de importación y tamaño) y
+# mide, por consulta, cada forma de contestar:
+#   historial    las 12 nóminas de un empleado
+#   acumulado    bruto / IRPF / neto de enero al mes elegido de un empleado
+#   mes          totales de un periodo (p. ej. IRPF total de marzo)
+#   año          totales del año de un empleado
+# con tres caminos: el libro (índices y tablas de totales), la lista ya cargada
+# en memoria recorrida entera (caliente) y leer NOMINAS.json + recorrerla, que es
+# lo que paga cada proceso que sólo quiere un dato (frío, sobre menos consultas).
+# Comprueba que los tres dan lo mismo y que export() reproduce el fichero byte a byte.
+
+import argparse, os, random, sys, tempfile, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import jsonio
+import payroll_ledger
+import synthetic
+
+def scan(rows, kind, arg):
+    # What a reader of NOMINAS.json has to do: one pass over every row
+    if kind == "historial":
+        return [r for r in rows if r["employee_id"] == arg]
+    if kind == "acumulado":
+        emp, periodo = arg
+        sel = [r for r in rows if r["employee_id"] == emp and f"{periodo[:4]}-01" <= r["periodo"] <= periodo]
+    elif kind == "mes":
+        sel = [r for r in rows if r["periodo"] == arg]
+    else:
+        emp, year = arg
+        sel = [r for r in rows if r["employee_id"] == emp and r["periodo"].startswith(f"{year}-")]
+    return {"nominas": len(sel), **{a: sum(r.get(a, 0) for r in sel) for a in payroll_ledger.AMOUNTS}}
+
+def lookup(ledger, kind, arg):
+    if kind == "historial":
+        return ledger.history(arg)
+    if kind == "acumulado":
+        return ledger.ytd(*arg)
+    if kind == "mes":
+        return ledger.month_totals(arg)
+    return ledger.year_totals(*arg)
+
+def same(kind, got, want):
+    if kind == "historial":
+        return got == want
+    return all(got[k] == v for k, v in want.items())
+
+def timed(fn, items):
+    t0 = time.perf_counter()
+    out = [fn(item) for item in items]
+    return (time.perf_counter() - t0) / len(items), out
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--cold-queries", type=int, default=5, help="Consultas leyendo NOMINAS.json cada vez")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    emps = synthetic.employees(args.employees, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        json_path, ledger_path = tmp / "NOMINAS.json", tmp / "nominas.sqlite"
+        jsonio.write_json(json_path, synthetic.payroll(emps, args.seed), compact=False)
+        rows = jsonio.load(json_path)
+        year = rows[0]["periodo"][:4]
+        print(f"{len(emps):,} empleados, {len(rows):,} nóminas, NOMINAS.json {os.path.getsize(json_path) / (1 << 20):.1f} MB")
+
+        with payroll_ledger.Ledger(ledger_path) as ledger:
+            t0 = time.perf_counter()
+            ledger.import_rows(rows)
+            t_import = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            ledger.export(tmp / "export.json", compact=False)
+            t_export = time.perf_counter() - t0
+        assert (tmp / "export.json").read_bytes() == json_path.read_bytes(), "export() no reproduce NOMINAS.json"
+        print(f"importación {t_import:.2f}s ({len(rows) / t_import:,.0f} filas/s)  |  "
+              f"exportación {t_export:.2f}s  |  libro {os.path.getsize(ledger_path) / (1 << 20):.1f} MB")
+
+        ids = [e["id"] for e in emps]
+        queries = {
+            "historial": [rng.choice(ids) for _ in range(args.queries)],
+            "acumulado": [(rng.choice(ids), f"{year}-{rng.randint(1, 12):02d}") for _ in range(args.queries)],
+            "mes": [f"{year}-{rng.randint(1, 12):02d}" for _ in range(args.queries)],
+            "año": [(rng.choice(ids), year) for _ in range(args.queries)],
+        }
+        print(f"{'consulta':>10} {'libro µs':>10} {'JSON caliente ms':>17} {'JSON frío ms':>13} {'vs caliente':>12} {'vs frío':>10}")
+        with payroll_ledger.Ledger(ledger_path) as ledger:
+            for kind, items in queries.items():
+                t_ledger, got = timed(lambda q: lookup(ledger, kind, q), items)
+                t_warm, want = timed(lambda q: scan(rows, kind, q), items)
+                t_cold, _ = timed(lambda q: scan(jsonio.load(json_path), kind, q), items[:args.cold_queries])
+                assert all(same(kind, g, w) for g, w in zip(got, want)), kind
+                print(f"{kind:>10} {t_ledger * 1e6:>10.1f} {t_warm * 1e3:>17.2f} {t_cold * 1e3:>13.1f} "
+                      f"{t_warm / t_ledger:>11,.0f}x {t_cold / t_ledger:>9,.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# bench_pdf_templates.py — render_pdf()/gen_pdf() con plantillas (pdf_templates) vs el código anterior.
+#
+#   python benchmarks/bench_pdf_templates.py [--docs 300] [--baseline <rev>]
+#
+# La versión "antes" se carga directamente desde git (por defecto, el commit
+# anterior a la introducción de pdf_templates.py), así que se compara contra la
+# salida real de entonces, no contra una copia. Todo se escribe en /tmp.
+
+import argparse, json, random, subprocess, sys, tempfile, time, types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from reportlab import rl_config
+import generate_nominas_2025_ultralight as gen
+import sync_employees_and_docs as sync
+
+def default_baseline():
+    added = subprocess.run(["git", "log", "--diff-filter=A", "--format=%H", "--", "pdf_templates.py"],
+                           cwd=ROOT, capture_output=True, text=True).stdout.split()
+    return f"{added[-1]}^" if added else "HEAD"
+
+def load_from_git(rev, filename, module_name):
+    src = subprocess.run(["git", "show", f"{rev}:{filename}"], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    module = types.ModuleType(module_name)
+    module.__file__ = str(ROOT / filename)  # keep its PROJECT_ROOT-relative paths working
+    exec(compile(src, module.__file__, "exec"), module.__dict__)
+    return module
+
+def measure(render, n):
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        for i in range(n):
+            render(Path(tmp), i)
+        elapsed = time.perf_counter() - t0
+        size = sum(f.stat().st_size for f in Path(tmp).iterdir())
+    return elapsed / n * 1000, size / n
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=300)
+    parser.add_argument("--baseline", default=None, help="revisión git del código 'antes'")
+    args = parser.parse_args()
+    rev = args.baseline or default_baseline()
+
+    old_gen = load_from_git(rev, "generate_nominas_2025_ultralight.py", "gen_baseline")
+    old_sync = load_from_git(rev, "sync_employees_and_docs.py", "sync_baseline")
+
+    with open(sync.JSON_PATH, "r", encoding="utf-8") as f:
+        empleados = json.load(f)
+    for emp in empleados:
+        sync.infer_missing(emp)
+    amounts = [gen.calc_nomina(3000000, random.Random(i)) for i in range(len(empleados))]
+
+    def old_nomina(out, i):
+        bruto, neto, brk = amounts[i % len(amounts)]
+        if hasattr(old_gen, "render_pdf"):
+            old_gen.render_pdf(f"Empleado {i}", "Técnico", 3000000, "2025-01", bruto, neto, brk, out_dir=out)
+        else:  # original create_pdf() only writes to NOMINAS_DIR
+            old_gen.NOMINAS_DIR = out
+            old_gen.create_pdf(f"Empleado {i}", "Técnico", 3000000, "2025-01")
+
+    def new_nomina(out, i):
+        bruto, neto, brk = amounts[i % len(amounts)]
+        gen.render_pdf(f"Empleado {i}", "Técnico", 3000000, "2025-01", bruto, neto, brk, out_dir=out)
+
+    def old_doc(out, i):
+        old_sync.gen_pdf(empleados[i % len(empleados)], "Contrato de Trabajo", out / f"{i}.pdf")
+
+    def new_doc(out, i):
+        sync.gen_pdf(empleados[i % len(empleados)], "Contrato de Trabajo", out / f"{i}.pdf")
+
+    print(f"baseline: {rev}  |  {args.docs} PDFs por caso")
+    print(f"{'caso':<22} {'ms/PDF':>8} {'bytes/PDF':>10}")
+    for label, old, new in (("nómina (render_pdf)", old_nomina, new_nomina),
+                            ("documento (gen_pdf)", old_doc, new_doc)):
+        rl_config.useA85 = 1   # reportlab default, as the old code ran
+        old_ms, old_bytes = measure(old, args.docs)
+        rl_config.useA85 = 0   # what pdf_templates configures
+        new_ms, new_bytes = measure(new, args.docs)
+        print(f"{label + ' antes':<22} {old_ms:>8.2f} {old_bytes:>10.0f}")
+        print(f"{label + ' ahora':<22} {new_ms:>8.2f} {new_bytes:>10.0f}   "
+              f"({old_ms / new_ms:.1f}x más rápido, tamaño {100 * (new_bytes / old_bytes - 1):+.0f}%)")
+
+if __name__ == "__main__":
+    main()
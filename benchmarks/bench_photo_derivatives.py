@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# bench_photo_derivatives.py — miniaturas de fotos: rendimiento por número de procesos y tamaño ahorrado
+#
+#   python benchmarks/bench_photo_derivatives.py [--photos 60] [--size 2400] [--jobs 1 2 4] [--seed 0]
+#
+# Genera --photos fotos JPEG sintéticas de --size px (degradado + ruido, que no
+# comprimen como una imagen plana) en un directorio temporal y ejecuta
+# photo_derivatives.build() sobre ellas, partiendo de cero, con cada valor de
+# --jobs y con ambos formatos. Por ejecución: fotos/s, MB/s de origen y bytes por
+# tamaño. Al final, una segunda pasada sobre lo ya generado (debe codificar 0).
+
+import argparse, io, os, shutil, sys, tempfile, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import numpy as np
+from PIL import Image
+
+import photo_derivatives as pd
+
+def make_photos(folder, n, size, seed):
+    rng = np.random.default_rng(seed)
+    folder.mkdir(parents=True)
+    total = 0
+    yy, xx = np.mgrid[0:size, 0:size * 3 // 4]
+    for i in range(n):
+        base = (xx * rng.uniform(0.05, 0.2) + yy * rng.uniform(0.05, 0.2)) % 256
+        rgb = np.stack([base, base[::-1], base[:, ::-1]], axis=-1)
+        rgb = np.clip(rgb + rng.normal(0, 12, rgb.shape), 0, 255).astype(np.uint8)
+        buf = io.BytesIO()
+        Image.fromarray(rgb).save(buf, format="JPEG", quality=90)
+        (folder / f"foto_{i:04d}.jpg").write_bytes(buf.getvalue())
+        total += buf.tell()
+    return total
+
+def run(fmt, jobs):
+    index = {"version": pd.INDEX_VERSION, "collections": {}}
+    t0 = time.perf_counter()
+    _, stats = pd.build("bench", index, jobs=jobs, fmt=fmt)
+    return time.perf_counter() - t0, stats, index
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--photos", type=int, default=60)
+    parser.add_argument("--size", type=int, default=2400, help="Lado mayor de las fotos de origen")
+    parser.add_argument("--jobs", type=int, nargs="+", default=sorted({1, 2, os.cpu_count() or 1}))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        total = make_photos(tmp / "fotos", args.photos, args.size, args.seed)
+        pd.COLLECTIONS["bench"] = (tmp / "fotos", None)
+        pd.OUT_ROOT = tmp / "fotos_derivadas"
+        print(f"{args.photos} fotos de {args.size}px ({total / (1 << 20):.1f} MB), {os.cpu_count()} CPU")
+        print(f"{'formato':>8} {'procesos':>9} {'seg.':>7} {'fotos/s':>8} {'MB/s':>6}  "
+              + "  ".join(f"{name} ({px}px)" for name, px in pd.SIZES.items()))
+        formats = ["webp", "jpeg"] if pd.default_format() == "webp" else ["jpeg"]
+        for fmt in formats:
+            for jobs in args.jobs:
+                shutil.rmtree(pd.OUT_ROOT, ignore_errors=True)
+                secs, stats, index = run(fmt, jobs)
+                assert stats["codificadas"] == args.photos and not stats["errores"], stats["errores"][:3]
+                sizes = "  ".join(f"{out / stats['fotos'] / 1024:>6.1f} KB ({(1 - out / src) * 100:.1f}% menos)"
+                                  for src, out in stats["por_tamano"].values())
+                print(f"{fmt:>8} {jobs:>9} {secs:>7.2f} {args.photos / secs:>8.1f} {total / secs / (1 << 20):>6.1f}  {sizes}")
+        t0 = time.perf_counter()
+        _, stats = pd.build("bench", index, jobs=args.jobs[-1], fmt=formats[-1])
+        print(f"segunda pasada: {stats['codificadas']} codificadas en {time.perf_counter() - t0:.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# bench_photo_index.py — PhotoIndex vs el escaneo original (empleados × fotos) de sync_employees_and_docs.py
+#
+#   python benchmarks/bench_photo_index.py [--sizes 1000 10000 50000] [--scan-limit 2000] [--seed 7]
+#
+# Nombres y nombres de fichero sintéticos (con tildes, ñ y sufijos de extensión
+# variados); no se toca el disco. El escaneo original es cuadrático, así que sólo
+# se mide hasta --scan-limit y para tamaños mayores se extrapola.
+
+import argparse, random, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from photo_index import PhotoIndex
+
+NOMBRES = ["María", "José", "Ángel", "Íñigo", "Carla", "Luis", "Pedro", "Germán", "Víctor", "Manuel",
+           "Jessica", "Santiago", "Damián", "Policarpo", "Anselmo", "Gabriel", "Felipe", "Inmaculada"]
+APELLIDOS = ["Ondo", "Mañe", "Nchama", "Obama", "Esono", "Avomo", "Ndong", "Biong", "Nve", "Ela",
+             "Mbuña", "Abaga", "Epiko", "Massoko", "Medina", "Sisa", "Bioko", "Dougan", "Makina"]
+EXTS = [".jpg", ".jpeg", ".webp", ".png"]
+
+def synthetic(n, seed):
+    rng = random.Random(seed)
+    people = set()
+    while len(people) < n:
+        nombres = " ".join(rng.sample(NOMBRES, rng.choice((1, 2))))
+        apellidos = " ".join(rng.sample(APELLIDOS, 2)) + f" {len(people)}"  # keep them unique
+        people.add((nombres, apellidos))
+    people = sorted(people)
+    files = [f"{nom} {ape}{rng.choice(('', ' '))}{rng.choice(EXTS)}" for nom, ape in people]
+    rng.shuffle(files)
+    queries = [f"{nom} {ape}" for nom, ape in people]
+    rng.shuffle(queries)
+    return files, queries
+
+def original_scan(files, queries):
+    # The loop sync_employees_and_docs.py used before PhotoIndex
+    available = {f.lower(): f for f in files}
+    hits = 0
+    for q in queries:
+        nombre = q.lower().replace("  ", " ").strip()
+        for fn in available:
+            if all(part in fn for part in nombre.split()):
+                hits += 1
+                break
+    return hits
+
+def indexed(files, queries):
+    index = PhotoIndex(files)
+    return sum(1 for q in queries if index.match(q).path)
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--scan-limit", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'fotos':>8} {'índice s':>10} {'aciertos':>9} {'escaneo s':>11} {'aciertos':>9} {'x':>8}")
+    for n in args.sizes:
+        files, queries = synthetic(n, args.seed)
+        hits_i, t_index = timed(indexed, files, queries)
+        if n <= args.scan_limit:
+            hits_s, t_scan = timed(original_scan, files, queries)
+            scan = f"{t_scan:>11.2f} {hits_s:>9}"
+        else:
+            # Quadratic: scale the time of a scan-limit sample by (n / limit)²
+            sub_files, sub_queries = synthetic(args.scan_limit, args.seed)
+            _, t_sub = timed(original_scan, sub_files, sub_queries)
+            t_scan = t_sub * (n / args.scan_limit) ** 2
+            scan = f"{'~' + format(t_scan, '.0f'):>11} {'-':>9}"
+        print(f"{n:>8} {t_index:>10.2f} {hits_i:>9} {scan} {t_scan / t_index:>8.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# bench_render_service.py — prueba de carga de render_service.py (latencias p50/p90/p99)
+#
+#   python benchmarks/bench_render_service.py [--employees 0] [--requests 2000] [--concurrency 4]
+#                                             [--cache-mb 64] [--seed 0]
+#
+# Arranca render_service.py en un proceso aparte (puerto libre) sobre public/ o,
+# con --employees N, sobre un conjunto sintético de synthetic.py, y lanza
+# peticiones desde --concurrency clientes con keep-alive en tres fases:
+#   frío          cada petición es un PDF distinto, nunca pedido: se genera
+#   popular       PDFs elegidos con una distribución sesgada (unos pocos se abren
+#                 mucho, como en la app): aciertos de la caché LRU salvo al principio
+#   revalidación  las mismas peticiones con If-None-Match del ETag ya recibido: 304
+# Por fase: peticiones/s, p50 / p90 / p99 / máx en ms y códigos de respuesta; al
+# final, /estado del servicio (aciertos, expulsiones, PDFs generados).
+
+import argparse, http.client, json, random, re, subprocess, sys, tempfile, threading, time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+sys.path.insert(0, str(ROOT))
+import data_access
+import synthetic
+from sync_employees_and_docs import STANDARD_DOCS
+
+def urls_for(empleados_path, nominas_path):
+    empleados, _ = data_access.load_empleados(empleados_path)
+    urls = [f"/nominas/{row['employee_id']}/{row['periodo']}" for row in data_access.load_nominas(nominas_path)]
+    urls += [f"/documentos/{e['id']}/{name[:-4]}" for e in empleados for name in STANDARD_DOCS]
+    return urls
+
+def start_service(empleados_path, nominas_path, cache_mb):
+    proc = subprocess.Popen([sys.executable, str(ROOT / "render_service.py"), "--port", "0", "--cache-mb", str(cache_mb),
+                             "--empleados", str(empleados_path), "--nominas", str(nominas_path)],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    match = re.search(r"http://([\d.]+):(\d+)", line)
+    if not match:
+        proc.kill()
+        raise SystemExit(f"❌ El servicio no arrancó: {line}{proc.stderr.read()}")
+    print(line.strip())
+    return proc, match.group(1), int(match.group(2))
+
+def client(host, port, urls, etags, results):
+    conn = http.client.HTTPConnection(host, port)
+    for url in urls:
+        headers = {"If-None-Match": etags[url]} if etags is not None and url in etags else {}
+        t0 = time.perf_counter()
+        conn.request("GET", url, headers=headers)
+        resp = conn.getresponse()
+        resp.read()
+        results.append((time.perf_counter() - t0, resp.status, url, resp.getheader("ETag")))
+    conn.close()
+
+def phase(name, host, port, urls, concurrency, etags=None):
+    # Round-robin split: every client gets the same mix
+    results = []
+    threads = [threading.Thread(target=client, args=(host, port, urls[i::concurrency], etags, results))
+               for i in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    seconds = time.perf_counter() - t0
+    lat = sorted(r[0] * 1000 for r in results)
+    pct = lambda p: lat[min(len(lat) - 1, int(p / 100 * len(lat)))]
+    codes = {}
+    for r in results:
+        codes[r[1]] = codes.get(r[1], 0) + 1
+    print(f"{name:>13} {len(results):>7,} {len(results) / seconds:>8.0f} {pct(50):>8.2f} {pct(90):>8.2f} "
+          f"{pct(99):>8.2f} {lat[-1]:>8.2f}  {' '.join(f'{c}×{n}' for c, n in sorted(codes.items()))}")
+    return {r[2]: r[3] for r in results if r[1] == 200}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=0, help="0 = los datos de public/")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--cache-mb", type=float, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.employees:
+            paths = synthetic.write_dataset(Path(tmp), args.employees, args.seed, nested_attendance=False)
+            empleados_path, nominas_path = paths["empleados"], paths["nominas"]
+        else:
+            empleados_path, nominas_path = data_access.EMPLEADOS_PATH, data_access.NOMINAS_PATH
+        urls = urls_for(empleados_path, nominas_path)
+        rng = random.Random(args.seed)
+        cold = rng.sample(urls, min(len(urls), args.requests))
+        popular = [urls[min(len(urls) - 1, int(rng.paretovariate(1.2)) - 1)] for _ in range(args.requests)]
+        rng.shuffle(urls)   # popularity independent of the URL order
+        print(f"{len(urls):,} PDFs posibles, {args.requests:,} peticiones, {args.concurrency} clientes")
+
+        proc, host, port = start_service(empleados_path, nominas_path, args.cache_mb)
+        try:
+            print(f"{'fase':>13} {'pet.':>7} {'pet/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'máx ms':>8}  códigos")
+            phase("frío", host, port, cold, args.concurrency)
+            etags = phase("popular", host, port, popular, args.concurrency)
+            phase("revalidación", host, port, popular, args.concurrency, etags)
+            conn = http.client.HTTPConnection(host, port)
+            conn.request("GET", "/estado")
+            print(f"📊 {json.dumps(json.loads(conn.getresponse().read()), ensure_ascii=False)}")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# bench_startup.py — arranque de los scripts sin y con la pila de PDFs cargada de antemano
+#
+#   python benchmarks/bench_startup.py [--repeat 5]
+#
+# Sobre una copia de los scripts y de public/ (para no escribir en el repo) mide,
+# en un proceso nuevo cada vez y quedándose con el mejor tiempo:
+#   ahora     el script tal cual: reportlab / PIL / PyPDF2 sólo se importan al dibujar o leer un PDF
+#   eager     el mismo script con esos módulos importados antes, como al principio de los scripts antiguos
+# para --help, la importación, sync --dry-run y nóminas --json-only, y comprueba que
+# esos caminos no cargan la pila de PDFs. Después, el logo de las nóminas: primera
+# vez (PIL decodifica y recodifica) frente a la copia ya guardada en .cache/logo/.
+
+import argparse, shutil, subprocess, sys, tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from bench_attendance_store import best_of
+
+HEAVY = ["reportlab.pdfgen.canvas", "reportlab.lib.utils", "reportlab.lib.colors", "PIL.Image", "PyPDF2"]
+GEN = "generate_nominas_2025_ultralight.py"
+SYNC = "sync_employees_and_docs.py"
+CASES = [
+    ("nóminas --help", GEN, ["--help"]),
+    ("import nóminas", None, ["generate_nominas_2025_ultralight"]),
+    ("nóminas --json-only", GEN, ["--json-only", "--seed", "1"]),
+    ("sync --help", SYNC, ["--help"]),
+    ("import sync", None, ["sync_employees_and_docs"]),
+    ("sync --dry-run", SYNC, ["--dry-run"]),
+]
+
+def workspace(tmp):
+    # Scripts + the inputs these paths read; outputs land in the copy
+    for script in ROOT.glob("*.py"):
+        shutil.copy2(script, tmp / script.name)
+    for rel in ["public/datos_empleados.json", "src/assets/elebilogo.png"]:
+        (tmp / rel).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(ROOT / rel, tmp / rel)
+    for rel in ["public/fotos_empleados", "public/documentos_empleados"]:
+        if (ROOT / rel).exists():
+            shutil.copytree(ROOT / rel, tmp / rel)
+
+def command(script, args, eager):
+    preload = "".join(f"import {m}; " for m in HEAVY) if eager else ""
+    if script is None:
+        code = f"{preload}import {args[0]}"
+    else:
+        code = f"{preload}import runpy, sys; sys.argv = {[script, *args]!r}; runpy.run_path({script!r}, run_name='__main__')"
+    return [sys.executable, "-c", code]
+
+def loads_pdf_stack(script, args, cwd):
+    # Runs the path once more and reports, at exit, whether any PDF module got imported
+    check = f"import atexit, sys; atexit.register(lambda: print(any(m.split('.')[0] in sys.modules for m in {HEAVY!r})))\n"
+    proc = subprocess.run([sys.executable, "-c", check + command(script, args, False)[2]],
+                          cwd=cwd, capture_output=True, text=True)
+    return proc.stdout.strip().splitlines()[-1] == "True"
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        workspace(tmp)
+        print(f"{'camino':>22} {'ahora ms':>9} {'eager ms':>9} {'x':>6} {'pila PDF':>9}")
+        for name, script, extra in CASES:
+            run = lambda eager: subprocess.run(command(script, extra, eager), cwd=tmp, check=True,
+                                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            run(False)      # warm the page cache and __pycache__
+            lazy = best_of(lambda: run(False), args.repeat)
+            eager = best_of(lambda: run(True), args.repeat)
+            loaded = loads_pdf_stack(script, extra, tmp)
+            print(f"{name:>22} {lazy * 1000:>9.1f} {eager * 1000:>9.1f} {eager / lazy:>6.2f} "
+                  f"{'cargada' if loaded else 'no':>9}")
+            assert not loaded, f"{name}: ha cargado reportlab / PIL / PyPDF2"
+
+        sys.path.insert(0, str(tmp))
+        import generate_nominas_2025_ultralight as gen
+        gen.LOGO_CACHE_DIR = tmp / ".cache" / "logo"
+
+        def cold():
+            shutil.rmtree(gen.LOGO_CACHE_DIR, ignore_errors=True)
+            return gen.logo_bytes()
+
+        reference = cold()
+        assert gen.logo_bytes() == reference, "la copia en caché no coincide con el logo procesado"
+        t_cold = best_of(cold, args.repeat)
+        cold()
+        t_warm = best_of(gen.logo_bytes, args.repeat)
+        print(f"logo: procesado {t_cold * 1000:.2f} ms  |  desde .cache/logo {t_warm * 1000:.3f} ms  "
+              f"({t_cold / t_warm:.0f}x, {len(reference):,} bytes)")
+
+if __name__ == "__main__":
+    main()
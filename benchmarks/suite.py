@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# suite.py — benchmarks de los caminos calientes a 100 / 1k / 10k / 50k empleados
+#
+#   python benchmarks/suite.py [--sizes 100 1000 10000 50000] [--cases load_employees photo_match ...]
+#                              [--seed 0] [--pdf-limit 600] [--nested-limit 1000] [--out results.json]
+#   python benchmarks/suite.py --compare benchmarks/results/OLD.json benchmarks/results/NEW.json
+#
+# Genera con synthetic.py (semilla fija) un conjunto de datos por tamaño y mide
+# cada caso en un proceso nuevo, para que el pico de RSS sea sólo suyo:
+#
+#   load_employees     generate_nominas.load_employees() sin caché de data_access
+#   calc_nomina        calc_nomina() + build_row() de 12 meses, escritos con NominasWriter
+#   create_pdf         calc_nomina() + render_pdf() (lo que hace create_pdf()), hasta --pdf-limit nóminas
+#   gen_pdf            sync_employees_and_docs.gen_pdf() de los 5 documentos, hasta --pdf-limit PDFs
+#   photo_match        PhotoIndex.from_dir() + match() de cada empleado
+#   attendance_scalar  randomize_nested() + attendance_store.save(), hasta --nested-limit empleados
+#   attendance_numpy   simulate_store() + almacén columnar escrito
+#
+# Por caso y tamaño guarda segundos, pico de RSS, bytes escritos y elementos
+# procesados en benchmarks/results/<commit>.json (o --out), que --compare
+# enfrenta con otro resultado. Los PDFs se limitan porque a 50k empleados son
+# 600k ficheros; el ritmo por elemento se compara igual.
+
+import argparse, json, os, platform, random, resource, subprocess, sys, tempfile, time
+from datetime import datetime
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+sys.path.insert(0, str(ROOT))
+import jsonio
+import synthetic
+
+RESULTS_DIR = HERE / "results"
+CASES = ["load_employees", "calc_nomina", "create_pdf", "gen_pdf", "photo_match",
+         "attendance_scalar", "attendance_numpy"]
+
+# ---------- cases (run in the child process) ----------
+
+def _load_employees(data, out, limits):
+    import generate_nominas_2025_ultralight as gen
+    gen.EMP_FILE = data / "datos_empleados.json"
+    t0 = time.perf_counter()
+    employees = gen.load_employees(random.Random(0))
+    return time.perf_counter() - t0, len(employees), 0
+
+def _calc_nomina(data, out, limits):
+    import generate_nominas_2025_ultralight as gen
+    gen.EMP_FILE = data / "datos_empleados.json"
+    employees = gen.load_employees(random.Random(0))
+    rng = random.Random(0)
+    target = out / "NOMINAS.json"
+    t0 = time.perf_counter()
+    writer = gen.NominasWriter(target, shards_dir=out / "shards")
+    for mm_idx in range(1, len(gen.MONTHS) + 1):
+        periodo = f"{gen.YEAR}-{mm_idx:02d}"
+        for e in employees:
+            bruto, neto, brk = gen.calc_nomina(e["salario_base"], rng)
+            writer.write(gen.build_row(e, mm_idx, periodo, bruto, neto, brk))
+    writer.commit()
+    return time.perf_counter() - t0, writer.count, target.stat().st_size
+
+def _create_pdf(data, out, limits):
+    import generate_nominas_2025_ultralight as gen
+    gen.EMP_FILE = data / "datos_empleados.json"
+    employees = gen.load_employees(random.Random(0))
+    rng = random.Random(0)
+    pages = [(e, f"{gen.YEAR}-{mm_idx:02d}") for mm_idx in range(1, 13) for e in employees][:limits["pdf"]]
+    t0 = time.perf_counter()
+    paths = []
+    for e, periodo in pages:
+        bruto, neto, brk = gen.calc_nomina(e["salario_base"], rng)
+        paths.append(gen.render_pdf(f"{e['nombre']} {e['apellidos']} {e['employee_id']}", e["puesto"],
+                                    e["salario_base"], periodo, bruto, neto, brk, out_dir=out))
+    seconds = time.perf_counter() - t0
+    return seconds, len(paths), sum(p.stat().st_size for p in paths)
+
+def _gen_pdf(data, out, limits):
+    import sync_employees_and_docs as sync
+    employees = jsonio.load(data / "datos_empleados.json")
+    docs = list(sync.STANDARD_DOCS.items())
+    work = [(e, filename, title) for e in employees for filename, title in docs][:limits["pdf"]]
+    t0 = time.perf_counter()
+    paths = []
+    for e, filename, title in work:
+        path = out / f"{e['id']}_{filename}"
+        sync.gen_pdf(e, title, path)
+        paths.append(path)
+    seconds = time.perf_counter() - t0
+    return seconds, len(paths), sum(p.stat().st_size for p in paths)
+
+def _photo_match(data, out, limits):
+    from photo_index import PhotoIndex
+    employees = jsonio.load(data / "datos_empleados.json")
+    t0 = time.perf_counter()
+    index = PhotoIndex.from_dir(data / "fotos_empleados")
+    found = sum(1 for e in employees if index.match(f"{e['nombres']} {e['apellidos']}").path)
+    seconds = time.perf_counter() - t0
+    return seconds, found, 0
+
+def _attendance_scalar(data, out, limits):
+    import attendance_store
+    import randomize_attendace as sim
+    path = data / "attendance_2025.json"
+    if not path.exists():
+        return None
+    nested = jsonio.load(path)
+    t0 = time.perf_counter()
+    sim.randomize_nested(nested, ["2025"], random.Random(0))
+    attendance_store.save(nested, out / "attendance_2025.json", out / "attendance_2025.cols.json")
+    seconds = time.perf_counter() - t0
+    records = sum(len(recs) for years in nested.values() for recs in years["2025"].values())
+    return seconds, records, sum(p.stat().st_size for p in out.iterdir())
+
+def _attendance_numpy(data, out, limits):
+    import attendance_store
+    import randomize_attendace as sim
+    from bench_attendance_sim import skeleton_store
+    n = len(jsonio.load(data / "datos_empleados.json"))
+    store = skeleton_store(n, [2025])
+    t0 = time.perf_counter()
+    records = sim.simulate_store(store, ["2025"], seed=0)
+    for entry in store["employees"].values():
+        for block in entry["years"].values():
+            attendance_store.pack_block(block)
+    attendance_store.write_json(out / "attendance_2025.cols.json", store)
+    seconds = time.perf_counter() - t0
+    return seconds, records, (out / "attendance_2025.cols.json").stat().st_size
+
+def peak_rss_mb():
+    # VmHWM belongs to this process image; ru_maxrss on Linux carries over the
+    # parent's peak through fork/exec, which would hide small cases
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024   # bytes on macOS, KiB elsewhere
+
+def run_case(case, data, limits):
+    import data_access
+    data_access.USE_SIDECAR = False     # measure the real parse, and leave no sidecars of temp data behind
+    with tempfile.TemporaryDirectory() as tmp:
+        result = globals()[f"_{case}"](Path(data), Path(tmp), limits)
+    if result is None:
+        return None
+    seconds, items, nbytes = result
+    return {"seconds": round(seconds, 4), "items": items, "bytes": nbytes, "peak_rss_mb": round(peak_rss_mb(), 1),
+            "per_item_ms": round(seconds * 1000 / items, 4) if items else None}
+
+# ---------- harness ----------
+
+def commit_id():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "sin-git"
+
+def measure(case, data, limits):
+    cmd = [sys.executable, __file__, "--child", case, str(data), json.dumps(limits)]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"código {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def compare(old_path, new_path):
+    old, new = jsonio.load(old_path), jsonio.load(new_path)
+    index = {(r["case"], r["size"]): r for r in old["results"]}
+    print(f"{old['commit']} → {new['commit']}")
+    print(f"{'caso':>18} {'tamaño':>7} {'s antes':>9} {'s ahora':>9} {'x':>6} {'RSS MB':>15} {'bytes':>23}")
+    for r in new["results"]:
+        o = index.get((r["case"], r["size"]))
+        if not o or "seconds" not in o or "seconds" not in r:
+            continue
+        # Per item, so runs with a different --pdf-limit still compare
+        speedup = (o["per_item_ms"] / r["per_item_ms"]) if o.get("per_item_ms") and r.get("per_item_ms") else 0
+        print(f"{r['case']:>18} {r['size']:>7} {o['seconds']:>9.3f} {r['seconds']:>9.3f} {speedup:>6.2f} "
+              f"{o['peak_rss_mb']:>7.1f}→{r['peak_rss_mb']:<7.1f} {o['bytes']:>11,}→{r['bytes']:<11,}")
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _, _, case, data, limits = sys.argv
+        print(json.dumps(run_case(case, data, json.loads(limits))))
+        return
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pdf-limit", type=int, default=600, help="Máximo de PDFs por caso de PDF")
+    parser.add_argument("--nested-limit", type=int, default=1000,
+                        help="Máximo de empleados para el JSON anidado de asistencia (motor escalar)")
+    parser.add_argument("--out", default=None, help="Fichero de resultados (por defecto benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("ANTES", "AHORA"))
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    limits = {"pdf": args.pdf_limit}
+    report = {"commit": commit_id(), "date": datetime.now().isoformat(timespec="seconds"),
+              "python": platform.python_version(), "host": platform.node(), "cpus": os.cpu_count(),
+              "json_backend": jsonio.BACKEND, "seed": args.seed, "limits": {**limits, "nested": args.nested_limit},
+              "results": []}
+    print(f"{'caso':>18} {'tamaño':>7} {'segundos':>9} {'elementos':>10} {'ms/elem':>9} {'RSS MB':>8} {'bytes':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            data = Path(tmp) / str(size)
+            t0 = time.perf_counter()
+            synthetic.write_dataset(data, size, args.seed, nested_attendance=size <= args.nested_limit)
+            print(f"— {size} empleados (datos generados en {time.perf_counter() - t0:.1f}s)")
+            for case in args.cases:
+                result = measure(case, data, limits)
+                if result is None:
+                    print(f"{case:>18} {size:>7}   omitido (más de --nested-limit empleados)")
+                    continue
+                report["results"].append({"case": case, "size": size, **result})
+                if "error" in result:
+                    print(f"{case:>18} {size:>7}   ❌ {result['error']}")
+                    continue
+                print(f"{case:>18} {size:>7} {result['seconds']:>9.3f} {result['items']:>10,} "
+                      f"{result['per_item_ms'] or 0:>9.4f} {result['peak_rss_mb']:>8.1f} {result['bytes']:>13,}")
+            # Results so far survive an interrupted run
+            out = Path(args.out) if args.out else RESULTS_DIR / f"{report['commit']}.json"
+            out.parent.mkdir(parents=True, exist_ok=True)
+            jsonio.write_json(out, report)
+    print(f"📄 Resultados: {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# synthetic.py — datos sintéticos y reproducibles a escala de producción para los benchmarks
+#
+#   employees(n, seed)            registros como los de datos_empleados.json
+#   photo_files(employees, seed)  nombres de fichero de fotos (tildes, mayúsculas, extensiones variadas)
+#   attendance(employees, seed)   JSON anidado de asistencia (empleado → año → mes → registros)
+#   payroll(employees, seed)      filas de NOMINAS.json
+#   write_dataset(dir, n, seed)   todo lo anterior en disco, con la estructura de public/
+#
+# Los empleados se construyen a partir de los registros reales de
+# public/datos_empleados.json (mismos bloques y campos), cambiando id, nombre,
+# puesto, salario y fechas, así que recorren los mismos caminos que los reales.
+# Misma semilla → mismos bytes.
+
+import copy, random, sys, unicodedata
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import attendance_store
+import jsonio
+
+NOMBRES = ["María", "José", "Ángel", "Íñigo", "Carla", "Luis", "Pedro", "Germán", "Víctor", "Manuel",
+           "Jessica", "Santiago", "Damián", "Policarpo", "Anselmo", "Gabriel", "Felipe", "Inmaculada",
+           "Teresa", "Salomé", "Crescencia", "Bonifacio", "Remedios", "Fortunato"]
+APELLIDOS = ["Ondo", "Mañe", "Nchama", "Obama", "Esono", "Avomo", "Ndong", "Biong", "Nve", "Ela",
+             "Mbuña", "Abaga", "Epiko", "Massoko", "Medina", "Sisa", "Bioko", "Dougan", "Makina",
+             "Mikue", "Eyang", "Nsue", "Oyono", "Asumu"]
+PUESTOS = [("Técnico de Operaciones", "Operaciones", 650_000), ("Administrativo", "Administración", 550_000),
+           ("Contable", "Finanzas", 900_000), ("Jefe de Área", "Operaciones", 1_600_000),
+           ("Analista de Sistemas", "Tecnología", 1_200_000), ("Conductor", "Logística", 450_000),
+           ("Directora de Recursos Humanos", "Recursos Humanos", 3_100_000)]
+EXTS = [".jpg", ".jpeg", ".png", ".webp"]
+MONTH_NAMES = list(attendance_store.MONTHS_ES)
+OUTCOMES = [  # (observaciones, explicacion, entrada, salida), as randomize_attendace.py draws them
+    ("Completo", "", "09:00:00", None),
+    ("Tarde", "Retraso leve.", "09:20:00", None),
+    ("Incompleto", "Salida anticipada.", "09:00:00", "15:30:00"),
+    ("Ausencia Injustificada", "", None, None),
+    ("Comisión de servicio", "Visita/gestión fuera de oficina.", "09:00:00", None),
+    ("Teletrabajo", "Actividad remota autorizada.", "09:00:00", None),
+]
+WEIGHTS = [0.65, 0.12, 0.10, 0.05, 0.04, 0.04]
+
+def _templates():
+    data = jsonio.load(ROOT / "public" / "datos_empleados.json")
+    return data["empleados"] if isinstance(data, dict) else data
+
+def employees(n, seed=0):
+    rng = random.Random(seed)
+    templates = _templates()
+    out = []
+    for i in range(n):
+        e = copy.deepcopy(templates[i % len(templates)])
+        nombres = " ".join(rng.sample(NOMBRES, rng.choice((1, 2))))
+        apellidos = " ".join(rng.sample(APELLIDOS, 2))
+        puesto, departamento, base = rng.choice(PUESTOS)
+        salario = round(base * rng.uniform(0.85, 1.3), -3)
+        emp_id = 300000 + i
+        e.update({
+            "id": emp_id,
+            "nombres": nombres,
+            "apellidos": apellidos,
+            "nombrecompleto": f"{nombres} {apellidos}",
+            "puesto": puesto,
+            "departamento": departamento,
+            "salariomensual": salario,
+            "foto": f"./fotos_empleados/{nombres} {apellidos}.jpg",
+        })
+        ip = e.setdefault("informacion_personal", {})
+        ip["fecha_nacimiento"] = (date(1960, 1, 1) + timedelta(days=rng.randrange(15000))).isoformat()
+        ip["dependientes"] = rng.randint(0, 5)
+        ib = e.setdefault("informacion_bancaria", {})
+        ib["salario_mensual_cfa"] = salario
+        ib["salario_anual_cfa"] = salario * 12
+        e.setdefault("datos_carrera", {})["fecha_ingreso"] = (
+            date(2005, 1, 1) + timedelta(days=rng.randrange(7000))).isoformat()
+        e["documentacion"] = {k: v.replace(str(templates[i % len(templates)]["id"]), str(emp_id))
+                              for k, v in e.get("documentacion", {}).items()}
+        out.append(e)
+    return out
+
+def _fold(text):
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+def photo_files(emps, seed=0, missing=0.02):
+    # One photo per employee (a few missing), names spelled the way people save them
+    rng = random.Random(seed)
+    stems, files = set(), []
+    for e in emps:
+        if rng.random() < missing:
+            continue
+        name = f"{e['nombres']} {e['apellidos']}"
+        if rng.random() < 0.3:
+            name = _fold(name)
+        if rng.random() < 0.1:
+            name = name.upper()
+        if name.lower() in stems:
+            name = f"{name} {e['id']}"   # namesakes: disambiguated by id, as HR does
+        stems.add(name.lower())
+        files.append(name + rng.choice(EXTS))
+    return sorted(files)
+
+def attendance(emps, seed=0, year=2025):
+    rng = random.Random(seed)
+    data = {}
+    for e in emps:
+        months = {m: [] for m in MONTH_NAMES}
+        d = date(year, 1, 1)
+        while d.year == year:
+            if d.weekday() < 5:
+                obs, expl, entrada, salida = rng.choices(OUTCOMES, WEIGHTS)[0]
+                salida = salida or ("14:00:00" if d.weekday() == 4 else "17:00:00")
+                iso = d.isoformat()
+                months[MONTH_NAMES[d.month - 1]].append({
+                    "day": d.day,
+                    "hora_entrada": f"{iso}T{entrada}" if entrada else None,
+                    "hora_salida": f"{iso}T{salida}" if entrada else None,
+                    "observaciones": obs,
+                    "explicacion": expl,
+                })
+            d += timedelta(days=1)
+        data[f"{e['nombres']} {e['apellidos']} {e['id']}"] = {str(year): months}
+    return data
+
+def payroll(emps, seed=0, year=2025):
+    import generate_nominas_2025_ultralight as gen
+    rng = random.Random(seed)
+    rows = []
+    for mm_idx in range(1, 13):
+        periodo = f"{year}-{mm_idx:02d}"
+        for e in emps:
+            row = {"employee_id": e["id"], "nombre": e["nombres"], "apellidos": e["apellidos"],
+                   "puesto": e["puesto"], "salario_base": e["salariomensual"]}
+            bruto, neto, brk = gen.calc_nomina(row["salario_base"], rng)
+            rows.append(gen.build_row(row, mm_idx, periodo, bruto, neto, brk))
+    return rows
+
+def write_dataset(directory, n, seed=0, nested_attendance=True):
+    """Writes public/-like files for n employees under `directory`. Returns {name: path}."""
+    directory = Path(directory)
+    photos = directory / "fotos_empleados"
+    photos.mkdir(parents=True, exist_ok=True)
+    emps = employees(n, seed)
+    paths = {"empleados": directory / "datos_empleados.json", "fotos": photos,
+             "nominas": directory / "NOMINAS.json"}
+    jsonio.write_json(paths["empleados"], emps, compact=False)
+    for name in photo_files(emps, seed):
+        (photos / name).touch()
+    jsonio.write_json(paths["nominas"], payroll(emps, seed), compact=False)
+    if nested_attendance:
+        paths["asistencia"] = directory / "attendance_2025.json"
+        jsonio.write_json(paths["asistencia"], attendance(emps, seed), compact=False)
+    return paths
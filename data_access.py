@@ -0,0 +1,141 @@
+# data_access.py — shared, memoized loaders for the public/*.json datasets
+#
+# Every loader parses + normalizes its file once and caches the result keyed by
+# (dataset, path, mtime, size):
+#   * in process, as pickled bytes, so each call still returns a fresh object
+#     the caller may mutate (sync_employees_and_docs.py edits records in place);
+#   * on disk, as a pickle sidecar under .cache/data_access/, so the next run of
+#     any script skips JSON parsing entirely until the file changes.
+# Any write to the JSON (new mtime or size) invalidates both, as does one to a
+# file the dataset also depends on (the employee journal).
+
+import hashlib, os, pickle
+from pathlib import Path
+
+import attendance_store
+import employee_journal
+import jsonio
+
+ROOT = Path(__file__).resolve().parent
+PUBLIC = ROOT / "public"
+EMPLEADOS_PATH = employee_journal.SNAPSHOT_PATH
+NOMINAS_PATH = PUBLIC / "NOMINAS.json"
+ATTENDANCE_PATH = attendance_store.JSON_PATH
+ATTENDANCE_STORE_PATH = attendance_store.STORE_PATH
+
+CACHE_DIR = ROOT / ".cache" / "data_access"
+CACHE_VERSION = 1          # bump when a normalizer changes what it returns
+USE_SIDECAR = os.environ.get("ELEBI_NO_DATA_CACHE") is None
+
+_MEMO = {}   # (dataset, path) → (key, pickled bytes)
+
+# ---------- cache ----------
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def _key(dataset, path: Path, extra=()):
+    st = os.stat(path)
+    return (dataset, CACHE_VERSION, str(path), st.st_mtime_ns, st.st_size, *map(_stat, extra))
+
+def _sidecar(dataset, path: Path) -> Path:
+    digest = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:12]
+    return CACHE_DIR / f"{dataset}-{path.stem}-{digest}.pickle"
+
+def _read_sidecar(sidecar: Path, key):
+    try:
+        with open(sidecar, "rb") as f:
+            if pickle.load(f) != key:
+                return None
+            return f.read()
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        return None
+
+def _write_sidecar(sidecar: Path, key, blob):
+    try:
+        sidecar.parent.mkdir(parents=True, exist_ok=True)
+        tmp = sidecar.with_name(sidecar.name + f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(key, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.write(blob)
+        os.replace(tmp, sidecar)
+    except OSError:
+        pass  # the cache is an optimization; a read-only checkout still works
+
+def cached_load(dataset, path, loader, extra=()):
+    """loader(path) through the in-process memo and the on-disk sidecar; `extra` files are part of the key."""
+    path = Path(path).resolve()
+    key = _key(dataset, path, extra)
+    memo = _MEMO.get((dataset, path))
+    if memo is not None and memo[0] == key:
+        return pickle.loads(memo[1])
+    sidecar = _sidecar(dataset, path)
+    blob = _read_sidecar(sidecar, key) if USE_SIDECAR else None
+    if blob is None:
+        blob = pickle.dumps(loader(path), protocol=pickle.HIGHEST_PROTOCOL)
+        if USE_SIDECAR:
+            _write_sidecar(sidecar, key, blob)
+    _MEMO[(dataset, path)] = (key, blob)
+    return pickle.loads(blob)
+
+def clear():
+    _MEMO.clear()
+
+def _read_json(path):
+    return jsonio.load(path)
+
+# ---------- employees ----------
+
+def _employees_file(path):
+    data, _ = employee_journal.load(path)
+    # The file is either a list or has {"empleados":[...]} — handle both.
+    if isinstance(data, dict) and "empleados" in data:
+        return {"empleados": data["empleados"], "wrapped": True}
+    if isinstance(data, list):
+        return {"empleados": data, "wrapped": False}
+    raise ValueError("Formato de JSON no reconocido (lista o { empleados: [] })")
+
+def load_empleados(path=EMPLEADOS_PATH):
+    """(records, wrapped): datos_empleados.json records with its journal applied, and whether the
+    file was {"empleados": [...]}."""
+    loaded = cached_load("empleados", path, _employees_file, extra=[employee_journal.journal_path(path)])
+    return loaded["empleados"], loaded["wrapped"]
+
+def dump_empleados(empleados, wrapped):
+    # Inverse of load_empleados(): the object to write back
+    return {"empleados": empleados} if wrapped else empleados
+
+def employee_fields(e: dict) -> dict:
+    """Field fallbacks shared by every tool: raw values, no trimming, salary unparsed."""
+    return {
+        "id": e.get("id"),
+        "nombre": e.get("nombres") or e.get("nombre") or e.get("nombrecompleto") or "",
+        "apellidos": e.get("apellidos") or e.get("apellido") or "",
+        "puesto": e.get("puesto") or e.get("descripcion_puesto"),
+        "salario": e.get("salariomensual") or e.get("salario_base"),
+    }
+
+# ---------- attendance ----------
+
+def load_attendance(path=ATTENDANCE_PATH):
+    """Attendance in the nested employee → year → month → records shape (either file format)."""
+    return cached_load("attendance", path, attendance_store.load_nested)
+
+def load_attendance_store(path=ATTENDANCE_STORE_PATH, fallback=ATTENDANCE_PATH):
+    """The columnar attendance store (columns unpacked), built from `fallback` if `path` is missing."""
+    if Path(path).exists():
+        return cached_load("attendance-store", path, attendance_store.load)
+    return attendance_store.encode(load_attendance(fallback))
+
+# ---------- payroll ----------
+
+def load_nominas(path=NOMINAS_PATH):
+    """NOMINAS.json rows (a list; an object is taken as its values)."""
+    def load(p):
+        rows = _read_json(p)
+        return rows if isinstance(rows, list) else list(rows.values())
+    return cached_load("nominas", path, load)
@@ -3,6 +3,7 @@ const path = require("path");
 const fs = require("fs");
 const { Low } = require("lowdb");
 const { JSONFile } = require("lowdb/node");
+const { loadEmployees } = require("../utils/employeeJournal.cjs");
 
 const seedFile = path.join(__dirname, "../public/datos_empleados.json");
 const seedFotos = path.join(__dirname, "../public/fotos_empleados");
@@ -25,8 +26,8 @@ async function initDB(electronApp) {
     try {
       console.log("🌱 Seeding database from:", seedFile);
 
-      const raw = fs.readFileSync(seedFile, "utf-8");
-      const seedData = JSON.parse(raw);
+      // Snapshot plus its change journal
+      const seedData = loadEmployees(seedFile).data;
 
       const empleadosArray = seedData.map((emp, index) => {
         // Handle photo copy if exists
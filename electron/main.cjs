@@ -3,6 +3,7 @@ const path = require("path");
 const fs = require("fs");
 const { initDB } = require("./localDB.cjs");
 const { mergeEmployeeRecord } = require("../utils/mergeEmployeeRecord.cjs");
+const { updateEmployee } = require("../utils/employeeJournal.cjs");
 const http = require("http");
 const MBTiles = require("@mapbox/mbtiles");
 
@@ -280,12 +281,8 @@ async function persistEmpleadoEnJson(patch) {
       console.warn("⚠️ datos_empleados.json no encontrado, se omite la sincronización");
       return;
     }
-    const raw = fs.readFileSync(datosJSONPath, "utf8");
-    const list = JSON.parse(raw);
-    const index = list.findIndex((emp) => String(emp.id) === String(patch.id));
-    if (index === -1) return;
-    list[index] = mergeEmployeeRecord(list[index], patch);
-    fs.writeFileSync(datosJSONPath, JSON.stringify(list, null, 2), "utf8");
+    // Journaled, not rewritten: see utils/employeeJournal.cjs
+    if (!updateEmployee(datosJSONPath, patch.id, patch, mergeEmployeeRecord)) return;
     console.log(`💾 datos_empleados.json actualizado (ID ${patch.id})`);
   } catch (error) {
     console.error("❌ Error sincronizando datos_empleados.json:", error);
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# employee_journal.py — append-only change journal for datos_empleados.json
+#
+# Rewriting the whole snapshot on every sync made every consumer re-download and
+# re-parse it, even when nothing had changed. Writers now record per-employee,
+# field-level diffs in datos_empleados.journal.jsonl, one JSON object per line:
+#
+#   {"journal": 1, "base": 40, "snapshot": {"size": ..., "mtime_ns": ..., "sha256": ...}}
+#   {"seq": 41, "id": 202001, "set": {"foto": "public/fotos_empleados/..."}}
+#   {"seq": 42, "id": 202007, "set": {...}, "unset": ["campo"]}
+#
+# The first line says which snapshot the entries apply to and the sequence
+# number it already includes (base). Readers apply the entries with
+# seq > base (or > the last seq they saw) to the snapshot, by employee id;
+# a reader whose last seq is below base reloads the snapshot. Applying an
+# entry twice is harmless, so a crash between the two steps of a compaction
+# never corrupts what readers see.
+#
+# record() appends the diff (nothing at all when there is none) and compacts
+# when the journal outgrows COMPACT_RATIO of the snapshot; compact() folds the
+# journal back into the snapshot and starts an empty one at the same seq. A
+# change the journal cannot express (employees added, removed or reordered) or
+# a snapshot edited by hand since the last compaction is written as a full
+# snapshot, with base moved past every seq so cached readers reload.
+#
+# Writers (record(), compact, utils/employeeJournal.cjs) hold
+# datos_empleados.journal.lock while they read and write, so an edit made in
+# the app between a script's load and its write is kept: a compaction folds
+# the journal on disk, and a full snapshot replays the entries appended after
+# the seq the script loaded at.
+#
+#   python employee_journal.py status
+#   python employee_journal.py since 40
+#   python employee_journal.py compact
+#
+# data_access.load_empleados() and src/utils/employeeJournal.ts apply it.
+
+import argparse, contextlib, hashlib, os, sys, time
+from pathlib import Path
+
+import jsonio
+
+ROOT = Path(__file__).resolve().parent
+SNAPSHOT_PATH = ROOT / "public" / "datos_empleados.json"
+VERSION = 1
+COMPACT_RATIO = 0.25   # compact once the journal is a quarter of the snapshot's size
+LOCK_TIMEOUT = 10.0    # seconds to wait for another writer
+LOCK_STALE = 60.0      # a lock this old was left behind by a writer that crashed
+
+# ---------- reading ----------
+
+def journal_path(snapshot) -> Path:
+    snapshot = Path(snapshot)
+    return snapshot.with_name(f"{snapshot.stem}.journal.jsonl")
+
+def read(path):
+    """(header or None, entries). A torn last line (interrupted append) is ignored."""
+    try:
+        with open(path, "rb") as f:
+            lines = f.read().split(b"\n")
+    except FileNotFoundError:
+        return None, []
+    header, entries = None, []
+    for line in lines[:-1]:   # only complete lines: everything before the final "\n"
+        try:
+            obj = jsonio.loads(line)
+        except ValueError:
+            break
+        if header is None:
+            if obj.get("journal") != VERSION:
+                raise ValueError(f"{path}: versión de diario desconocida {obj.get('journal')!r}")
+            header = obj
+        else:
+            entries.append(obj)
+    return header, entries
+
+def last_seq(header, entries):
+    if entries:
+        return entries[-1]["seq"]
+    return header["base"] if header else 0
+
+def current_seq(snapshot=SNAPSHOT_PATH):
+    """The seq a load() made now would be at; take it before loading to pass as record(since=...)."""
+    return last_seq(*read(journal_path(snapshot)))
+
+def apply(empleados, entries, since=0):
+    """Applies the entries with seq > since to the records, in place. Returns how many applied."""
+    by_id = {str(emp.get("id")): emp for emp in empleados}
+    applied = 0
+    for entry in entries:
+        if entry["seq"] <= since:
+            continue
+        emp = by_id.get(str(entry["id"]))
+        if emp is None:
+            continue
+        emp.update(entry.get("set", {}))
+        for name in entry.get("unset", ()):
+            emp.pop(name, None)
+        applied += 1
+    return applied
+
+def load(snapshot=SNAPSHOT_PATH):
+    """(snapshot data with the journal applied, seq): the raw JSON shape, list or {"empleados": [...]}."""
+    data = jsonio.load(snapshot)
+    header, entries = read(journal_path(snapshot))
+    empleados = data["empleados"] if isinstance(data, dict) and "empleados" in data else data
+    if isinstance(empleados, list):
+        apply(empleados, entries, header["base"] if header else 0)
+    return data, last_seq(header, entries)
+
+# ---------- writing ----------
+
+def lock_path(snapshot) -> Path:
+    snapshot = Path(snapshot)
+    return snapshot.with_name(f"{snapshot.stem}.journal.lock")
+
+@contextlib.contextmanager
+def locked(snapshot, timeout=LOCK_TIMEOUT):
+    """One writer at a time, across processes: an O_EXCL lock file, the same one the app's writer takes."""
+    path = lock_path(snapshot)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.stat(path).st_mtime > LOCK_STALE:
+                    os.unlink(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{path} lleva {timeout:.0f}s bloqueado por otro proceso")
+            time.sleep(0.05)
+    os.write(fd, str(os.getpid()).encode())
+    os.close(fd)
+    try:
+        yield
+    finally:
+        path.unlink(missing_ok=True)
+
+def diff(before, after):
+    """Field-level changes from `before` to `after`, or None if the ids (or their order) differ."""
+    ids = [emp.get("id") for emp in after]
+    if len(before) != len(after) or None in ids or len(set(map(str, ids))) != len(ids):
+        return None
+    changes = []
+    for old, new in zip(before, after):
+        if old.get("id") != new.get("id"):
+            return None
+        if old == new:
+            continue
+        change = {"id": new["id"], "set": {k: v for k, v in new.items() if k not in old or old[k] != v}}
+        unset = [k for k in old if k not in new]
+        if unset:
+            change["unset"] = unset
+        changes.append(change)
+    return changes
+
+def snapshot_state(snapshot):
+    st = os.stat(snapshot)
+    h = hashlib.sha256()
+    with open(snapshot, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": h.hexdigest()}
+
+def snapshot_matches(snapshot, header):
+    # (size, mtime) first; a hash only when they moved (touched, copied, edited)
+    expected = header.get("snapshot") or {}
+    st = os.stat(snapshot)
+    if st.st_size == expected.get("size") and st.st_mtime_ns == expected.get("mtime_ns"):
+        return True
+    return st.st_size == expected.get("size") and snapshot_state(snapshot)["sha256"] == expected.get("sha256")
+
+def _write_header(path, base, snapshot):
+    header = {"journal": VERSION, "base": base, "snapshot": snapshot_state(snapshot)}
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(jsonio.dumps(header, True) + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def _append(path, lines):
+    with open(path, "r+b") as f:
+        # Drop a torn line left by an interrupted append, then add ours in one write
+        data = f.read()
+        f.seek(data.rfind(b"\n") + 1)
+        f.truncate()
+        f.write(b"".join(jsonio.dumps(line, True) + b"\n" for line in lines))
+        f.flush()
+        os.fsync(f.fileno())
+
+def compact(snapshot, data, seq):
+    """Writes `data` as the snapshot and an empty journal whose base is `seq`. Hold locked()."""
+    jsonio.write_json(snapshot, data)
+    _write_header(journal_path(snapshot), seq, snapshot)
+
+def record(snapshot, data, before, after, compact_ratio=COMPACT_RATIO, since=None):
+    """Persists `after` (the records inside `data`), loaded from the snapshot + journal as `before`.
+
+    `since` is current_seq() from before that load: entries other writers append after it
+    are replayed on top if the snapshot has to be rewritten whole.
+    Returns {"entries": appended, "seq": last seq, "written": paths touched, "compacted": bool}.
+    """
+    snapshot = Path(snapshot)
+    path = journal_path(snapshot)
+    with locked(snapshot):
+        header, entries = read(path)
+        seq = last_seq(header, entries)
+        changes = diff(before, after)
+        stats = {"entries": 0, "seq": seq, "written": [], "compacted": False}
+        edited = snapshot.exists() and header is not None and not snapshot_matches(snapshot, header)
+        if changes is None or edited or not snapshot.exists():
+            # Not expressible as diffs: full snapshot, and every cached reader reloads
+            newer = [entry for entry in entries if since is not None and entry["seq"] > since]
+            stats["seq"] = seq + 1
+            compact(snapshot, data, stats["seq"])
+            if newer:
+                _append(path, [{**entry, "seq": stats["seq"] + i} for i, entry in enumerate(newer, 1)])
+                stats["seq"] += len(newer)
+            stats.update(written=[snapshot, path], compacted=True)
+            return stats
+        if not changes:
+            return stats
+        if header is None:
+            _write_header(path, seq, snapshot)
+        _append(path, [{"seq": seq + i, **change} for i, change in enumerate(changes, 1)])
+        seq += len(changes)
+        stats.update(entries=len(changes), seq=seq, written=[path])
+        if os.path.getsize(path) > compact_ratio * os.path.getsize(snapshot):
+            # Fold the journal on disk rather than `data`: it has other writers' entries too
+            compact(snapshot, *load(snapshot))
+            stats.update(written=[path, snapshot], compacted=True)
+        return stats
+
+# ---------- CLI ----------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diario de cambios de datos_empleados.json.")
+    parser.add_argument("--snapshot", default=str(SNAPSHOT_PATH))
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("status", help="Secuencia, entradas pendientes y tamaños")
+    p = sub.add_parser("since", help="Entradas posteriores a una secuencia (JSON Lines)")
+    p.add_argument("seq", type=int)
+    sub.add_parser("compact", help="Aplica el diario a la instantánea y lo vacía")
+    args = parser.parse_args(argv)
+
+    snapshot = Path(args.snapshot)
+    path = journal_path(snapshot)
+    header, entries = read(path)
+    seq = last_seq(header, entries)
+    if args.cmd == "status":
+        size = os.path.getsize(path) if path.exists() else 0
+        print(f"🧾 {path.name}: secuencia {seq}  |  base {header['base'] if header else 0}  |  "
+              f"{len(entries)} entradas ({size / 1024:.1f} KB)  |  instantánea {os.path.getsize(snapshot) / 1024:.1f} KB"
+              + ("" if header is None or snapshot_matches(snapshot, header) else "  |  ⚠️ instantánea editada a mano"))
+    elif args.cmd == "since":
+        if header and args.seq < header["base"]:
+            sys.exit(f"❌ La secuencia {args.seq} es anterior a la última compactación ({header['base']}): recarga la instantánea")
+        for entry in entries:
+            if entry["seq"] > args.seq:
+                sys.stdout.write(jsonio.dumps(entry, True).decode("utf-8") + "\n")
+    else:
+        with locked(snapshot):
+            header, entries = read(path)
+            data, seq = load(snapshot)
+            compact(snapshot, data, seq)
+        print(f"✅ {len(entries)} entradas aplicadas a {snapshot.name}; diario vacío en la secuencia {seq}")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,16 @@
 # generate_nominas_2025_realista.py — realistic CFA payroll generator
 
-import io, os, json, random, shutil
+import io, os, json, random, shutil, argparse, hashlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
 from pathlib import Path
-from PIL import Image
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import cm
-from reportlab.lib.utils import ImageReader
-from PyPDF2 import PdfReader, PdfWriter
+import data_access
+import instrumentation
+import jsonio
+# reportlab, PIL and PyPDF2 (and pdf_templates, which pulls in reportlab) are
+# imported where PDFs are drawn or read, so --help, --json-only and the other
+# paths that never touch a PDF do not pay for loading them.
 
 # ---------- PATHS ----------
 PROJECT_ROOT = Path(__file__).resolve().parent
@@ -16,73 +18,123 @@ PUBLIC_DIR   = PROJECT_ROOT / "public"
 EMP_FILE     = PUBLIC_DIR / "datos_empleados.json"
 NOMINAS_DIR  = PUBLIC_DIR / "nominas_2025"
 NOMINAS_JSON = PUBLIC_DIR / "NOMINAS.json"
+MANIFEST_PATH = NOMINAS_DIR / ".manifest.json"
+SHARDS_DIR   = PUBLIC_DIR / "nominas_shards"
+BOOKS_INDEX  = NOMINAS_DIR / "libros_index.json"
 
 LOGO_PATH = PROJECT_ROOT / "src" / "assets" / "elebilogo.png"
+LOGO_CACHE_DIR = PROJECT_ROOT / ".cache" / "logo"
+LOGO_SIZE, LOGO_QUALITY = 180, 60
 COMPANY_NAME = "Iniciativas Elebi"
 YEAR = 2025
+TEMPLATE_VERSION = 2  # bump whenever the payslip layout changes so --incremental rebuilds everything
 
 MONTHS = ["enero","febrero","marzo","abril","mayo","junio",
           "julio","agosto","septiembre","octubre","noviembre","diciembre"]
 
-def load_logo():
-    img = Image.open(LOGO_PATH).convert("RGB")
+# Same values as reportlab.lib.units / reportlab.lib.pagesizes
+cm = 72.0 / 2.54
+A4 = (210 * (cm * 0.1), 297 * (cm * 0.1))
+
+def logo_bytes():
+    # Thumbnail + JPEG re-encode of the logo, cached in .cache/logo/ under the
+    # hash of the source file: PIL only runs when the logo itself changes.
+    src = LOGO_PATH.read_bytes()
+    cached = LOGO_CACHE_DIR / f"{hashlib.sha256(src).hexdigest()[:16]}-{LOGO_SIZE}-q{LOGO_QUALITY}.jpg"
+    try:
+        return cached.read_bytes()
+    except OSError:
+        pass
+    from PIL import Image
+    img = Image.open(io.BytesIO(src)).convert("RGB")
     buf = io.BytesIO()
-    img.thumbnail((180, 180))
-    img.save(buf, format="JPEG", quality=60, optimize=True)
-    buf.seek(0)
-    return ImageReader(buf)
+    img.thumbnail((LOGO_SIZE, LOGO_SIZE))
+    img.save(buf, format="JPEG", quality=LOGO_QUALITY, optimize=True)
+    data = buf.getvalue()
+    try:
+        LOGO_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_name(f"{cached.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, cached)
+    except OSError:
+        pass    # read-only checkout: just re-encode next time
+    return data
+
+def load_logo():
+    from reportlab.lib.utils import ImageReader
+    return ImageReader(io.BytesIO(logo_bytes()))
+
+LOGO_READER = None
 
-LOGO_READER = load_logo()
+def get_logo():
+    # Decoded once per process (main or pool worker) and reused for every PDF
+    global LOGO_READER
+    if LOGO_READER is None:
+        with instrumentation.stage("logo"):
+            LOGO_READER = load_logo()
+    return LOGO_READER
 
 # ---------- EMPLOYEES ----------
-def load_employees():
-    with open(EMP_FILE, "r", encoding="utf-8") as f:
-        arr = json.load(f)
+def load_employees(rng=random):
+    arr, _ = data_access.load_empleados(EMP_FILE)
     employees = []
     for e in arr:
-        base = e.get("salariomensual") or e.get("salario_base")
+        fields = data_access.employee_fields(e)
+        base = fields["salario"]
         try:
             base = float(base)
         except:
-            base = random.uniform(1200000, 4000000)
-        puesto = (e.get("puesto") or e.get("descripcion_puesto") or "").lower()
+            base = rng.uniform(1200000, 4000000)
+        puesto = (fields["puesto"] or "").lower()
         # Normalize unrealistically low salaries
         if base < 1200000:
             if "director" in puesto or "consejero" in puesto:
-                base = random.uniform(3500000, 4500000)
+                base = rng.uniform(3500000, 4500000)
             elif "jefe" in puesto or "manager" in puesto:
-                base = random.uniform(2200000, 3200000)
+                base = rng.uniform(2200000, 3200000)
             else:
-                base = random.uniform(1200000, 2000000)
-        nombre = e.get("nombres") or e.get("nombre") or e.get("nombrecompleto") or ""
-        apellidos = e.get("apellidos") or e.get("apellido") or ""
+                base = rng.uniform(1200000, 2000000)
         employees.append({
-            "employee_id": e.get("id"),
-            "nombre": nombre.strip(),
-            "apellidos": apellidos.strip(),
-            "puesto": e.get("puesto") or e.get("descripcion_puesto"),
-            "salario_base": round(base)
+            "employee_id": fields["id"],
+            "nombre": fields["nombre"].strip(),
+            "apellidos": fields["apellidos"].strip(),
+            "puesto": fields["puesto"],
+            "salario_base": round(base),
+            "fingerprint": input_fingerprint(e)
         })
     return employees
 
+def input_fingerprint(e: dict) -> str:
+    # Hash of the *source* fields a payslip depends on. The raw salary is used
+    # (not the normalized one) because missing/low salaries are drawn at random.
+    inputs = {
+        "salario": e.get("salariomensual") or e.get("salario_base"),
+        "puesto": e.get("puesto") or e.get("descripcion_puesto"),
+        "nombre": e.get("nombres") or e.get("nombre") or e.get("nombrecompleto"),
+        "apellidos": e.get("apellidos") or e.get("apellido"),
+        "template": TEMPLATE_VERSION,
+    }
+    raw = json.dumps(inputs, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
 def sanitize_filename(value: str) -> str:
     safe = "".join(ch for ch in value if ch.isalnum() or ch in (" ", "_", "-")).strip()
     return safe.replace(" ", "_") or "empleado"
 
 # ---------- CALCULATIONS ----------
-def calc_nomina(salario_base: float):
+def calc_nomina(salario_base: float, rng=random):
     # Bonuses
-    bono_rendimiento  = salario_base * random.uniform(0.02, 0.08)
-    bono_transporte   = random.randint(30000, 60000)
-    bono_alimentacion = random.randint(25000, 50000)
+    bono_rendimiento  = salario_base * rng.uniform(0.02, 0.08)
+    bono_transporte   = rng.randint(30000, 60000)
+    bono_alimentacion = rng.randint(25000, 50000)
 
     bruto = salario_base + bono_rendimiento + bono_transporte + bono_alimentacion
 
     # Deductions
     ded_inceso  = bruto * 0.03
     ded_iva     = bruto * 0.02
-    ded_irpf    = bruto * random.uniform(0.05, 0.08)
-    otros       = random.randint(2000, 10000)
+    ded_irpf    = bruto * rng.uniform(0.05, 0.08)
+    otros       = rng.randint(2000, 10000)
 
     total_deducciones = ded_inceso + ded_iva + ded_irpf + otros
     neto = bruto - total_deducciones
@@ -98,120 +150,610 @@ def calc_nomina(salario_base: float):
     }
 
 # ---------- PDF CREATION ----------
-def create_pdf(fullname, puesto, salario_base, periodo):
-    NOMINAS_DIR.mkdir(parents=True, exist_ok=True)
-    pdf_path = NOMINAS_DIR / f"nomina_{sanitize_filename(fullname)}_{periodo}.pdf"
+# (label, key) per line; key is looked up in brk, or in the totals for the last block
+BONUS_LINES = [("Bono rendimiento", "bono_rendimiento"), ("Transporte", "bono_transporte"),
+               ("Alimentación", "bono_alimentacion")]
+DEDUCTION_LINES = [("INSESO (3%)", "ded_inceso"), ("IVA Retenido (2%)", "ded_iva"),
+                   ("IRPF (5-8%)", "ded_irpf"), ("Otros", "otros")]
+TOTAL_LINES = [("Salario Base", "salario_base"), ("Salario Bruto", "bruto"), ("Salario Neto", "neto")]
+# Extra deduction line of --asistencia payslips (see payroll_attendance.py)
+ATTENDANCE_LINE = ("Ausencias y retrasos", "ded_asistencia")
 
-    bruto, neto, brk = calc_nomina(salario_base)
-    c = canvas.Canvas(str(pdf_path), pagesize=A4, pageCompression=1)
+def payslip_layout(deduction_lines=DEDUCTION_LINES):
+    # [(heading, heading_y_cm, [(label, key, y_cm), ...]), ...]
+    sections = []
+    y = 22.1
+    sections.append(("Bonificaciones:", 22.6, []))
+    for label, key in BONUS_LINES:
+        sections[-1][2].append((label, key, y))
+        y -= 0.5
+    sections.append(("Deducciones:", y - 0.3, []))
+    y -= 0.8
+    for label, key in deduction_lines:
+        sections[-1][2].append((label, key, y))
+        y -= 0.5
+    y -= 0.3
+    sections.append(("Totales:", y, []))
+    y -= 0.5
+    for label, key in TOTAL_LINES:
+        sections[-1][2].append((label, key, y))
+        y -= 0.5
+    return sections
+
+PAYSLIP_SECTIONS = payslip_layout()
+PAYSLIP_SECTIONS_ASISTENCIA = payslip_layout(DEDUCTION_LINES + [ATTENDANCE_LINE])
 
-    # Header
-    c.drawImage(LOGO_READER, 2*cm, 26*cm, 2.5*cm, 2.5*cm, mask="auto")
+def draw_payslip_static(c, sections=PAYSLIP_SECTIONS):
+    import pdf_templates
+    # Everything that is identical on every payslip: logo, title, labels, footer
+    pdf_templates.draw_image(c, "nomina-logo", get_logo(), 2*cm, 26*cm, 2.5*cm, 2.5*cm, mask="auto")
     c.setFont("Helvetica-Bold", 14)
     c.drawCentredString(10.5*cm, 27*cm, f"Nómina - {COMPANY_NAME}")
-    c.setFont("Helvetica", 9)
-    c.drawCentredString(10.5*cm, 26.4*cm, f"Periodo: {periodo}")
 
-    # Datos del empleado
     c.setFont("Helvetica-Bold", 10)
     c.drawString(2*cm, 24.6*cm, "Empleado:")
-    c.setFont("Helvetica", 9)
-    c.drawString(6*cm, 24.6*cm, fullname)
-    c.setFont("Helvetica-Bold", 10)
     c.drawString(2*cm, 24.0*cm, "Puesto:")
-    c.setFont("Helvetica", 9)
-    c.drawString(6*cm, 24.0*cm, puesto or "-")
 
-    # Bonificaciones
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(2*cm, 22.6*cm, "Bonificaciones:")
-    c.setFont("Helvetica", 9)
-    y = 22.1
-    for label, val in [
-        ("Bono rendimiento", brk["bono_rendimiento"]),
-        ("Transporte", brk["bono_transporte"]),
-        ("Alimentación", brk["bono_alimentacion"]),
-    ]:
-        c.drawString(2.5*cm, y*cm, label)
-        c.drawRightString(18.5*cm, y*cm, f"{val:,.0f} XAF")
-        y -= 0.5
+    for heading, heading_y, lines in sections:
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(2*cm, heading_y*cm, heading)
+        c.setFont("Helvetica", 9)
+        for label, _, y in lines:
+            c.drawString(2.5*cm, y*cm, label)
 
-    # Deducciones
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(2*cm, (y-0.3)*cm, "Deducciones:")
-    y -= 0.8
-    c.setFont("Helvetica", 9)
-    for label, val in [
-        ("INSESO (3%)", brk["ded_inceso"]),
-        ("IVA Retenido (2%)", brk["ded_iva"]),
-        ("IRPF (5-8%)", brk["ded_irpf"]),
-        ("Otros", brk["otros"]),
-    ]:
-        c.drawString(2.5*cm, y*cm, label)
-        c.drawRightString(18.5*cm, y*cm, f"{val:,.0f} XAF")
-        y -= 0.5
+    c.setFont("Helvetica-Oblique", 8)
+    c.drawCentredString(10.5*cm, 1.8*cm, f"{COMPANY_NAME} © {YEAR}")
+
+_PAYSLIP_TEMPLATES = {}
+
+def payslip_sections(brk):
+    return PAYSLIP_SECTIONS_ASISTENCIA if "ded_asistencia" in brk else PAYSLIP_SECTIONS
+
+def payslip_template(sections=PAYSLIP_SECTIONS):
+    name = f"nomina-v{TEMPLATE_VERSION}" + ("-asistencia" if sections is PAYSLIP_SECTIONS_ASISTENCIA else "")
+    tpl = _PAYSLIP_TEMPLATES.get(name)
+    if tpl is None:
+        import pdf_templates
+        tpl = _PAYSLIP_TEMPLATES[name] = pdf_templates.PageTemplate(name, lambda c: draw_payslip_static(c, sections))
+    return tpl
+
+def draw_payslip(c, fullname, puesto, salario_base, periodo, bruto, neto, brk, single_page=True):
+    # single_page: the static layer is painted inline (smallest one-page file);
+    # otherwise it is stamped as a form shared by every page of the document.
+    sections = payslip_sections(brk)
+    if single_page:
+        payslip_template(sections).paint(c)
+    else:
+        payslip_template(sections).stamp(c)
 
-    # Totales
-    y -= 0.3
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(2*cm, y*cm, "Totales:")
-    y -= 0.5
     c.setFont("Helvetica", 9)
-    for label, val in [
-        ("Salario Base", salario_base),
-        ("Salario Bruto", bruto),
-        ("Salario Neto", neto),
-    ]:
-        c.drawString(2.5*cm, y*cm, label)
-        c.drawRightString(18.5*cm, y*cm, f"{val:,.0f} XAF")
-        y -= 0.5
+    c.drawCentredString(10.5*cm, 26.4*cm, f"Periodo: {periodo}")
+    c.drawString(6*cm, 24.6*cm, fullname)
+    c.drawString(6*cm, 24.0*cm, puesto or "-")
+
+    values = dict(brk, salario_base=salario_base, bruto=bruto, neto=neto)
+    for _, _, lines in sections:
+        for _, key, y in lines:
+            c.drawRightString(18.5*cm, y*cm, f"{values[key]:,.0f} XAF")
 
     c.setFont("Helvetica-Oblique", 8)
     c.drawCentredString(10.5*cm, 2.2*cm, f"Pago correspondiente al 25 de {periodo}")
-    c.drawCentredString(10.5*cm, 1.8*cm, f"{COMPANY_NAME} © {YEAR}")
     c.showPage()
+
+def pdf_filename(fullname, periodo):
+    return f"nomina_{sanitize_filename(fullname)}_{periodo}.pdf"
+
+def render_pdf(fullname, puesto, salario_base, periodo, bruto, neto, brk, out_dir=NOMINAS_DIR):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    pdf_path = out_dir / pdf_filename(fullname, periodo)
+
+    import pdf_templates
+    c = pdf_templates.new_canvas(str(pdf_path), pagesize=A4, pageCompression=1)
+    draw_payslip(c, fullname, puesto, salario_base, periodo, bruto, neto, brk)
+    c.save()
+    return pdf_path
+
+def render_pdf_bytes(fullname, puesto, salario_base, periodo, bruto, neto, brk):
+    # render_pdf() into memory (render_service.py)
+    import pdf_templates
+    buf = io.BytesIO()
+    c = pdf_templates.new_canvas(buf, pagesize=A4, pageCompression=1)
+    draw_payslip(c, fullname, puesto, salario_base, periodo, bruto, neto, brk)
     c.save()
+    return buf.getvalue()
+
+def create_pdf(fullname, puesto, salario_base, periodo):
+    bruto, neto, brk = calc_nomina(salario_base)
+    pdf_path = render_pdf(fullname, puesto, salario_base, periodo, bruto, neto, brk)
     return bruto, neto, brk, pdf_path
 
+# ---------- PARALLEL RENDERING ----------
+def _init_worker():
+    get_logo()
+
+def _render_job(job):
+    return render_pdf(*job)
+
+def open_pool(workers):
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+def render_all(jobs, workers=1, out_dir=NOMINAS_DIR, pool=None):
+    # jobs: (fullname, puesto, salario_base, periodo, bruto, neto, brk) tuples.
+    # Results come back in the same order as `jobs`, whatever the worker count.
+    # Pass an already open `pool` (see open_pool) to reuse it across batches.
+    jobs = [(*job, out_dir) for job in jobs]
+    if pool is None and workers <= 1:
+        return [_render_job(job) for job in jobs]
+    own_pool = pool is None
+    if own_pool:
+        pool = open_pool(workers)
+    try:
+        chunksize = max(1, len(jobs) // (max(1, workers) * 4))
+        return list(pool.map(_render_job, jobs, chunksize=chunksize))
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+# ---------- PAYROLL BOOKS ----------
+# One multi-page PDF per periodo (or per employee-year) instead of one file per
+# payslip; BOOKS_INDEX says on which page of which book each payslip lives.
+def book_filename(books, e, periodo):
+    if books == "periodo":
+        return f"libro_{periodo}.pdf"
+    return f"libro_{e['employee_id']}_{YEAR}.pdf"
+
+def render_book(book_name, pages, out_dir=NOMINAS_DIR):
+    # pages: render_pdf()-style tuples; the static layer is a single shared form
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    book_path = out_dir / book_name
+    import pdf_templates
+    c = pdf_templates.new_canvas(str(book_path), pagesize=A4, pageCompression=1)
+    for page in pages:
+        draw_payslip(c, *page, single_page=False)
+    c.save()
+    return book_path
+
+def _render_book_job(job):
+    return render_book(*job)
+
+def page_from_row(row):
+    # Rebuild a page from an existing NOMINAS.json row (incremental re-renders)
+    full_name = f"{row['nombre']} {row['apellidos']}".strip()
+    brk = {k: row[k] for k in ("bono_rendimiento", "bono_transporte", "bono_alimentacion",
+                               "ded_inceso", "ded_iva", "ded_irpf", "otros")}
+    if "ded_asistencia" in row:
+        brk.update({k: row[k] for k in ("ausencias", "retrasos", "salidas_anticipadas", "ded_asistencia")})
+    return (full_name, row["puesto"], row["salario_base"], row["periodo"], row["bruto"], row["neto"], brk)
+
+def save_books_index(books, manifest):
+    index = {"version": 1, "group_by": books, "books": {}, "payslips": {}}
+    for key, entry in manifest.items():
+        index["payslips"][key] = [entry["pdf"], entry["page"]]
+        index["books"][entry["pdf"]] = index["books"].get(entry["pdf"], 0) + 1
+    jsonio.write_json(BOOKS_INDEX, index, compact=True)
+
+def extract_payslip(employee_id, periodo, out_path):
+    # Copies one payslip page out of its book into a standalone PDF
+    with open(BOOKS_INDEX, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    try:
+        book, page = index["payslips"][f"{employee_id}|{periodo}"]
+    except KeyError:
+        raise KeyError(f"No hay nómina {periodo} para el empleado {employee_id} en {BOOKS_INDEX}")
+    from PyPDF2 import PdfReader, PdfWriter
+    reader = PdfReader(str(NOMINAS_DIR / book))
+    writer = PdfWriter()
+    writer.add_page(reader.pages[page])
+    with open(out_path, "wb") as f:
+        writer.write(f)
+    return Path(out_path)
+
+def build_row(e, mm_idx, periodo, bruto, neto, brk):
+    row = {
+        "employee_id": e["employee_id"],
+        "nombre": e["nombre"],
+        "apellidos": e["apellidos"],
+        "puesto": e["puesto"],
+        "periodo": periodo,
+        "fecha_pago": f"{YEAR}-{mm_idx:02d}-25",
+        "salario_base": round(e["salario_base"]),
+        "bono_rendimiento": round(brk["bono_rendimiento"]),
+        "bono_transporte": round(brk["bono_transporte"]),
+        "bono_alimentacion": round(brk["bono_alimentacion"]),
+        "bruto": round(bruto),
+        "ded_inceso": round(brk["ded_inceso"]),
+        "ded_iva": round(brk["ded_iva"]),
+        "ded_irpf": round(brk["ded_irpf"]),
+        "otros": round(brk["otros"]),
+    }
+    if "ded_asistencia" in brk:
+        row["ausencias"] = brk["ausencias"]
+        row["retrasos"] = brk["retrasos"]
+        row["salidas_anticipadas"] = brk["salidas_anticipadas"]
+        row["ded_asistencia"] = round(brk["ded_asistencia"])
+    row["neto"] = round(neto)
+    row["pagado"] = date(YEAR, mm_idx, 25) <= date.today()
+    return row
+
+# ---------- STREAMING OUTPUT ----------
+class NominasWriter:
+    """Streams rows to NOMINAS.json as they are produced, optionally also into shards.
+
+    NOMINAS.json gets the jsonio.write_json() layout (pretty unless
+    ELEBI_JSON_COMPACT is set or compact=True is passed). With
+    shard_by="employee" | "periodo", each row is also appended (compact) to
+    nominas_shards/<employee_id | periodo>.json, a plain JSON array, and
+    nominas_shards/index.json maps employee_id → [[shard, offset, length], ...]
+    so a client can fetch just its byte ranges. Everything is written to temp
+    paths and swapped in by commit(); abort() leaves the previous output alone.
+    """
+
+    MAX_OPEN_SHARDS = 64
+
+    def __init__(self, path=NOMINAS_JSON, shard_by=None, shards_dir=SHARDS_DIR, compact=None):
+        self.path = Path(path)
+        self.compact = jsonio.COMPACT if compact is None else compact
+        self.tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self.shard_by = shard_by
+        self.shards_dir = Path(shards_dir)
+        self.tmp_shards_dir = self.shards_dir.with_name(self.shards_dir.name + ".tmp")
+        self.count = 0
+        self._f = open(self.tmp_path, "w", encoding="utf-8")
+        self._f.write("[")
+        self._open = OrderedDict()   # shard name → file handle, least recently used first (bounded)
+        self._sizes = {}   # shard name → bytes written so far
+        self._index = {}   # employee_id → [[shard, offset, length], ...]
+        if shard_by:
+            if self.tmp_shards_dir.exists():
+                shutil.rmtree(self.tmp_shards_dir)
+            self.tmp_shards_dir.mkdir(parents=True)
+
+    def write(self, row):
+        body = jsonio.dumps(row, self.compact).decode("utf-8")
+        if self.compact:
+            self._f.write(("" if self.count == 0 else ",") + body)
+        else:
+            self._f.write(("\n  " if self.count == 0 else ",\n  ") + body.replace("\n", "\n  "))
+        self.count += 1
+        if self.shard_by:
+            self._write_shard(row)
+
+    def _write_shard(self, row):
+        key = row["employee_id"] if self.shard_by == "employee" else row["periodo"]
+        shard = f"{key}.json"
+        f = self._open.get(shard)
+        if f is None:
+            if len(self._open) >= self.MAX_OPEN_SHARDS:
+                self._open.popitem(last=False)[1].close()
+            f = self._open[shard] = open(self.tmp_shards_dir / shard, "ab")
+        else:
+            self._open.move_to_end(shard)
+        offset = self._sizes.get(shard, 0)
+        data = jsonio.dumps(row, True)
+        f.write((b"[" if offset == 0 else b",") + data)
+        self._sizes[shard] = offset + 1 + len(data)
+        ranges = self._index.setdefault(str(row["employee_id"]), [])
+        if self.shard_by == "employee":
+            # One contiguous array per employee: a single range covering the whole shard
+            ranges[:] = [[shard, 0, self._sizes[shard] + 1]]
+        else:
+            ranges.append([shard, offset + 1, len(data)])
+
+    def commit(self):
+        self._f.write("\n]" if self.count and not self.compact else "]")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+        os.replace(self.tmp_path, self.path)
+        if not self.shard_by:
+            # Shards from an earlier --shards run would now be stale
+            if self.shards_dir.exists():
+                shutil.rmtree(self.shards_dir)
+            return
+        for f in self._open.values():
+            f.close()
+        self._open.clear()
+        for shard in self._sizes:
+            with open(self.tmp_shards_dir / shard, "ab") as f:
+                f.write(b"]")
+        jsonio.write_json(self.tmp_shards_dir / "index.json",
+                          {"version": 1, "shard_by": self.shard_by, "employees": self._index}, compact=True)
+        old = self.shards_dir.with_name(self.shards_dir.name + ".old")
+        if self.shards_dir.exists():
+            os.replace(self.shards_dir, old)
+        os.replace(self.tmp_shards_dir, self.shards_dir)
+        if old.exists():
+            shutil.rmtree(old)
+
+    def abort(self):
+        self._f.close()
+        self.tmp_path.unlink(missing_ok=True)
+        for f in self._open.values():
+            f.close()
+        self._open.clear()
+        if self.tmp_shards_dir.exists():
+            shutil.rmtree(self.tmp_shards_dir)
+
+def shards_layout():
+    # shard_by of the shards currently on disk (None if there are none)
+    try:
+        with open(SHARDS_DIR / "index.json", "r", encoding="utf-8") as f:
+            return json.load(f).get("shard_by")
+    except (OSError, ValueError):
+        return None
+
+# ---------- INCREMENTAL MANIFEST ----------
+# { "<employee_id>|<periodo>": {"hash": <input_fingerprint>, "pdf": <file name>} }
+def load_manifest():
+    if not MANIFEST_PATH.exists():
+        return {}
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            return json.load(f).get("entries", {})
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(entries):
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    jsonio.write_json(MANIFEST_PATH, {"template_version": TEMPLATE_VERSION, "entries": entries}, compact=True)
+
+def load_previous_rows():
+    if not NOMINAS_JSON.exists():
+        return {}
+    try:
+        rows = data_access.load_nominas(NOMINAS_JSON)
+    except (OSError, ValueError):
+        return {}
+    return {f"{r.get('employee_id')}|{r.get('periodo')}": r for r in rows}
+
+def prune_orphans(keep):
+    removed = 0
+    for pdf in NOMINAS_DIR.glob("*.pdf"):
+        if pdf.name not in keep:
+            pdf.unlink()
+            removed += 1
+    return removed
+
 # ---------- MAIN ----------
-def main():
-    employees = load_employees()
-    if NOMINAS_DIR.exists():
-        shutil.rmtree(NOMINAS_DIR)
-    NOMINAS_DIR.mkdir(parents=True, exist_ok=True)
-    if NOMINAS_JSON.exists():
-        NOMINAS_JSON.unlink()
-    all_rows = []
-
-    for mm_idx, month in enumerate(MONTHS, start=1):
-        periodo = f"{YEAR}-{mm_idx:02d}"
-        for e in employees:
-            full_name = f"{e['nombre']} {e['apellidos']}".strip()
-            bruto, neto, brk, pdf = create_pdf(full_name, e["puesto"], e["salario_base"], periodo)
-            all_rows.append({
-                "employee_id": e["employee_id"],
-                "nombre": e["nombre"],
-                "apellidos": e["apellidos"],
-                "puesto": e["puesto"],
-                "periodo": periodo,
-                "fecha_pago": f"{YEAR}-{mm_idx:02d}-25",
-                "salario_base": round(e["salario_base"]),
-                "bono_rendimiento": round(brk["bono_rendimiento"]),
-                "bono_transporte": round(brk["bono_transporte"]),
-                "bono_alimentacion": round(brk["bono_alimentacion"]),
-                "bruto": round(bruto),
-                "ded_inceso": round(brk["ded_inceso"]),
-                "ded_iva": round(brk["ded_iva"]),
-                "ded_irpf": round(brk["ded_irpf"]),
-                "otros": round(brk["otros"]),
-                "neto": round(neto),
-                "pagado": date(YEAR, mm_idx, 25) <= date.today()
-            })
-
-    with open(NOMINAS_JSON, "w", encoding="utf-8") as f:
-        json.dump(all_rows, f, ensure_ascii=False, indent=2)
-
-    print(f"✅ Nóminas generadas — PDFs: {NOMINAS_DIR}, JSON: {NOMINAS_JSON}")
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=f"Genera las nóminas {YEAR} (PDFs + NOMINAS.json).")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Procesos para renderizar PDFs en paralelo (por defecto: 1)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reutiliza PDFs y filas cuyo empleado no ha cambiado (según el manifiesto)")
+    parser.add_argument("--engine", choices=("scalar", "numpy"), default="scalar",
+                        help="scalar: calc_nomina() por nómina; numpy: todo el año de golpe (payroll_engine)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Semilla para importes y salarios inferidos (misma semilla → mismas nóminas)")
+    parser.add_argument("--shards", choices=("employee", "periodo"), default=None,
+                        help="Además de NOMINAS.json, escribe nominas_shards/ (compacto) + index.json")
+    parser.add_argument("--books", choices=("periodo", "employee"), default=None,
+                        help="Un PDF multipágina por periodo o por empleado-año en vez de uno por nómina")
+    parser.add_argument("--extract", nargs=2, metavar=("EMPLOYEE_ID", "PERIODO"),
+                        help="Extrae una nómina de su libro (requiere haber generado con --books) y termina")
+    parser.add_argument("--out", default=None, help="Ruta de salida para --extract")
+    parser.add_argument("--asistencia", action="store_true",
+                        help="Descuenta ausencias injustificadas, retrasos y salidas anticipadas según la asistencia")
+    parser.add_argument("--json-only", action="store_true",
+                        help="Sólo escribe NOMINAS.json (y los shards): no genera PDFs ni toca nominas_2025/")
+    parser.add_argument("--ledger", nargs="?", const="", default=None, metavar="RUTA",
+                        help="Además, guarda las filas en el libro SQLite (por defecto public/nominas.sqlite)")
+    instrumentation.add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    if args.json_only and args.books:
+        parser.error("--json-only no genera PDFs: no se puede combinar con --books")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.extract:
+        employee_id, periodo = args.extract
+        out = extract_payslip(employee_id, periodo, args.out or f"nomina_{employee_id}_{periodo}.pdf")
+        print(f"📄 Nómina extraída: {out}")
+        return
+    with instrumentation.Run("generate_nominas", argv, profile=args.profile) as run:
+        generate(args, run)
+        print(run.timings_line())
+
+def generate(args, run):
+    rng = random.Random(args.seed) if args.seed is not None else random
+    with run.stage("empleados"):
+        employees = load_employees(rng)
+    run.count("empleados", len(employees))
+    amounts = None
+    if args.engine == "numpy":
+        import payroll_engine
+        with run.stage("importes"):
+            amounts = payroll_engine.compute_year([e["salario_base"] for e in employees], len(MONTHS), seed=args.seed)
+    attendance = None
+    if args.asistencia:
+        import payroll_attendance
+        with run.stage("asistencia"):
+            attendance = payroll_attendance.join(data_access.load_attendance_store(), employees, YEAR)
+        run.count("empleados_con_asistencia", len(attendance.counts))
+        print(f"🕒 Asistencia — enlazados: {len(attendance.counts)}/{len(employees)}  |  "
+              f"sin empleado: {len(attendance.unmatched)}  |  ambiguos: {len(attendance.ambiguous)}")
+    if args.incremental or args.json_only:
+        # --json-only leaves the PDFs alone, so rows whose manifest entry still
+        # matches keep the amounts those PDFs show; redrawn rows lose their entry
+        with run.stage("manifiesto"):
+            manifest = load_manifest()
+            previous_rows = load_previous_rows()
+    else:
+        manifest, previous_rows = {}, {}
+        if NOMINAS_DIR.exists() and not args.json_only:
+            shutil.rmtree(NOMINAS_DIR)
+    if not args.json_only:
+        NOMINAS_DIR.mkdir(parents=True, exist_ok=True)
+    previous_keys = list(previous_rows)
+    previous_book_sizes = {}
+    for entry in manifest.values():
+        previous_book_sizes[entry["pdf"]] = previous_book_sizes.get(entry["pdf"], 0) + 1
+    writer = NominasWriter(shard_by=args.shards)
+    ledger = None
+    if args.ledger is not None:
+        import payroll_ledger
+        ledger = payroll_ledger.Ledger(args.ledger or payroll_ledger.LEDGER_PATH)
+        ledger.begin()
+
+    def emit(row):
+        writer.write(row)
+        if ledger is not None:
+            ledger.add(row)
+
+    pool = None if args.json_only else open_pool(args.workers)
+    batch_size = 256 * max(1, args.workers)
+    jobs = []
+    book_pages = {}     # book name → pages, while the book is still being filled
+    stale_books = set()
+    pending_books = []  # futures of books rendering in the pool
+    rendered = 0
+    changed = len(previous_keys) != len(employees) * len(MONTHS)
+    new_manifest = {}
+    redrawn = set()     # manifest keys whose row got new amounts (--json-only)
+    # Amounts depend on the seed and the engine too: another draw must not reuse old PDFs
+    run_inputs = f"|seed:{args.seed}|engine:{args.engine}"
+
+    def flush_book(name):
+        nonlocal rendered
+        pages = book_pages.pop(name)
+        if name not in stale_books and previous_book_sizes.get(name) == len(pages):
+            return
+        rendered += len(pages)
+        if pool is None:
+            with run.stage("pdf"):
+                run.wrote(render_book(name, pages))
+        else:
+            pending_books.append(pool.submit(_render_book_job, (name, pages)))
+
+    # Amounts are drawn here, in the parent and in the usual month → employee
+    # order, so the random stream does not depend on the worker count. Rows are
+    # streamed to the writer and PDFs rendered in bounded batches (or one book
+    # per month), so memory does not grow with the number of payslips.
+    try:
+        with run.stage("nóminas"):
+            for mm_idx, month in enumerate(MONTHS, start=1):
+                periodo = f"{YEAR}-{mm_idx:02d}"
+                for i, e in enumerate(employees):
+                    full_name = f"{e['nombre']} {e['apellidos']}".strip()
+                    key = f"{e['employee_id']}|{periodo}"
+                    fingerprint, counts = e["fingerprint"] + run_inputs, None
+                    if attendance is not None:
+                        # The month's counts are an input of this payslip too
+                        counts = payroll_attendance.month_counts(attendance, e["employee_id"], mm_idx)
+                        fingerprint += f"|asistencia-v{payroll_attendance.VERSION}:" + ",".join(map(str, counts))
+                    if args.books:
+                        book = book_filename(args.books, e, periodo)
+                        pages = book_pages.setdefault(book, [])
+                        entry = {"hash": fingerprint, "pdf": book, "page": len(pages)}
+                    else:
+                        entry = {"hash": fingerprint, "pdf": pdf_filename(full_name, periodo)}
+                    new_manifest[key] = entry
+                    prev = previous_rows.get(key)
+                    old = manifest.get(key)
+                    if prev and old and old["hash"] == entry["hash"]:
+                        # Inputs unchanged: keep the amounts already issued
+                        row = dict(prev)
+                        row["pagado"] = date(YEAR, mm_idx, 25) <= date.today()
+                        changed = changed or row != prev or previous_keys[writer.count] != key
+                        emit(row)
+                        page = page_from_row(row)
+                        if old == entry and (NOMINAS_DIR / entry["pdf"]).exists():
+                            if args.books:
+                                pages.append(page)
+                            continue
+                        # ...but its PDF is missing or moved (e.g. a page shift in its book)
+                    else:
+                        if amounts is not None:
+                            bruto, neto, brk = amounts.nomina(mm_idx - 1, i)
+                        else:
+                            bruto, neto, brk = calc_nomina(e["salario_base"], rng)
+                        if counts is not None:
+                            neto, brk = payroll_attendance.apply(e["salario_base"], neto, brk, counts)
+                        page = (full_name, e["puesto"], e["salario_base"], periodo, bruto, neto, brk)
+                        emit(build_row(e, mm_idx, periodo, bruto, neto, brk))
+                        changed = True
+                        if key in manifest:
+                            redrawn.add(key)
+                    if args.json_only:
+                        continue
+                    if args.books:
+                        pages.append(page)
+                        stale_books.add(book)
+                        continue
+                    jobs.append(page)
+                    if len(jobs) >= batch_size:
+                        with run.stage("pdf"):
+                            run.wrote(*render_all(jobs, workers=args.workers, pool=pool))
+                        rendered += len(jobs)
+                        jobs = []
+                if args.books == "periodo":
+                    flush_book(book_filename("periodo", None, periodo))
+            for name in list(book_pages):
+                flush_book(name)
+            if not args.json_only:
+                with run.stage("pdf"):
+                    for future in pending_books:
+                        run.wrote(future.result())
+                    run.wrote(*render_all(jobs, workers=args.workers, pool=pool))
+                rendered += len(jobs)
+    except BaseException:
+        writer.abort()
+        if ledger is not None:
+            ledger.rollback()
+            ledger.close()
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    with run.stage("escritura"):
+        # --json-only leaves nominas_2025/ (PDFs, manifest, books index) as it was
+        pruned = 0
+        if args.incremental and not args.json_only:
+            pruned = prune_orphans({entry["pdf"] for entry in new_manifest.values()})
+        if not args.json_only:
+            save_manifest(new_manifest)
+            run.wrote(MANIFEST_PATH)
+        elif redrawn:
+            # Those PDFs no longer match NOMINAS.json: the next run rebuilds them
+            save_manifest({k: v for k, v in manifest.items() if k not in redrawn})
+            run.wrote(MANIFEST_PATH)
+        if args.books:
+            save_books_index(args.books, new_manifest)
+            run.wrote(BOOKS_INDEX)
+        elif BOOKS_INDEX.exists() and not args.json_only:
+            BOOKS_INDEX.unlink()
+
+        if changed or pruned or (args.shards and shards_layout() != args.shards):
+            writer.commit()
+            run.wrote(NOMINAS_JSON)
+        else:
+            writer.abort()
+        # The ledger is written even when NOMINAS.json is unchanged: it may be new or stale
+        if ledger is not None:
+            ledger_removed = ledger.commit()
+            ledger.close()
+            run.wrote(ledger.path)
+    run.count("nominas", writer.count)
+    run.count("nominas_regeneradas", rendered)
+
+    if args.incremental:
+        print(f"♻️  Incremental — regeneradas: {rendered}  |  reutilizadas: {writer.count - rendered}  |  PDFs huérfanos eliminados: {pruned}")
+    if args.json_only:
+        print(f"✅ Nóminas generadas (sin PDFs) — JSON: {NOMINAS_JSON}")
+    else:
+        print(f"✅ Nóminas generadas — PDFs: {NOMINAS_DIR}, JSON: {NOMINAS_JSON}")
+    if args.books:
+        print(f"📚 Libros por {args.books}: {BOOKS_INDEX}")
+    if args.shards:
+        print(f"🧩 Shards por {args.shards}: {SHARDS_DIR}")
+    if ledger is not None:
+        print(f"🗄️  Libro de nóminas: {ledger.path}  ({writer.count} filas, {ledger_removed} de bajas eliminadas)")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,178 @@
+# instrumentation.py — per-run stage timers, counters and optional profiling
+#
+# Each script wraps its work in a Run:
+#
+#   with instrumentation.Run("sync_employees_and_docs", argv, profile=args.profile) as run:
+#       with run.stage("lectura"):
+#           ...
+#       run.count("empleados", len(empleados))
+#       run.wrote(path)                 # files / bytes / PDFs written
+#
+# Code deeper down (no Run at hand) uses the module-level stage()/count()/wrote(),
+# which go to the Run in progress, if any. Stages nest: a stage opened inside
+# another is reported as "outer › inner", so nested times are already included
+# in their parent's.
+#
+# On exit a JSON report goes to reports/<script>-<timestamp>-<pid>.json. With
+# profile=True (--profile in every script) cProfile and tracemalloc run for the
+# whole Run: the report gets the top functions by cumulative time and the
+# biggest allocation sites, and the raw profile is saved next to it as .prof
+# (python -m pstats / snakeviz). Counters from pool workers are not collected;
+# scripts count what their workers return.
+
+import cProfile, io, os, platform, pstats, sys, time, tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import jsonio
+
+ROOT = Path(__file__).resolve().parent
+REPORTS_DIR = ROOT / "reports"
+REPORT_VERSION = 1
+PROFILE_TOP = 30          # functions / allocation sites kept in the report
+
+_current = None
+
+class Run:
+    def __init__(self, script, argv=None, profile=False, reports_dir=REPORTS_DIR):
+        self.script = script
+        self.argv = list(sys.argv[1:] if argv is None else argv)
+        self.profile = profile
+        self.reports_dir = Path(reports_dir) if reports_dir else None
+        self.stages = {}       # "outer › inner" → seconds
+        self.counters = {}
+        self.report = None
+        self.report_path = None
+        self._stack = []
+        self._profiler = None
+        self._previous = None
+
+    # ---------- measuring ----------
+
+    @contextmanager
+    def stage(self, name):
+        self._stack.append(name)
+        key = " › ".join(self._stack)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[key] = self.stages.get(key, 0.0) + time.perf_counter() - t0
+            self._stack.pop()
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def wrote(self, *paths):
+        for path in paths:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            self.count("ficheros_escritos")
+            self.count("bytes_escritos", size)
+            if str(path).endswith(".pdf"):
+                self.count("pdfs_escritos")
+
+    def timings_line(self):
+        return "⏱️ Tiempos: " + "  |  ".join(f"{name} {secs:.2f}s" for name, secs in self.stages.items())
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        global _current
+        self._previous, _current = _current, self
+        self._started = datetime.now()
+        self._t0 = time.perf_counter()
+        if self.profile:
+            tracemalloc.start(10)
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def finish(self, status="ok"):
+        """Stops profiling and writes the report. Returns the report dict."""
+        global _current
+        seconds = time.perf_counter() - self._t0
+        self.report = {
+            "version": REPORT_VERSION,
+            "script": self.script,
+            "argv": self.argv,
+            "started": self._started.isoformat(timespec="seconds"),
+            "status": status,
+            "seconds": round(seconds, 4),
+            "stages": {name: round(secs, 4) for name, secs in self.stages.items()},
+            "counters": self.counters,
+            "python": platform.python_version(),
+            "host": platform.node(),
+        }
+        if self.profile:
+            self._profiler.disable()
+            self.report["profile"] = self._profile_summary()
+            tracemalloc.stop()
+        _current = self._previous
+        if self.reports_dir is not None:
+            self._write()
+        return self.report
+
+    def _profile_summary(self):
+        stats = pstats.Stats(self._profiler, stream=io.StringIO())
+        top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP]
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        return {
+            "functions": [{
+                "function": f"{Path(filename).name}:{line}({func})",
+                "calls": ncalls,
+                "tottime": round(tottime, 4),
+                "cumtime": round(cumtime, 4),
+            } for (filename, line, func), (_, ncalls, tottime, cumtime, _) in top],
+            "memory": {
+                "peak_bytes": peak,
+                "current_bytes": current,
+                "top": [{"where": f"{Path(stat.traceback[0].filename).name}:{stat.traceback[0].lineno}",
+                         "bytes": stat.size, "blocks": stat.count}
+                        for stat in snapshot.statistics("lineno")[:PROFILE_TOP]],
+            },
+        }
+
+    def _write(self):
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{self.script}-{self._started:%Y%m%d-%H%M%S}-{os.getpid()}"
+        self.report_path = self.reports_dir / f"{stem}.json"
+        if self.profile:
+            self._profiler.dump_stats(str(self.reports_dir / f"{stem}.prof"))
+            self.report["profile"]["prof_file"] = f"{stem}.prof"
+        jsonio.write_json(self.report_path, self.report)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        failed = exc_type is not None and not (exc_type is SystemExit and exc.code in (None, 0))
+        self.finish("error" if failed else "ok")
+        if self.profile and self.report_path:
+            print(f"🔬 Perfil: {self.report_path}")
+
+# ---------- module-level helpers (the Run in progress, if any) ----------
+
+@contextmanager
+def stage(name):
+    if _current is None:
+        yield
+    else:
+        with _current.stage(name):
+            yield
+
+def count(name, n=1):
+    if _current is not None:
+        _current.count(name, n)
+
+def wrote(*paths):
+    if _current is not None:
+        _current.wrote(*paths)
+
+def add_profile_argument(parser):
+    parser.add_argument("--profile", action="store_true",
+                        help="Perfila la ejecución (cProfile + tracemalloc) y lo añade al informe de reports/")
@@ -0,0 +1,211 @@
+# jsonio.py — JSON serialization backend and streaming read/write of large objects
+#
+# dumps()/loads()/load()/write_json() go through orjson when it is installed and
+# the stdlib json module otherwise (ELEBI_JSON_BACKEND=json forces the stdlib).
+# Both produce the same bytes for our data: UTF-8 without \u escapes, either
+# pretty (indent=2, the historical layout of the public/*.json files) or compact
+# (no whitespace). ELEBI_JSON_COMPACT=1 switches every writer that does not ask
+# for a layout explicitly to compact. write_json() always goes through a temp
+# file + fsync + rename, so a crash never leaves a truncated file behind.
+#
+# iter_object_items() yields the (key, value) pairs of a top-level {...} one at
+# a time, so only one value is ever in memory. It uses ijson when installed and
+# otherwise a small incremental parser over json.JSONDecoder.raw_decode().
+# ObjectWriter writes such an object pair by pair to a temp file, in the same
+# layout as write_json(), and swaps it in on commit().
+
+import json, os
+from pathlib import Path
+
+try:
+    import ijson
+except ImportError:  # optional: the built-in parser below is used instead
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib json module is used instead
+    orjson = None
+
+# ---------- serializer ----------
+
+def _dumps_json(obj, compact):
+    if compact:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+def _dumps_orjson(obj, compact):
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | (0 if compact else orjson.OPT_INDENT_2))
+    except TypeError:
+        # Beyond orjson (ints over 64 bits, arrays, ...): the stdlib still handles it
+        return _dumps_json(obj, compact)
+
+BACKENDS = {"json": (_dumps_json, json.loads)}
+if orjson is not None:
+    BACKENDS["orjson"] = (_dumps_orjson, orjson.loads)
+
+BACKEND = os.environ.get("ELEBI_JSON_BACKEND") or ("orjson" if orjson is not None else "json")
+if BACKEND not in BACKENDS:
+    raise ImportError(f"ELEBI_JSON_BACKEND={BACKEND!r} no está disponible (opciones: {', '.join(BACKENDS)})")
+COMPACT = os.environ.get("ELEBI_JSON_COMPACT", "") not in ("", "0")
+
+def dumps(obj, compact=None) -> bytes:
+    """UTF-8 JSON; compact=None follows ELEBI_JSON_COMPACT (pretty by default)."""
+    return BACKENDS[BACKEND][0](obj, COMPACT if compact is None else compact)
+
+def loads(data):
+    return BACKENDS[BACKEND][1](data)
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+def write_json(path, obj, compact=None):
+    """Serializes obj to path atomically: <path>.tmp, fsync, rename."""
+    path = Path(path)
+    data = dumps(obj, compact)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+# ---------- streaming ----------
+
+CHUNK_SIZE = 1 << 16
+_WS = " \t\n\r"
+
+class _Stream:
+    # Text buffer over a file that refills on demand and forgets what was consumed
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        # Next non-whitespace character ("" at end of input)
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, ch):
+        if self.peek() != ch:
+            raise ValueError(f"JSON inválido: se esperaba {ch!r} en la posición {self.pos}")
+        self.pos += 1
+
+    def value(self, decoder):
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Probably cut at the chunk boundary; read more and retry
+                if not self.fill():
+                    raise
+                continue
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self.buf[end - 1] not in '"}]el':
+                if self.fill():
+                    continue
+            self.pos = end
+            return value
+
+def _iter_builtin(f):
+    decoder = json.JSONDecoder()
+    s = _Stream(f)
+    s.expect("{")
+    if s.peek() == "}":
+        return
+    while True:
+        key = s.value(decoder)
+        if not isinstance(key, str):
+            raise ValueError("JSON inválido: clave no textual")
+        s.expect(":")
+        yield key, s.value(decoder)
+        sep = s.peek()
+        s.pos += 1
+        if sep == "}":
+            return
+        if sep != ",":
+            raise ValueError(f"JSON inválido: se esperaba ',' o '}}' en la posición {s.pos - 1}")
+
+def iter_object_items(path):
+    """Yields (key, value) for each member of the top-level object in `path`."""
+    if ijson is not None:
+        with open(path, "rb") as f:
+            yield from ijson.kvitems(f, "", use_float=True)
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        yield from _iter_builtin(f)
+
+class ObjectWriter:
+    """Writes a top-level JSON object member by member.
+
+    Output is byte-identical to write_json(path, obj, compact). Everything goes
+    to <path>.tmp; commit() renames it over `path` in one step and abort()
+    removes it, so a crash never leaves a half-written file behind. finish()
+    is commit() without the rename, for callers that publish several files
+    together (os.replace(tmp_path, path) each, once every one is finished).
+    """
+
+    def __init__(self, path, compact=None):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self.compact = COMPACT if compact is None else compact
+        self.count = 0
+        self._f = open(self.tmp_path, "w", encoding="utf-8")
+        self._f.write("{")
+
+    def write(self, key, value):
+        key = dumps(key, True).decode("utf-8")
+        body = dumps(value, self.compact).decode("utf-8")
+        if self.compact:
+            self._f.write(("" if self.count == 0 else ",") + key + ":" + body)
+        else:
+            self._f.write(("\n  " if self.count == 0 else ",\n  ") + key + ": " + body.replace("\n", "\n  "))
+        self.count += 1
+
+    def finish(self):
+        self._f.write("\n}" if self.count and not self.compact else "}")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+
+    def commit(self):
+        self.finish()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self._f.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
@@ -0,0 +1,121 @@
+# payroll_attendance.py — attendance deductions for the payslips, from a one-pass join
+#
+# datos_empleados.json keys employees by id; the attendance store keys them by
+# full name ("Nombre Apellidos", or "Nombre Apellidos <id>" for a namesake).
+# join() walks the store once: it maps each attendance key to an employee_id
+# (names compared accent- and case-folded) and counts, per employee and month,
+# the records that cost money. Each payslip is then a single lookup instead of
+# a scan over that employee's day records.
+#
+#   Ausencia Injustificada   one day of salario_base (salario_base / WORKING_DAYS)
+#   Tarde                    LATE_FRACTION of a day
+#   Incompleto               EARLY_FRACTION of a day (salida anticipada)
+#
+# Used by generate_nominas_2025_ultralight.py --asistencia.
+
+from collections import namedtuple
+
+import attendance_store
+from textnorm import tokenize
+
+VERSION = 1              # bump when the rules below change: --incremental recomputes every payslip
+WORKING_DAYS = 22        # working days in a payroll month
+LATE_FRACTION = 0.0625   # a late arrival costs 30 min of an 8 h day
+EARLY_FRACTION = 0.1875  # an early departure (15:30 instead of 17:00) costs 1.5 h
+
+# observaciones → position in a month's counts
+CATEGORIES = {"Ausencia Injustificada": 0, "Tarde": 1, "Incompleto": 2}
+ZERO = (0, 0, 0)         # (ausencias, retrasos, salidas_anticipadas)
+
+# counts: employee_id → [12 × (ausencias, retrasos, salidas_anticipadas)]
+# unmatched: attendance keys with no employee; ambiguous: keys naming several employees
+AttendanceJoin = namedtuple("AttendanceJoin", "counts unmatched ambiguous")
+
+def _count_records(months):
+    # Nested (or verbatim) month → [records] layout: the slow path, rarely taken
+    year = [[0, 0, 0] for _ in range(12)]
+    if not isinstance(months, dict):
+        return year
+    for month_name, records in months.items():
+        month_num = attendance_store.MONTHS_ES.get(str(month_name).lower())
+        if month_num is None or not isinstance(records, list):
+            continue
+        for rec in records:
+            cat = CATEGORIES.get(rec.get("observaciones")) if isinstance(rec, dict) else None
+            if cat is not None:
+                year[month_num - 1][cat] += 1
+    return year
+
+def _count_block(block, codes):
+    # Columnar block: per month, array.count() of each category's code; records
+    # kept verbatim in "raw" have a NULL code there and are counted one by one.
+    if "verbatim" in block:
+        return _count_records(block["verbatim"])
+    year = [[0, 0, 0] for _ in range(12)]
+    obs = attendance_store.unpack(block["obs"])
+    raw = block.get("raw", {})
+    pos = 0
+    for month_name, n in block["months"]:
+        month_num = attendance_store.MONTHS_ES.get(month_name.lower())
+        if month_num is not None:
+            month, col = year[month_num - 1], obs[pos:pos + n]
+            for code, cat in codes:
+                month[cat] += col.count(code)
+            for i in range(pos, pos + n) if raw else ():
+                rec = raw.get(str(i))
+                cat = CATEGORIES.get(rec.get("observaciones")) if isinstance(rec, dict) else None
+                if cat is not None:
+                    month[cat] += 1
+        pos += n
+    return year
+
+def join(store, employees, year):
+    """One pass over the columnar `store` for `year`. employees: dicts with employee_id, nombre, apellidos."""
+    by_id = {str(e["employee_id"]): e["employee_id"] for e in employees}
+    by_name = {}
+    for e in employees:
+        by_name.setdefault(" ".join(tokenize(f"{e['nombre']} {e['apellidos']}")), []).append(e["employee_id"])
+    codes = [(code, CATEGORIES[label]) for code, label in enumerate(store["values"]) if label in CATEGORIES]
+    year_key = str(year)
+
+    # Keys qualified with an id first, so they win over a plain name for the same employee
+    keyed = [(key, tokenize(key)) for key in store["employees"]]
+    owners, unmatched, ambiguous = {}, [], []
+    for key, tokens in keyed:
+        if tokens and tokens[-1] in by_id:
+            owners.setdefault(by_id[tokens[-1]], key)
+    for key, tokens in keyed:
+        if tokens and tokens[-1] in by_id:
+            continue
+        ids = by_name.get(" ".join(tokens), [])
+        if len(ids) > 1:
+            ambiguous.append(key)
+        elif ids:
+            owners.setdefault(ids[0], key)
+        else:
+            unmatched.append(key)
+
+    counts = {}
+    for emp_id, key in owners.items():
+        entry = store["employees"][key]
+        if "verbatim" in entry:
+            months = entry["verbatim"].get(year_key) if isinstance(entry["verbatim"], dict) else None
+            year_counts = _count_records(months)
+        elif year_key in entry["years"]:
+            year_counts = _count_block(entry["years"][year_key], codes)
+        else:
+            continue
+        counts[emp_id] = [tuple(month) for month in year_counts]
+    return AttendanceJoin(counts, unmatched, ambiguous)
+
+def month_counts(joined, employee_id, mm_idx):
+    counts = joined.counts.get(employee_id)
+    return counts[mm_idx - 1] if counts else ZERO
+
+def apply(salario_base, neto, brk, counts):
+    """calc_nomina()-style (neto, brk) with the attendance deduction taken off. Returns (neto, brk)."""
+    ausencias, retrasos, salidas = counts
+    day_rate = salario_base / WORKING_DAYS
+    ded = day_rate * (ausencias + retrasos * LATE_FRACTION + salidas * EARLY_FRACTION)
+    brk = dict(brk, ausencias=ausencias, retrasos=retrasos, salidas_anticipadas=salidas, ded_asistencia=ded)
+    return neto - ded, brk
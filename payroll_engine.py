@@ -0,0 +1,93 @@
+# payroll_engine.py — seeded, vectorized payroll amounts for a whole year
+#
+# Same formulas as calc_nomina() in generate_nominas_2025_ultralight.py, but every
+# bonus/deduction for every (month, employee) is drawn at once as a NumPy array
+# from an explicit seed. Same seed + same salaries → bit-identical amounts.
+
+from datetime import date
+
+import numpy as np
+
+class PayrollYear:
+    """Per-(month, employee) amounts; nomina(m, i) mirrors calc_nomina()'s return value."""
+
+    FIELDS = ("bono_rendimiento", "bono_transporte", "bono_alimentacion",
+              "ded_inceso", "ded_iva", "ded_irpf", "otros")
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        # Plain Python lists: per-element access is much cheaper than indexing ndarrays
+        self._bruto = arrays["bruto"].tolist()
+        self._neto = arrays["neto"].tolist()
+        self._fields = {k: arrays[k].tolist() for k in self.FIELDS}
+
+    def nomina(self, month_idx, emp_idx):
+        brk = {k: v[month_idx][emp_idx] for k, v in self._fields.items()}
+        return self._bruto[month_idx][emp_idx], self._neto[month_idx][emp_idx], brk
+
+    def rows(self, employees, year, today=None):
+        # Same keys, order and rounding (half-to-even) as build_row() in the
+        # generator, but every column is rounded in one NumPy call.
+        today = today or date.today()
+        cols = {k: np.rint(v).astype(np.int64).tolist() for k, v in self.arrays.items()}
+        for m, month_cols in enumerate(zip(*(cols[k] for k in ("bruto", "neto") + self.FIELDS))):
+            mm_idx = m + 1
+            periodo = f"{year}-{mm_idx:02d}"
+            fecha_pago = f"{year}-{mm_idx:02d}-25"
+            pagado = date(year, mm_idx, 25) <= today
+            for e, bruto, neto, rend, transp, alim, inceso, iva, irpf, otros in zip(employees, *month_cols):
+                yield {
+                    "employee_id": e["employee_id"],
+                    "nombre": e["nombre"],
+                    "apellidos": e["apellidos"],
+                    "puesto": e["puesto"],
+                    "periodo": periodo,
+                    "fecha_pago": fecha_pago,
+                    "salario_base": round(e["salario_base"]),
+                    "bono_rendimiento": rend,
+                    "bono_transporte": transp,
+                    "bono_alimentacion": alim,
+                    "bruto": bruto,
+                    "ded_inceso": inceso,
+                    "ded_iva": iva,
+                    "ded_irpf": irpf,
+                    "otros": otros,
+                    "neto": neto,
+                    "pagado": pagado
+                }
+
+def compute_arrays(salarios, n_months=12, seed=None):
+    rng = np.random.default_rng(seed)
+    base = np.broadcast_to(np.asarray(salarios, dtype=np.float64), (n_months, len(salarios)))
+    shape = base.shape
+
+    # Bonuses (integer bounds are inclusive, like random.randint)
+    bono_rendimiento  = base * rng.uniform(0.02, 0.08, shape)
+    bono_transporte   = rng.integers(30000, 60000, shape, endpoint=True)
+    bono_alimentacion = rng.integers(25000, 50000, shape, endpoint=True)
+
+    bruto = base + bono_rendimiento + bono_transporte + bono_alimentacion
+
+    # Deductions
+    ded_inceso = bruto * 0.03
+    ded_iva    = bruto * 0.02
+    ded_irpf   = bruto * rng.uniform(0.05, 0.08, shape)
+    otros      = rng.integers(2000, 10000, shape, endpoint=True)
+
+    total_deducciones = ded_inceso + ded_iva + ded_irpf + otros
+    neto = bruto - total_deducciones
+
+    return {
+        "bruto": bruto,
+        "neto": neto,
+        "bono_rendimiento": bono_rendimiento,
+        "bono_transporte": bono_transporte,
+        "bono_alimentacion": bono_alimentacion,
+        "ded_inceso": ded_inceso,
+        "ded_iva": ded_iva,
+        "ded_irpf": ded_irpf,
+        "otros": otros,
+    }
+
+def compute_year(salarios, n_months=12, seed=None):
+    return PayrollYear(compute_arrays(salarios, n_months, seed))
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# payroll_ledger.py — indexed SQLite ledger of every payslip row, with precomputed totals
+#
+# NOMINAS.json is one flat array: "year-to-date neto for employee 7" or "total
+# IRPF for marzo" means parsing and scanning all of it. The ledger keeps the
+# same rows in public/nominas.sqlite (WAL mode, so the app can read while the
+# generator writes), one per (employee_id, periodo), upserted on that key:
+#
+#   nominas             the rows; primary key (employee_id, periodo) serves per-employee
+#                       history and year-to-date ranges, (periodo, orden) month queries
+#                       and the NOMINAS.json order
+#   totales_mes         per periodo: payslips and sums of every amount
+#   totales_empleado    per employee and year: the same sums
+#   nominas_acumulado   view: each row with its running year-to-date bruto / IRPF / neto
+#
+# The two totals tables are rebuilt for the years a write touched, inside the
+# same transaction. A write replaces a whole year: rows of those years that it
+# did not upsert (an employee who left) are removed, as they would be from
+# NOMINAS.json. export() writes NOMINAS.json back byte for byte as the
+# generator does (optional attendance fields only where present).
+#
+#   python payroll_ledger.py import [--from public/NOMINAS.json]
+#   python payroll_ledger.py export [--out public/NOMINAS.json] [--year 2025]
+#   python payroll_ledger.py history 202001 [--year 2025]
+#   python payroll_ledger.py ytd 202001 [--periodo 2025-03]
+#   python payroll_ledger.py month 2025-03
+#
+# generate_nominas_2025_ultralight.py --ledger writes it along with NOMINAS.json.
+
+import argparse, os, sqlite3, sys
+from pathlib import Path
+
+import data_access
+import jsonio
+
+LEDGER_PATH = data_access.PUBLIC / "nominas.sqlite"
+SCHEMA_VERSION = 1
+BATCH = 2000   # rows per executemany()
+
+# NOMINAS.json fields, in the order build_row() writes them; OPTIONAL ones are
+# only in rows generated with --asistencia and are left out when NULL.
+FIELDS = ["employee_id", "nombre", "apellidos", "puesto", "periodo", "fecha_pago", "salario_base",
+          "bono_rendimiento", "bono_transporte", "bono_alimentacion", "bruto", "ded_inceso", "ded_iva",
+          "ded_irpf", "otros", "ausencias", "retrasos", "salidas_anticipadas", "ded_asistencia", "neto", "pagado"]
+OPTIONAL = {"ausencias", "retrasos", "salidas_anticipadas", "ded_asistencia"}
+AMOUNTS = ["salario_base", "bono_rendimiento", "bono_transporte", "bono_alimentacion", "bruto",
+           "ded_inceso", "ded_iva", "ded_irpf", "otros", "ded_asistencia", "neto"]
+
+_SUMS = ", ".join(f"COALESCE(SUM({a}), 0) AS {a}" for a in AMOUNTS)
+_TOTALS_COLUMNS = ", ".join(f"{a} INTEGER NOT NULL" for a in AMOUNTS)
+
+# employee_id has no declared type: ids are stored as the JSON had them (int or str)
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS nominas (
+    employee_id NOT NULL,
+    periodo TEXT NOT NULL,
+    nombre TEXT, apellidos TEXT, puesto TEXT, fecha_pago TEXT,
+    salario_base INTEGER, bono_rendimiento INTEGER, bono_transporte INTEGER, bono_alimentacion INTEGER,
+    bruto INTEGER, ded_inceso INTEGER, ded_iva INTEGER, ded_irpf INTEGER, otros INTEGER,
+    ausencias INTEGER, retrasos INTEGER, salidas_anticipadas INTEGER, ded_asistencia INTEGER,
+    neto INTEGER, pagado INTEGER,
+    extra TEXT,                      -- JSON of any field not listed above
+    orden INTEGER NOT NULL,          -- position in the write, i.e. in NOMINAS.json
+    generacion INTEGER NOT NULL,     -- write that last upserted the row
+    PRIMARY KEY (employee_id, periodo)
+);
+CREATE INDEX IF NOT EXISTS nominas_periodo ON nominas (periodo, orden);
+CREATE TABLE IF NOT EXISTS totales_mes (
+    periodo TEXT PRIMARY KEY, nominas INTEGER NOT NULL, {_TOTALS_COLUMNS}
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS totales_empleado (
+    employee_id NOT NULL, anio TEXT NOT NULL, nominas INTEGER NOT NULL, {_TOTALS_COLUMNS},
+    PRIMARY KEY (employee_id, anio)
+) WITHOUT ROWID;
+CREATE VIEW IF NOT EXISTS nominas_acumulado AS
+    SELECT employee_id, periodo, bruto, ded_irpf, neto,
+           SUM(bruto) OVER anio AS bruto_acumulado,
+           SUM(ded_irpf) OVER anio AS irpf_acumulado,
+           SUM(neto) OVER anio AS neto_acumulado
+    FROM nominas
+    WINDOW anio AS (PARTITION BY employee_id, substr(periodo, 1, 4) ORDER BY periodo);
+"""
+
+_COLUMNS = FIELDS + ["extra", "orden", "generacion"]
+_UPSERT = (f"INSERT INTO nominas ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))}) "
+           f"ON CONFLICT (employee_id, periodo) DO UPDATE SET "
+           + ", ".join(f"{c} = excluded.{c}" for c in _COLUMNS if c not in ("employee_id", "periodo")))
+
+def _year_range(year):
+    return f"{year}-01", f"{year}-12"
+
+class Ledger:
+    """The ledger file. Writes go begin() → add(row) ... → commit() (or rollback())."""
+
+    def __init__(self, path=LEDGER_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")   # durable at checkpoints; WAL keeps it consistent
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise RuntimeError(f"{self.path}: versión de esquema {version}, se esperaba {SCHEMA_VERSION}")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._pending = None   # rows buffered for executemany(), None outside a write
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._pending is not None:
+            self.rollback()
+        self.close()
+
+    # ---------- writing ----------
+
+    def begin(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'generacion'").fetchone()
+        self.generation = (row[0] if row else 0) + 1
+        self.count = 0
+        self.years = set()
+        self._pending = []
+
+    def add(self, row):
+        values = [row.get(f) for f in FIELDS]
+        values[FIELDS.index("pagado")] = None if row.get("pagado") is None else int(bool(row["pagado"]))
+        extra = {k: v for k, v in row.items() if k not in FIELDS}
+        values += [jsonio.dumps(extra, True).decode("utf-8") if extra else None, self.count, self.generation]
+        self._pending.append(values)
+        self.count += 1
+        self.years.add(str(row["periodo"])[:4])
+        if len(self._pending) >= BATCH:
+            self._flush()
+
+    def _flush(self):
+        self.conn.executemany(_UPSERT, self._pending)
+        self._pending.clear()
+
+    def commit(self):
+        """Upserts what is buffered, drops rows of the written years this write did not touch,
+        rebuilds their totals and commits. Returns the number of rows removed."""
+        self._flush()
+        removed = 0
+        for year in sorted(self.years):
+            lo, hi = _year_range(year)
+            removed += self.conn.execute("DELETE FROM nominas WHERE periodo BETWEEN ? AND ? AND generacion != ?",
+                                         (lo, hi, self.generation)).rowcount
+            self._refresh_totals(year)
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('generacion', ?)", (self.generation,))
+        self.conn.execute("COMMIT")
+        self._pending = None
+        return removed
+
+    def rollback(self):
+        if self.conn.in_transaction:
+            self.conn.execute("ROLLBACK")
+        self._pending = None
+
+    def _refresh_totals(self, year):
+        lo, hi = _year_range(year)
+        self.conn.execute("DELETE FROM totales_mes WHERE periodo BETWEEN ? AND ?", (lo, hi))
+        self.conn.execute(f"INSERT INTO totales_mes SELECT periodo, COUNT(*), {_SUMS} FROM nominas "
+                          "WHERE periodo BETWEEN ? AND ? GROUP BY periodo", (lo, hi))
+        self.conn.execute("DELETE FROM totales_empleado WHERE anio = ?", (year,))
+        self.conn.execute(f"INSERT INTO totales_empleado SELECT employee_id, ?, COUNT(*), {_SUMS} FROM nominas "
+                          "WHERE periodo BETWEEN ? AND ? GROUP BY employee_id", (year, lo, hi))
+
+    def import_rows(self, rows):
+        self.begin()
+        try:
+            for row in rows:
+                self.add(row)
+            return self.commit()
+        except BaseException:
+            self.rollback()
+            raise
+
+    # ---------- reading ----------
+
+    @staticmethod
+    def _to_json(rec):
+        row = {}
+        for f in FIELDS:
+            value = rec[f]
+            if value is None and f in OPTIONAL:
+                continue
+            row[f] = bool(value) if f == "pagado" and value is not None else value
+        if rec["extra"]:
+            row.update(jsonio.loads(rec["extra"]))
+        return row
+
+    def rows(self, year=None):
+        """NOMINAS.json rows, in generation order (month by month)."""
+        if year is None:
+            cur = self.conn.execute("SELECT * FROM nominas ORDER BY periodo, orden")
+        else:
+            cur = self.conn.execute("SELECT * FROM nominas WHERE periodo BETWEEN ? AND ? ORDER BY periodo, orden",
+                                    _year_range(year))
+        return [self._to_json(rec) for rec in cur]
+
+    def history(self, employee_id, year=None):
+        if year is None:
+            cur = self.conn.execute("SELECT * FROM nominas WHERE employee_id = ? ORDER BY periodo", (employee_id,))
+        else:
+            cur = self.conn.execute("SELECT * FROM nominas WHERE employee_id = ? AND periodo BETWEEN ? AND ? "
+                                    "ORDER BY periodo", (employee_id, *_year_range(year)))
+        return [self._to_json(rec) for rec in cur]
+
+    def ytd(self, employee_id, periodo=None):
+        """Sums from January to `periodo` (default: the employee's last payslip) of its year."""
+        if periodo is None:
+            row = self.conn.execute("SELECT MAX(periodo) FROM nominas WHERE employee_id = ?", (employee_id,)).fetchone()
+            periodo = row[0]
+            if periodo is None:
+                return None
+        rec = self.conn.execute(f"SELECT COUNT(*) AS nominas, {_SUMS} FROM nominas "
+                                "WHERE employee_id = ? AND periodo BETWEEN ? AND ?",
+                                (employee_id, f"{periodo[:4]}-01", periodo)).fetchone()
+        return dict(rec, employee_id=employee_id, periodo=periodo) if rec["nominas"] else None
+
+    def year_totals(self, employee_id, year):
+        rec = self.conn.execute("SELECT * FROM totales_empleado WHERE employee_id = ? AND anio = ?",
+                                (employee_id, str(year))).fetchone()
+        return dict(rec) if rec else None
+
+    def month_totals(self, periodo):
+        rec = self.conn.execute("SELECT * FROM totales_mes WHERE periodo = ?", (periodo,)).fetchone()
+        return dict(rec) if rec else None
+
+    def export(self, path=data_access.NOMINAS_PATH, year=None, compact=None):
+        """Writes NOMINAS.json (jsonio.write_json() layout, as the generator). Returns the row count."""
+        rows = self.rows(year)
+        jsonio.write_json(path, rows, compact)
+        return len(rows)
+
+# ---------- CLI ----------
+
+def _employee_id(value):
+    # Ids are ints in NOMINAS.json; anything else is looked up as given
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+def _money(n):
+    return f"{n:>14,}".replace(",", ".")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Libro de nóminas en SQLite: importación, exportación y consultas.")
+    parser.add_argument("--ledger", default=str(LEDGER_PATH), help="Fichero SQLite del libro")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("import", help="Carga NOMINAS.json en el libro (reemplaza los años que contiene)")
+    p.add_argument("--from", dest="source", default=str(data_access.NOMINAS_PATH))
+    p = sub.add_parser("export", help="Escribe NOMINAS.json a partir del libro")
+    p.add_argument("--out", default=str(data_access.NOMINAS_PATH))
+    p.add_argument("--year", default=None)
+    p = sub.add_parser("history", help="Nóminas de un empleado")
+    p.add_argument("employee_id", type=_employee_id)
+    p.add_argument("--year", default=None)
+    p = sub.add_parser("ytd", help="Acumulado del año de un empleado hasta un periodo")
+    p.add_argument("employee_id", type=_employee_id)
+    p.add_argument("--periodo", default=None, help="YYYY-MM (por defecto, su última nómina)")
+    p = sub.add_parser("month", help="Totales de un periodo")
+    p.add_argument("periodo", help="YYYY-MM")
+    args = parser.parse_args(argv)
+
+    if args.cmd != "import" and not os.path.exists(args.ledger):
+        sys.exit(f"❌ No existe el libro {args.ledger}: créalo con 'import' o con generate_nominas --ledger")
+    with Ledger(args.ledger) as ledger:
+        if args.cmd == "import":
+            removed = ledger.import_rows(data_access.load_nominas(args.source))
+            print(f"🗄️  Libro de nóminas: {ledger.count} filas importadas, {removed} eliminadas → {args.ledger}")
+        elif args.cmd == "export":
+            n = ledger.export(args.out, args.year)
+            print(f"✅ {n} nóminas exportadas → {args.out}")
+        elif args.cmd == "history":
+            rows = ledger.history(args.employee_id, args.year)
+            for row in rows:
+                print(f"{row['periodo']}  bruto {_money(row['bruto'])}  IRPF {_money(row['ded_irpf'])}  "
+                      f"neto {_money(row['neto'])}  {'pagada' if row.get('pagado') else 'pendiente'}")
+            print(f"{len(rows)} nómina(s) del empleado {args.employee_id}")
+        else:
+            totals = ledger.ytd(args.employee_id, args.periodo) if args.cmd == "ytd" else ledger.month_totals(args.periodo)
+            if totals is None:
+                sys.exit("❌ No hay nóminas para esa consulta")
+            title = (f"Acumulado {totals['periodo'][:4]} del empleado {args.employee_id} hasta {totals['periodo']}"
+                     if args.cmd == "ytd" else f"Totales de {args.periodo}")
+            print(f"📊 {title} ({totals['nominas']} nóminas)")
+            for name in AMOUNTS:
+                print(f"  {name:<18}{_money(totals[name])}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# photo_derivatives.py — resized thumbnails of fotos_empleados / fotos_vehiculos
+#
+# Lists and org charts were loading full-resolution photos. For every photo
+# this writes one derivative per size in SIZES (longest side, never upscaled)
+# to public/fotos_derivadas/<colección>/<sha256[:16]>-<px>-q<quality>.<ext>.
+# Names come from the content hash, so an unchanged (or merely renamed) photo
+# is never encoded again and copies of one photo are encoded once; hashes are
+# memoized by (mtime, size) in fotos_derivadas/index.json. Missing derivatives
+# are encoded in a process pool, and each record whose "foto" points at a
+# photo gets
+#
+#   "foto_derivados": {"mini": "/fotos_derivadas/...", "tarjeta": "...", "ficha": "..."}
+#
+# Derivatives no photo uses any more are deleted.
+#
+#   python photo_derivatives.py [empleados vehiculos] [--jobs 4] [--format webp|jpeg] [--dry-run] [--profile]
+#
+# sync_employees_and_docs.py runs the "empleados" part itself, after linking photos.
+
+import argparse, hashlib, io, os, time, traceback
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import data_access
+import employee_journal
+import instrumentation
+import jsonio
+
+PUBLIC = data_access.PUBLIC
+OUT_ROOT = PUBLIC / "fotos_derivadas"
+INDEX_PATH = OUT_ROOT / "index.json"
+INDEX_VERSION = 1
+
+SIZES = {"mini": 96, "tarjeta": 256, "ficha": 640}   # name → longest side in px
+QUALITY = {"webp": 80, "jpeg": 82}
+EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif", ".tif", ".tiff"}
+
+# collection → (photo directory, data file holding the records)
+COLLECTIONS = {
+    "empleados": (PUBLIC / "fotos_empleados", data_access.EMPLEADOS_PATH),
+    "vehiculos": (PUBLIC / "fotos_vehiculos", PUBLIC / "flota.json"),
+}
+
+# ---------- encoding (pool workers) ----------
+
+def _encode_job(job):
+    # (source, [(px, out_path), ...], format, quality) → (source, bytes written, error).
+    # Never raises: one unreadable photo does not abort the batch.
+    src, targets, fmt, quality = job
+    written = 0
+    try:
+        from PIL import Image, ImageOps
+        with Image.open(src) as im:
+            im = ImageOps.exif_transpose(im)
+            has_alpha = im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+            im = im.convert("RGBA" if has_alpha and fmt == "webp" else "RGB")
+            # Largest first, each one shrunk from the previous: cheaper than from the original
+            for px, out in sorted(targets, reverse=True):
+                im.thumbnail((px, px), Image.LANCZOS)
+                buf = io.BytesIO()
+                if fmt == "webp":
+                    im.save(buf, format="WEBP", quality=quality, method=4)
+                else:
+                    im.save(buf, format="JPEG", quality=quality, optimize=True, progressive=True)
+                # Temp file + rename: a reader never sees a half-written derivative
+                tmp = Path(f"{out}.{os.getpid()}.tmp")
+                try:
+                    tmp.write_bytes(buf.getvalue())
+                    os.replace(tmp, out)
+                except BaseException:
+                    tmp.unlink(missing_ok=True)
+                    raise
+                written += buf.tell()
+        return src, written, None
+    except Exception as exc:
+        return src, written, traceback.format_exception_only(type(exc), exc)[-1].strip()
+
+def encode_all(jobs, workers=1):
+    if workers <= 1 or len(jobs) <= 1:
+        yield from map(_encode_job, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_encode_job, jobs)
+
+# ---------- index ----------
+
+def load_index(path=INDEX_PATH):
+    try:
+        index = jsonio.load(path)
+        if index.get("version") == INDEX_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "collections": {}}
+
+def content_hash(path: Path, memo: dict) -> str:
+    # memo: file name → [mtime_ns, size, sha256[:16]], as kept in the index
+    st = path.stat()
+    cached = memo.get(path.name)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    memo[path.name] = [st.st_mtime_ns, st.st_size, h.hexdigest()[:16]]
+    return memo[path.name][2]
+
+def default_format():
+    from PIL import features
+    return "webp" if features.check("webp") else "jpeg"
+
+# ---------- collections ----------
+
+def build(collection, index, jobs=1, fmt="webp", dry_run=False):
+    """Derivatives of every photo in `collection`, encoding only the missing ones.
+    Returns ({photo file name: {size name: web path}}, stats)."""
+    photos_dir, _ = COLLECTIONS[collection]
+    out_dir = OUT_ROOT / collection
+    memo = index["collections"].setdefault(collection, {})
+    quality = QUALITY[fmt]
+    sources = sorted(p for p in photos_dir.iterdir() if p.is_file() and p.suffix.lower() in EXTENSIONS) \
+        if photos_dir.is_dir() else []
+    for name in set(memo) - {p.name for p in sources}:
+        del memo[name]
+
+    derived, work, keep = {}, [], set()
+    queued = {}   # content hash → names of the photos with that content (encoded once)
+    stats = {"fotos": len(sources), "bytes_origen": 0, "codificadas": 0, "bytes_codificados": 0, "bytes_escritos": 0,
+             "errores": [], "por_tamano": {name: [0, 0] for name in SIZES}}   # size → [source bytes, derivative bytes]
+    for src in sources:
+        digest = content_hash(src, memo)
+        paths, missing = {}, []
+        for name, px in SIZES.items():
+            filename = f"{digest}-{px}-q{quality}.{fmt if fmt == 'webp' else 'jpg'}"
+            paths[name] = f"/fotos_derivadas/{collection}/{filename}"
+            keep.add(filename)
+            if not (out_dir / filename).exists():
+                missing.append((px, str(out_dir / filename)))
+        derived[src.name] = paths
+        stats["bytes_origen"] += memo[src.name][1]
+        if digest in queued:
+            # Same content as a photo already queued: same output files, one encode
+            queued[digest].append(src.name)
+        elif missing:
+            queued[digest] = [src.name]
+            work.append((str(src), missing, fmt, quality))
+
+    if work and not dry_run:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for src, nbytes, error in encode_all(work, workers=jobs):
+            stats["bytes_escritos"] += nbytes
+            if error:
+                stats["errores"].append(f"{Path(src).name}: {error}")
+                for name in queued[memo[Path(src).name][2]]:
+                    derived.pop(name, None)
+            else:
+                stats["codificadas"] += 1
+                stats["bytes_codificados"] += memo[Path(src).name][1]
+    stats["pendientes"] = len(work) if dry_run else 0
+
+    if not dry_run and out_dir.is_dir():
+        stats["eliminadas"] = 0
+        for path in out_dir.iterdir():
+            if path.is_file() and path.name not in keep:
+                path.unlink()
+                stats["eliminadas"] += 1
+    for name, px in SIZES.items():
+        for src_name, paths in derived.items():
+            out = out_dir / Path(paths[name]).name
+            if out.exists():
+                stats["por_tamano"][name][0] += memo[src_name][1]
+                stats["por_tamano"][name][1] += out.stat().st_size
+    return derived, stats
+
+def attach(records, derived):
+    """Sets "foto_derivados" on every record whose "foto" is a known photo. Returns how many changed."""
+    changed = 0
+    for rec in records:
+        foto = rec.get("foto")
+        paths = derived.get(Path(foto).name) if isinstance(foto, str) and foto else None
+        if paths is None:
+            if rec.pop("foto_derivados", None) is not None:
+                changed += 1
+        elif rec.get("foto_derivados") != paths:
+            rec["foto_derivados"] = paths
+            changed += 1
+    return changed
+
+def update(collection, records, jobs=1, fmt=None, dry_run=False):
+    """build() + attach() + index. Records are changed in place; the caller writes them. Returns stats."""
+    t0 = time.perf_counter()
+    fmt = fmt or default_format()
+    index = load_index()
+    before = jsonio.dumps(index, True)
+    derived, stats = build(collection, index, jobs=jobs, fmt=fmt, dry_run=dry_run)
+    stats["registros_actualizados"] = attach(records, derived)
+    if not dry_run and jsonio.dumps(index, True) != before:
+        OUT_ROOT.mkdir(parents=True, exist_ok=True)
+        jsonio.write_json(INDEX_PATH, index, compact=True)
+    stats["segundos"] = time.perf_counter() - t0
+    return stats
+
+def _mb(n):
+    return f"{n / (1 << 20):.2f} MB" if n >= 1 << 20 else f"{n / 1024:.1f} KB"
+
+def report(collection, stats):
+    secs = stats["segundos"]
+    rate = f"{stats['codificadas'] / secs:.1f} fotos/s, {stats['bytes_codificados'] / secs / (1 << 20):.1f} MB/s" \
+        if stats["codificadas"] else "nada que codificar"
+    lines = [f"🖼️  {collection}: {stats['fotos']} fotos ({_mb(stats['bytes_origen'])})  |  "
+             f"codificadas: {stats['codificadas']}  |  eliminadas: {stats.get('eliminadas', 0)}  |  registros actualizados: {stats['registros_actualizados']}  |  "
+             f"{secs:.2f}s ({rate})"]
+    if stats.get("pendientes"):
+        lines.append(f"   🔎 {stats['pendientes']} fotos se codificarían")
+    for name, (src_bytes, out_bytes) in stats["por_tamano"].items():
+        if src_bytes:
+            lines.append(f"   {name:<8} {SIZES[name]:>4}px  {_mb(src_bytes)} → {_mb(out_bytes)}  "
+                         f"(ahorro {_mb(src_bytes - out_bytes)}, -{(1 - out_bytes / src_bytes) * 100:.0f}%)")
+    for error in stats["errores"]:
+        lines.append(f"   ❌ {error}")
+    return "\n".join(lines)
+
+# ---------- MAIN ----------
+
+def load_records(collection):
+    # (records carrying "foto", function that writes them back and returns the paths written)
+    _, path = COLLECTIONS[collection]
+    if collection == "empleados":
+        since = employee_journal.current_seq(path)
+        empleados, wrapped = data_access.load_empleados(path)
+        before, _ = data_access.load_empleados(path)
+        out = data_access.dump_empleados(empleados, wrapped)
+        return empleados, lambda: employee_journal.record(path, out, before, empleados, since=since)["written"]
+    data = jsonio.load(path)
+    return data.get("vehiculos", []), lambda: jsonio.write_json(path, data) or [path]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Genera miniaturas de las fotos de empleados y vehículos.")
+    parser.add_argument("collections", nargs="*", metavar="colección",
+                        help=f"Colecciones (por defecto todas: {', '.join(COLLECTIONS)})")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Procesos para codificar en paralelo")
+    parser.add_argument("--format", choices=("webp", "jpeg"), default=None,
+                        help="Formato de las miniaturas (por defecto webp si Pillow lo soporta)")
+    parser.add_argument("--dry-run", action="store_true", help="No escribe nada (tampoco el informe de reports/); sólo informa de lo que haría")
+    instrumentation.add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    unknown = set(args.collections) - set(COLLECTIONS)
+    if unknown:
+        parser.error(f"colecciones desconocidas: {', '.join(sorted(unknown))}")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    failed = False
+    # A dry run writes nothing, not even its report
+    reports_dir = None if args.dry_run else instrumentation.REPORTS_DIR
+    with instrumentation.Run("photo_derivatives", argv, profile=args.profile, reports_dir=reports_dir) as run:
+        for collection in args.collections or list(COLLECTIONS):
+            with run.stage(collection):
+                records, save = load_records(collection)
+                stats = update(collection, records, jobs=args.jobs, fmt=args.format, dry_run=args.dry_run)
+                if stats["registros_actualizados"] and not args.dry_run:
+                    run.wrote(*save())
+            run.count("fotos", stats["fotos"])
+            run.count("fotos_codificadas", stats["codificadas"])
+            run.count("bytes_escritos", stats["bytes_escritos"])
+            print(report(collection, stats))
+            failed = failed or bool(stats["errores"])
+        print(run.timings_line())
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# photo_index.py — token index over photo filenames (fotos_empleados, fotos_vehiculos)
+#
+# Filenames are normalized once (accents folded, lowercased, split on anything
+# that is not a letter or digit) into an inverted index token → photos. A lookup
+# intersects the postings of the query tokens, rarest first, so it only touches
+# photos that contain every token instead of scanning the whole directory, and it
+# picks the best candidate by score instead of the first substring hit.
+#
+#   python photo_index.py public/fotos_empleados "Maria Jose Biong Bill" ...
+
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+from textnorm import tokenize
+
+# path: chosen photo (None if missing or ambiguous); score: 1.0 = the filename
+# has exactly the query tokens; candidates: every photo tied at the best score
+PhotoMatch = namedtuple("PhotoMatch", "path score candidates")
+
+class PhotoIndex:
+    """Inverted index of photo filenames; match(query) returns a PhotoMatch."""
+
+    def __init__(self, paths):
+        self.paths = sorted(paths, key=lambda p: str(p))
+        self._tokens = []      # photo idx → set of tokens of its stem
+        self._postings = {}    # token → set of photo idx
+        for i, path in enumerate(self.paths):
+            tokens = set(tokenize(Path(path).stem))
+            self._tokens.append(tokens)
+            for tok in tokens:
+                self._postings.setdefault(tok, set()).add(i)
+
+    @classmethod
+    def from_dir(cls, directory):
+        return cls(p for p in Path(directory).iterdir() if p.is_file())
+
+    def __len__(self):
+        return len(self.paths)
+
+    def match(self, query) -> PhotoMatch:
+        tokens = set(tokenize(query))
+        if not tokens:
+            return PhotoMatch(None, 0.0, [])
+        postings = [self._postings.get(tok) for tok in tokens]
+        if not all(postings):
+            return PhotoMatch(None, 0.0, [])
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return PhotoMatch(None, 0.0, [])
+
+        # Every candidate has all query tokens; prefer the one with fewest extras
+        best, tied = 0.0, []
+        for i in candidates:
+            score = len(tokens) / len(self._tokens[i])
+            if score > best:
+                best, tied = score, [i]
+            elif score == best:
+                tied.append(i)
+        tied.sort()
+        paths = [self.paths[i] for i in tied]
+        return PhotoMatch(paths[0] if len(paths) == 1 else None, best, paths)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        sys.exit("Uso: python photo_index.py <directorio> <consulta> [<consulta> ...]")
+    index = PhotoIndex.from_dir(sys.argv[1])
+    for query in sys.argv[2:]:
+        m = index.match(query)
+        if m.path:
+            print(f"✅ {query} → {Path(m.path).name} (score {m.score:.2f})")
+        elif m.candidates:
+            print(f"⚠️ {query}: ambigua entre " + ", ".join(Path(p).name for p in m.candidates))
+        else:
+            print(f"❌ {query}: sin foto")
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# pipeline.py — runs sync → attendance → payroll as a dependency graph
+#
+# Each stage is one of the existing scripts plus the files it reads and writes.
+# A stage depends on every stage that writes one of its inputs, so today:
+#
+#   sync ──► nominas          asistencia (independent, runs alongside sync)
+#
+# Make-style, but on content: a stage is skipped when the SHA-256 of its
+# inputs (scripts included) and of its outputs, and its arguments, match what
+# was recorded after its last successful run. File hashes are memoized by
+# (mtime, size) in .cache/pipeline.json, so a no-op run reads almost nothing.
+# Ready stages run concurrently (--jobs), each as its own process; a failed
+# stage blocks everything downstream of it.
+#
+#   python pipeline.py                     # everything that is stale
+#   python pipeline.py nominas             # nominas and what it depends on
+#   python pipeline.py --force --seed 7    # rebuild all, reproducibly
+#   python pipeline.py --dry-run           # only say what would run
+
+import argparse, hashlib, subprocess, sys, time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import jsonio
+
+ROOT = Path(__file__).resolve().parent
+STATE_PATH = ROOT / ".cache" / "pipeline.json"
+STATE_VERSION = 1
+
+@dataclass
+class Stage:
+    name: str
+    script: str
+    inputs: list                                 # paths relative to ROOT (files or directories)
+    outputs: list
+    args: list = field(default_factory=list)
+
+    def arguments(self, seed=None):
+        args = list(self.args)
+        if seed is not None and self.name in SEEDED:
+            args += ["--seed", str(seed)]
+        return args
+
+SEEDED = {"asistencia", "nominas"}
+
+STAGES = [
+    Stage("sync", "sync_employees_and_docs.py",
+          inputs=["sync_employees_and_docs.py", "pdf_templates.py", "photo_index.py", "textnorm.py",
+                  "photo_derivatives.py", "data_access.py", "attendance_store.py", "employee_journal.py", "jsonio.py",
+                  "instrumentation.py", "public/datos_empleados.json", "public/datos_empleados.journal.jsonl",
+                  "public/fotos_empleados"],
+          outputs=["public/datos_empleados.json", "public/datos_empleados.journal.jsonl", "public/documentos_empleados",
+                   "public/fotos_derivadas"]),
+    Stage("asistencia", "randomize_attendace.py",
+          inputs=["randomize_attendace.py", "attendance_store.py", "attendance_summary.py", "attendance_query.py",
+                  "textnorm.py", "data_access.py", "employee_journal.py", "jsonio.py", "instrumentation.py",
+                  "public/attendance_2025.json"],
+          outputs=["public/attendance_2025.json", "public/attendance_2025.cols.json",
+                   "public/attendance_summary.json", "public/attendance_index.json"],
+          args=["--engine", "numpy"]),
+    Stage("nominas", "generate_nominas_2025_ultralight.py",
+          inputs=["generate_nominas_2025_ultralight.py", "payroll_engine.py", "payroll_attendance.py", "payroll_ledger.py",
+                  "textnorm.py", "pdf_templates.py", "data_access.py", "attendance_store.py", "employee_journal.py",
+                  "jsonio.py", "instrumentation.py", "src/assets/elebilogo.png", "public/datos_empleados.json",
+                  "public/datos_empleados.journal.jsonl"],
+          outputs=["public/NOMINAS.json", "public/nominas_2025"],
+          args=["--incremental"]),
+]
+
+# ---------- content hashes ----------
+
+class Hasher:
+    """SHA-256 of files and directory trees, memoized by (mtime_ns, size)."""
+
+    def __init__(self, memo=None):
+        self.memo = memo if memo is not None else {}   # relpath → [mtime_ns, size, sha256]
+
+    def file(self, path: Path) -> str:
+        st = path.stat()
+        rel = path.relative_to(ROOT).as_posix()
+        cached = self.memo.get(rel)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        self.memo[rel] = [st.st_mtime_ns, st.st_size, h.hexdigest()]
+        return h.hexdigest()
+
+    def path(self, rel: str) -> str:
+        path = ROOT / rel
+        if path.is_file():
+            return self.file(path)
+        if not path.is_dir():
+            return "missing"
+        h = hashlib.sha256()
+        for sub in sorted(p for p in path.rglob("*") if p.is_file() and not p.name.endswith(".tmp")):
+            h.update(sub.relative_to(path).as_posix().encode("utf-8") + b"\0" + self.file(sub).encode("ascii"))
+        return h.hexdigest()
+
+    def digest(self, rels, extra=()) -> str:
+        h = hashlib.sha256()
+        for item in list(extra) + [f"{rel}={self.path(rel)}" for rel in rels]:
+            h.update(item.encode("utf-8") + b"\n")
+        return h.hexdigest()[:16]
+
+def load_state():
+    try:
+        state = jsonio.load(STATE_PATH)
+        if state.get("version") == STATE_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {"version": STATE_VERSION, "files": {}, "stages": {}}
+
+def save_state(state):
+    # Forget hashes of files that no longer exist (old payslips, renamed photos)
+    state["files"] = {rel: entry for rel, entry in state["files"].items() if (ROOT / rel).exists()}
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    jsonio.write_json(STATE_PATH, state, compact=True)
+
+# ---------- graph ----------
+
+def dependencies(stages):
+    # A stage depends on every other stage that writes one of its inputs
+    writers = {}
+    for st in stages:
+        for out in st.outputs:
+            writers.setdefault(out, []).append(st.name)
+    return {st.name: sorted({w for rel in st.inputs for w in writers.get(rel, []) if w != st.name})
+            for st in stages}
+
+def select(stages, deps, targets):
+    # The requested stages plus everything upstream of them
+    if not targets:
+        return stages
+    unknown = set(targets) - {st.name for st in stages}
+    if unknown:
+        raise ValueError(f"Etapas desconocidas: {', '.join(sorted(unknown))}")
+    wanted, todo = set(), list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in wanted:
+            wanted.add(name)
+            todo.extend(deps[name])
+    return [st for st in stages if st.name in wanted]
+
+# ---------- run ----------
+
+def run_stage(stage, seed):
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, str(ROOT / stage.script), *stage.arguments(seed)],
+                          cwd=ROOT, capture_output=True, text=True)
+    return proc.returncode, proc.stdout + proc.stderr, time.perf_counter() - t0
+
+def run(stages, jobs=1, force=False, dry_run=False, seed=None):
+    """Runs the stale stages in dependency order. Returns {name: (status, seconds)}."""
+    deps = dependencies(stages)
+    state = load_state()
+    hasher = Hasher(state["files"])
+    results = {}
+    pending = {st.name: st for st in stages}
+    running = {}
+
+    def input_digest(st):
+        return hasher.digest(st.inputs, extra=[" ".join(st.arguments(seed))])
+
+    def is_fresh(st):
+        record = state["stages"].get(st.name)
+        return (record is not None and record.get("inputs") == input_digest(st)
+                and record.get("outputs") == hasher.digest(st.outputs))
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            for name, st in list(pending.items()):
+                if any(d not in results for d in deps[name]):
+                    continue
+                del pending[name]
+                upstream = {results[d][0] for d in deps[name]}
+                command = " ".join([st.script, *st.arguments(seed)])
+                if upstream & {"error", "bloqueada"}:
+                    results[name] = ("bloqueada", 0.0)
+                    print(f"⛔ {name}: bloqueada por un error anterior")
+                elif not force and "se ejecutaría" not in upstream and is_fresh(st):
+                    results[name] = ("al día", 0.0)
+                    print(f"✔️  {name}: al día")
+                elif dry_run:
+                    # Stages downstream of this one would see new inputs: they would run too
+                    results[name] = ("se ejecutaría", 0.0)
+                    print(f"🔎 {name}: se ejecutaría ({command})")
+                else:
+                    print(f"▶️  {name}: {command}")
+                    running[pool.submit(run_stage, st, seed)] = st
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                st = running.pop(future)
+                code, output, seconds = future.result()
+                for line in output.rstrip().splitlines():
+                    print(f"   [{st.name}] {line}")
+                if code == 0:
+                    state["stages"][st.name] = {"inputs": input_digest(st), "outputs": hasher.digest(st.outputs),
+                                                "seconds": round(seconds, 3), "finished": time.time()}
+                    results[st.name] = ("ejecutada", seconds)
+                else:
+                    state["stages"].pop(st.name, None)
+                    results[st.name] = ("error", seconds)
+                    print(f"❌ {st.name}: terminó con código {code}")
+    if not dry_run:
+        save_state(state)
+    return results
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ejecuta sync → asistencia → nóminas, sólo lo que ha cambiado.")
+    parser.add_argument("stages", nargs="*", help=f"Etapas a actualizar (por defecto todas: {', '.join(s.name for s in STAGES)})")
+    parser.add_argument("--force", action="store_true", help="Ejecuta las etapas aunque estén al día")
+    parser.add_argument("--dry-run", action="store_true", help="Sólo muestra qué etapas se ejecutarían")
+    parser.add_argument("--jobs", type=int, default=2, help="Etapas independientes en paralelo")
+    parser.add_argument("--seed", type=int, default=None, help="Semilla para asistencia y nóminas (reproducible)")
+    parser.add_argument("--list", action="store_true", help="Muestra las etapas y sus dependencias")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    deps = dependencies(STAGES)
+    if args.list:
+        for st in STAGES:
+            print(f"{st.name:<11} ← {', '.join(deps[st.name]) or '—'}  ({st.script})")
+        return
+    try:
+        stages = select(STAGES, deps, args.stages)
+    except ValueError as exc:
+        sys.exit(f"❌ {exc}")
+    t0 = time.perf_counter()
+    results = run(stages, jobs=args.jobs, force=args.force, dry_run=args.dry_run, seed=args.seed)
+    print("⏱️ Tiempos: " + "  |  ".join(f"{st.name} {results[st.name][0]} {results[st.name][1]:.2f}s" for st in stages)
+          + f"  |  total {time.perf_counter() - t0:.2f}s")
+    if any(status in ("error", "bloqueada") for status, _ in results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,22 @@
 #!/usr/bin/env python3
-import json
 import os
 import random
-from datetime import datetime, time
+import argparse
+import base64
+import time as clock
+from datetime import date, datetime, time
+
+import attendance_query
+import attendance_store
+import attendance_summary
+import data_access
+import instrumentation
+import jsonio
 
 # CONFIG
 INPUT_PATH = "public/attendance_2025.json"
 OUTPUT_PATH = "public/attendance_2025.json"  # change to ..._synthetic.json if you want to keep original
+STORE_PATH = "public/attendance_2025.cols.json"  # columnar copy the views load (see attendance_store.py)
 
 YEAR_KEY = "2025"
 
@@ -31,21 +41,21 @@ def is_friday(date_str: str, year: int, month_num: int, day: int) -> bool:
     except ValueError:
         return False
 
-def pick_late_time():
+def pick_late_time(rng=random):
     # 09:05–09:35
-    minute = random.choice([5, 10, 12, 15, 20, 25, 30, 35])
+    minute = rng.choice(LATE_MINUTES)
     return time(9, minute).strftime("%H:%M:%S")
 
-def pick_early_leave(is_friday: bool):
+def pick_early_leave(is_friday: bool, rng=random):
     # normal day → 15:00–16:30
     if is_friday:
         # if it is already 14:00, make it earlier, like 12:30–13:30
         hour = 12
-        minute = random.choice([30, 45, 50, 55])
+        minute = rng.choice(EARLY_FRIDAY_MINUTES)
         return time(hour, minute).strftime("%H:%M:%S")
     else:
-        hour = random.choice([15, 16])
-        minute = random.choice([0, 15, 30, 45])
+        hour = rng.choice(EARLY_HOURS)
+        minute = rng.choice(EARLY_MINUTES)
         return time(hour, minute).strftime("%H:%M:%S")
 
 def base_entry_time():
@@ -54,105 +64,402 @@ def base_entry_time():
 def base_exit_time(is_friday: bool):
     return "14:00:00" if is_friday else "17:00:00"
 
+LATE_MINUTES = [5, 10, 12, 15, 20, 25, 30, 35]
+EARLY_FRIDAY_MINUTES = [30, 45, 50, 55]
+EARLY_HOURS = [15, 16]
+EARLY_MINUTES = [0, 15, 30, 45]
+
+# A "normal" day only overwrites these observaciones; anything else is kept
+RESETTABLE_OBS = (None, "", "Completo", "Incompleto", "Tarde", "Ausencia Injustificada")
+
 # Month name → number (your JSON is in Spanish)
-MONTHS_ES = {
-    "enero": 1,
-    "febrero": 2,
-    "marzo": 3,
-    "abril": 4,
-    "mayo": 5,
-    "junio": 6,
-    "julio": 7,
-    "agosto": 8,
-    "septiembre": 9,
-    "octubre": 10,
-    "noviembre": 11,
-    "diciembre": 12,
-}
-
-def main():
-    if not os.path.exists(INPUT_PATH):
-        print(f"❌ No se encontró {INPUT_PATH}")
+MONTHS_ES = attendance_store.MONTHS_ES
+
+# Scalar engine -------------------------------------------------------
+
+def randomize_record(rec: dict, year: int, month_num: int, rng=random):
+    day = rec.get("day")
+    if not day:
         return
 
-    with open(INPUT_PATH, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    # Detect if this date is Friday
+    friday = is_friday("dummy", year, month_num, int(day))
+    prefix = f"{year}-{month_num:02d}-{day:02d}T"
+
+    # Roll a random behavior
+    r = rng.random()
 
+    # ABSENCE ------------------------------------------------
+    if r < P_ABSENT:
+        rec["hora_entrada"] = None
+        rec["hora_salida"] = None
+        rec["observaciones"] = "Ausencia Injustificada"
+        rec["explicacion"] = ""
+        return
+
+    # MISSION / VISIT ----------------------------------------
+    if r < P_ABSENT + P_MISSION:
+        rec["hora_entrada"] = f"{prefix}09:00:00"
+        rec["hora_salida"] = f"{prefix}{base_exit_time(friday)}"
+        rec["observaciones"] = "Comisión de servicio"
+        rec["explicacion"] = "Visita/gestión fuera de oficina."
+        return
+
+    # REMOTE -------------------------------------------------
+    if r < P_ABSENT + P_MISSION + P_REMOTE:
+        rec["hora_entrada"] = f"{prefix}09:00:00"
+        rec["hora_salida"] = f"{prefix}{base_exit_time(friday)}"
+        rec["observaciones"] = "Teletrabajo"
+        rec["explicacion"] = "Actividad remota autorizada."
+        return
+
+    # LATE ---------------------------------------------------
+    if r < P_ABSENT + P_MISSION + P_REMOTE + P_LATE:
+        late_time = pick_late_time(rng)
+        rec["hora_entrada"] = f"{prefix}{late_time}"
+        rec["hora_salida"] = f"{prefix}{base_exit_time(friday)}"
+        rec["observaciones"] = "Tarde"
+        rec["explicacion"] = "Retraso leve."
+        return
+
+    # EARLY LEAVE --------------------------------------------
+    if r < P_ABSENT + P_MISSION + P_REMOTE + P_LATE + P_EARLY:
+        early = pick_early_leave(friday, rng)
+        rec["hora_entrada"] = f"{prefix}09:00:00"
+        rec["hora_salida"] = f"{prefix}{early}"
+        rec["observaciones"] = "Incompleto"
+        rec["explicacion"] = "Salida anticipada."
+        return
+
+    # NORMAL -------------------------------------------------
+    rec["hora_entrada"] = f"{prefix}09:00:00"
+    rec["hora_salida"] = f"{prefix}{base_exit_time(friday)}"
+    if rec.get("observaciones") in RESETTABLE_OBS:
+        rec["observaciones"] = "Completo"
+    if rec.get("explicacion") is None:
+        rec["explicacion"] = ""
+
+def randomize_nested(data: dict, year_keys, rng=random):
     # data structure: { "Empleado": { "2025": { "enero": [ {...}, ...], ... } }, ... }
     for employee_name, years in data.items():
-        year_block = years.get(YEAR_KEY)
-        if not year_block:
-            continue
-
-        for month_name, records in year_block.items():
-            month_num = MONTHS_ES.get(month_name.lower())
-            if not month_num:
+        for year_key in year_keys:
+            year_block = years.get(year_key)
+            if not year_block:
                 continue
 
-            for rec in records:
-                day = rec.get("day")
-                if not day:
+            for month_name, records in year_block.items():
+                month_num = MONTHS_ES.get(month_name.lower())
+                if not month_num:
                     continue
 
-                # Detect if this date is Friday
-                friday = is_friday("dummy", int(YEAR_KEY), month_num, int(day))
+                for rec in records:
+                    randomize_record(rec, int(year_key), month_num, rng)
+                instrumentation.count("registros", len(records))
 
-                # Roll a random behavior
-                r = random.random()
+# Batch (NumPy) engine ----------------------------------------------
+#
+# Works on the columnar store (attendance_store.py) directly: every record of
+# every selected employee-year is drawn at once. Same P_* probabilities, same
+# times and texts as randomize_record(); a different random stream.
 
-                # ABSENCE ------------------------------------------------
-                if r < P_ABSENT:
-                    rec["hora_entrada"] = None
-                    rec["hora_salida"] = None
-                    rec["observaciones"] = "Ausencia Injustificada"
-                    rec["explicacion"] = ""
-                    continue
+def friday_table(year: int):
+    # Day-of-year offset → is Friday, computed once per calendar date
+    import numpy as np
+    start = date(year, 1, 1)
+    n_days = (date(year + 1, 1, 1) - start).days
+    return (start.weekday() + np.arange(n_days)) % 7 == 4
 
-                # MISSION / VISIT ----------------------------------------
-                if r < P_ABSENT + P_MISSION:
-                    rec["hora_entrada"] = f"2025-{month_num:02d}-{day:02d}T09:00:00"
-                    rec["hora_salida"] = f"2025-{month_num:02d}-{day:02d}T{base_exit_time(friday)}"
-                    rec["observaciones"] = "Comisión de servicio"
-                    rec["explicacion"] = "Visita/gestión fuera de oficina."
-                    continue
+def _column_np(col):
+    # Packed base64 string (as on disk) or array('h') (after attendance_store.load())
+    import numpy as np
+    if isinstance(col, str):
+        return np.frombuffer(base64.b64decode(col), dtype="<i2")
+    return np.asarray(col, dtype=np.int16)
 
-                # REMOTE -------------------------------------------------
-                if r < P_ABSENT + P_MISSION + P_REMOTE:
-                    rec["hora_entrada"] = f"2025-{month_num:02d}-{day:02d}T09:00:00"
-                    rec["hora_salida"] = f"2025-{month_num:02d}-{day:02d}T{base_exit_time(friday)}"
-                    rec["observaciones"] = "Teletrabajo"
-                    rec["explicacion"] = "Actividad remota autorizada."
-                    continue
+def _pack_np(col):
+    return base64.b64encode(col.astype("<i2").tobytes()).decode("ascii")
 
-                # LATE ---------------------------------------------------
-                if r < P_ABSENT + P_MISSION + P_REMOTE + P_LATE:
-                    late_time = pick_late_time()
-                    rec["hora_entrada"] = f"2025-{month_num:02d}-{day:02d}T{late_time}"
-                    rec["hora_salida"] = f"2025-{month_num:02d}-{day:02d}T{base_exit_time(friday)}"
-                    rec["observaciones"] = "Tarde"
-                    rec["explicacion"] = "Retraso leve."
-                    continue
+def simulate_store(store: dict, year_keys, seed=None):
+    """Randomizes, in place, every encodable record of `year_keys` in a columnar store.
+    Returns the number of records drawn."""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    year_keys = set(year_keys)
+
+    # Collect the blocks to simulate and concatenate their columns
+    blocks, years = [], []
+    for entry in store["employees"].values():
+        for year_key, block in entry.get("years", {}).items():
+            if year_key in year_keys and "verbatim" not in block:
+                blocks.append(block)
+                years.append(int(year_key))
+    if not blocks:
+        return 0
+    cols = {name: [_column_np(b[name]) for b in blocks] for name in attendance_store.COLUMNS}
+    lengths = np.array([len(c) for c in cols["day"]])
+    day = np.concatenate(cols["day"]).astype(np.int64)
+    obs = np.concatenate(cols["obs"]).astype(np.int16)
+    expl = np.concatenate(cols["expl"]).astype(np.int16)
+    n = len(day)
+
+    # Weekday flags: one table per distinct year, then a gather per record
+    distinct = sorted(set(years))
+    table = np.zeros((len(distinct), 366), dtype=bool)
+    for i, y in enumerate(distinct):
+        fri = friday_table(y)
+        table[i, :len(fri)] = fri
+    year_idx = np.repeat(np.searchsorted(distinct, years), lengths)
+    valid = day != attendance_store.NULL          # raw records keep their placeholders
+    friday = table[year_idx, np.where(valid, day, 0)]
+
+    # Categories by cumulative probability, in the same order randomize_record() tests them
+    edges = np.cumsum([P_ABSENT, P_MISSION, P_REMOTE, P_LATE, P_EARLY])
+    cat = np.searchsorted(edges, rng.random(n), side="right")
+    ABSENT, MISSION, REMOTE, LATE, EARLY, NORMAL = range(6)
 
-                # EARLY LEAVE --------------------------------------------
-                if r < P_ABSENT + P_MISSION + P_REMOTE + P_LATE + P_EARLY:
-                    early = pick_early_leave(friday)
-                    rec["hora_entrada"] = f"2025-{month_num:02d}-{day:02d}T09:00:00"
-                    rec["hora_salida"] = f"2025-{month_num:02d}-{day:02d}T{early}"
-                    rec["observaciones"] = "Incompleto"
-                    rec["explicacion"] = "Salida anticipada."
+    late_min = rng.choice(LATE_MINUTES, n)
+    early_out = np.where(friday,
+                         12 * 60 + rng.choice(EARLY_FRIDAY_MINUTES, n),
+                         rng.choice(EARLY_HOURS, n) * 60 + rng.choice(EARLY_MINUTES, n))
+    base_out = np.where(friday, 14 * 60, 17 * 60)
+
+    ins = np.full(n, 9 * 60)
+    ins[cat == LATE] += late_min[cat == LATE]
+    ins[cat == ABSENT] = attendance_store.NULL
+    outs = np.where(cat == EARLY, early_out, base_out)
+    outs[cat == ABSENT] = attendance_store.NULL
+
+    # Texts through the store's value dictionary
+    values = store["values"]
+    index = {v: i for i, v in enumerate(values)}
+    def code(text):
+        if text not in index:
+            index[text] = len(values)
+            values.append(text)
+        return index[text]
+    for c, (o, e) in {ABSENT: ("Ausencia Injustificada", ""),
+                      MISSION: ("Comisión de servicio", "Visita/gestión fuera de oficina."),
+                      REMOTE: ("Teletrabajo", "Actividad remota autorizada."),
+                      LATE: ("Tarde", "Retraso leve."),
+                      EARLY: ("Incompleto", "Salida anticipada.")}.items():
+        obs[cat == c] = code(o)
+        expl[cat == c] = code(e)
+    normal = cat == NORMAL
+    resettable = [index[v] for v in RESETTABLE_OBS if v in index]
+    obs[normal & np.isin(obs, resettable)] = code("Completo")
+    if None in index:
+        expl[normal & (expl == index[None])] = code("")
+
+    # Raw (non-encodable) records keep their columns; split and pack the rest back
+    ins = np.where(valid, ins, attendance_store.NULL)
+    outs = np.where(valid, outs, attendance_store.NULL)
+    obs = np.where(valid, obs, attendance_store.NULL)
+    expl = np.where(valid, expl, attendance_store.NULL)
+    bounds = np.cumsum(lengths)[:-1]
+    for name, col in (("in", ins), ("out", outs), ("obs", obs), ("expl", expl)):
+        for block, part in zip(blocks, np.split(col, bounds)):
+            block[name] = _pack_np(part)
+
+    # Raw records go through the scalar path, seeded from the same generator
+    py_rng = random.Random(int(rng.integers(2**63)))
+    for block, year in zip(blocks, years):
+        if not block.get("raw"):
+            continue
+        pos = 0
+        for month_name, count in block["months"]:
+            month_num = MONTHS_ES.get(month_name.lower())
+            for i in range(pos, pos + count):
+                rec = block["raw"].get(str(i))
+                if month_num and isinstance(rec, dict):
+                    randomize_record(rec, year, month_num, py_rng)
+            pos += count
+    return n
+
+# Streaming mode ----------------------------------------------------
+#
+# One employee at a time from an incremental parser (jsonio), so memory stays
+# bounded by the largest employee, not by the whole history. Every output is
+# written to a temp file and only renamed into place once everything went
+# well; on any error before the renames the previous files are left untouched.
+# Each rename is atomic, but the set of them is not: if one fails, the files
+# not yet renamed are discarded and the error is raised.
+
+def parse_years(tokens):
+    # ["2023", "2025-2027"] → ["2023", "2025", "2026", "2027"]
+    years = []
+    for tok in tokens:
+        first, _, last = str(tok).partition("-")
+        if not first.isdigit() or (last and not last.isdigit()):
+            raise argparse.ArgumentTypeError(f"Año o rango no válido: {tok}")
+        years.extend(str(y) for y in range(int(first), int(last or first) + 1))
+    return years
+
+def year_output_path(out_dir, year_key) -> str:
+    return os.path.join(out_dir, f"attendance_{year_key}.json")
+
+def stream_randomize(inputs, year_keys, output=OUTPUT_PATH, split_years=False, rng=random):
+    """Returns {output path: employees written}. With split_years, each year of
+    each employee goes to attendance_<year>.json next to `output`."""
+    out_dir = os.path.dirname(output) or "."
+    writers = {}   # output path → (ObjectWriter, StoreWriter)
+    written = set()
+
+    def write(target, emp, years):
+        if (target, emp) in written:
+            raise ValueError(f"{emp} aparece más de una vez para {target}")
+        written.add((target, emp))
+        if target not in writers:
+            writers[target] = (jsonio.ObjectWriter(target),
+                               attendance_store.StoreWriter(attendance_store.store_path_for(target)))
+        for w in writers[target]:
+            w.write(emp, years)
+
+    try:
+        for path in inputs:
+            for emp, years in jsonio.iter_object_items(path):
+                if not isinstance(years, dict):
+                    if split_years:
+                        print(f"⚠️ {emp}: sin bloque de años en {path}, se omite")
+                        continue
+                    write(output, emp, years)
                     continue
+                randomize_nested({emp: years}, year_keys, rng)
+                if split_years:
+                    for year_key, months in years.items():
+                        write(year_output_path(out_dir, year_key), emp, {year_key: months})
+                else:
+                    write(output, emp, years)
+        # Every temp file complete and fsynced before the first one is renamed
+        for pair in writers.values():
+            for w in pair:
+                w.finish()
+    except BaseException:
+        for pair in writers.values():
+            for w in pair:
+                w.abort()
+        raise
+    pending = [w for pair in writers.values() for w in pair]
+    try:
+        while pending:
+            os.replace(pending[0].tmp_path, pending[0].path)
+            pending.pop(0)
+    except BaseException:
+        for w in pending:
+            w.abort()
+        raise
+    return {target: pair[0].count for target, pair in writers.items()}
+
+# Main --------------------------------------------------------------
+
+def refresh_derived(store):
+    # Dashboards read attendance_summary.json and queries use attendance_index.json;
+    # in both only employees whose records changed are recomputed
+    recomputed, reused, _ = attendance_summary.update(store)
+    print(f"📊 Resumen de asistencia: {recomputed} recalculados, {reused} sin cambios")
+    _, (reindexed, reused, _) = attendance_query.refresh(store)
+    print(f"🗂️ Índice de asistencia: {reindexed} reindexados, {reused} sin cambios")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Simula la asistencia (entradas, salidas y observaciones).")
+    parser.add_argument("--engine", choices=("scalar", "numpy"), default="scalar",
+                        help="scalar: registro a registro; numpy: todos los registros de golpe sobre el almacén columnar")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Semilla para resultados reproducibles")
+    parser.add_argument("--years", nargs="+", default=[YEAR_KEY],
+                        help=f"Años o rangos a simular, p. ej. 2024 o 2023-2025 (por defecto: {YEAR_KEY})")
+    parser.add_argument("--columnar-only", action="store_true",
+                        help="Sólo con --engine numpy: escribe el almacén columnar y no el JSON anidado")
+    parser.add_argument("--stream", action="store_true",
+                        help="Procesa empleado a empleado sin cargar el fichero entero (motor escalar)")
+    parser.add_argument("--input", nargs="+", default=[INPUT_PATH],
+                        help=f"Con --stream: uno o varios JSON de entrada (por defecto: {INPUT_PATH})")
+    parser.add_argument("--output", default=OUTPUT_PATH,
+                        help=f"Con --stream: JSON de salida (por defecto: {OUTPUT_PATH})")
+    parser.add_argument("--split-years", action="store_true",
+                        help="Con --stream: un fichero attendance_<año>.json por año, junto a --output")
+    instrumentation.add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    try:
+        args.years = parse_years(args.years)
+    except argparse.ArgumentTypeError as exc:
+        parser.error(str(exc))
+    if args.stream and args.engine != "scalar":
+        parser.error("--stream sólo funciona con --engine scalar")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    with instrumentation.Run("randomize_attendace", argv, profile=args.profile) as run:
+        randomize(args, run)
+
+def randomize(args, run):
+    t0 = clock.perf_counter()
+
+    if args.stream:
+        missing = [p for p in args.input if not os.path.exists(p)]
+        if missing:
+            print(f"❌ No se encontró {', '.join(missing)}")
+            return
+        rng = random.Random(args.seed) if args.seed is not None else random
+        try:
+            with run.stage("streaming"):
+                outputs = stream_randomize(args.input, args.years, args.output, args.split_years, rng)
+        except ValueError as exc:
+            print(f"❌ {exc}. No se ha modificado ningún fichero.")
+            return
+        for target, count in outputs.items():
+            run.wrote(target, attendance_store.store_path_for(target))
+            print(f"✅ {target}: {count} empleados (+ {attendance_store.store_path_for(target)})")
+        if OUTPUT_PATH in outputs:
+            with run.stage("derivados"):
+                refresh_derived(attendance_store.load(STORE_PATH))
+        print(f"⏱️ {clock.perf_counter() - t0:.2f}s")
+        return
+
+    if args.engine == "numpy":
+        # Read the columnar store when it is there: no per-record dicts at all
+        if os.path.exists(STORE_PATH) or os.path.exists(INPUT_PATH):
+            with run.stage("lectura"):
+                store = data_access.load_attendance_store(STORE_PATH, INPUT_PATH)
+        else:
+            print(f"❌ No se encontró {STORE_PATH} ni {INPUT_PATH}")
+            return
+        with run.stage("simulación"):
+            n = simulate_store(store, args.years, seed=args.seed)
+        run.count("empleados", len(store["employees"]))
+        run.count("registros", n)
+        with run.stage("escritura"):
+            for entry in store["employees"].values():
+                for block in entry.get("years", {}).values():
+                    attendance_store.pack_block(block)
+            attendance_store.write_json(STORE_PATH, store)
+            run.wrote(STORE_PATH)
+        with run.stage("derivados"):
+            refresh_derived(store)
+        if not args.columnar_only:
+            with run.stage("escritura"):
+                attendance_store.write_json(OUTPUT_PATH, attendance_store.decode(store), compact=None)
+            run.wrote(OUTPUT_PATH)
+        print(f"✅ Asistencia simulada ({n} registros, {clock.perf_counter() - t0:.2f}s): "
+              + (STORE_PATH if args.columnar_only else f"{OUTPUT_PATH} + {STORE_PATH}"))
+        return
+
+    if not os.path.exists(INPUT_PATH):
+        print(f"❌ No se encontró {INPUT_PATH}")
+        return
 
-                # NORMAL -------------------------------------------------
-                rec["hora_entrada"] = f"2025-{month_num:02d}-{day:02d}T09:00:00"
-                rec["hora_salida"] = f"2025-{month_num:02d}-{day:02d}T{base_exit_time(friday)}"
-                if rec.get("observaciones") in (None, "", "Completo", "Incompleto", "Tarde", "Ausencia Injustificada"):
-                    rec["observaciones"] = "Completo"
-                if rec.get("explicacion") is None:
-                    rec["explicacion"] = ""
+    with run.stage("lectura"):
+        data = data_access.load_attendance(INPUT_PATH)
+    run.count("empleados", len(data))
+    with run.stage("simulación"):
+        randomize_nested(data, args.years, random.Random(args.seed) if args.seed is not None else random)
 
     # Write back
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with run.stage("escritura"):
+        store = attendance_store.save(data, OUTPUT_PATH, STORE_PATH)
+    run.wrote(OUTPUT_PATH, STORE_PATH)
+    with run.stage("derivados"):
+        refresh_derived(store)
 
     print(f"✅ Archivo de asistencia actualizado: {OUTPUT_PATH}")
 
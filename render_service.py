@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# render_service.py — payslips and employee documents rendered on demand over local HTTP
+#
+# Instead of pre-rendering 12 × headcount payslips and 5 × headcount documents,
+# the Electron app asks this long-running process for the one being opened:
+#
+#   GET /nominas/<employee_id>/<periodo>        payslip (periodo = YYYY-MM), from its NOMINAS.json row
+#   GET /documentos/<employee_id>/<documento>   Contrato_Actual, DIP, Curriculum, Evaluacion_Anual, ID_Empleado_ELEBI
+#   GET /estado                                 cache and request counters (JSON)
+#
+# Employee data, NOMINAS.json rows, fonts, the processed logo and the page
+# templates stay loaded; the data files are re-read when their mtime/size
+# change. Rendered PDFs go to an LRU cache bounded in bytes (--cache-mb).
+# main() puts reportlab in invariant mode, so the same inputs always give the
+# same bytes: the ETag is the SHA-256 of the PDF, clients revalidate with
+# If-None-Match and get a 304 without a render while the PDF is still cached
+# (after an eviction it is rendered again, and still 304 if unchanged).
+#
+#   python render_service.py [--host 127.0.0.1] [--port 8765] [--cache-mb 64]
+
+import argparse, hashlib, io, json, os, sys, threading, time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+import data_access
+import employee_journal
+import generate_nominas_2025_ultralight as nominas
+import sync_employees_and_docs as docs
+
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_MB = 64
+
+# ---------- data ----------
+
+class Source:
+    """A data file kept in memory, re-read when its (mtime, size), or that of a `watch` file, changes."""
+
+    def __init__(self, path, loader, watch=()):
+        self.path = path
+        self.loader = loader
+        self.watch = list(watch)
+        self._key = None
+        self._value = {}
+        self._lock = threading.Lock()
+
+    def get(self):
+        key = [_stat(self.path), *map(_stat, self.watch)]
+        with self._lock:
+            if key != self._key:
+                self._value = self.loader(self.path) if key[0] else {}
+                self._key = key
+            return self._value
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def _load_employees(path):
+    # employee id → record, normalized as sync_employees_and_docs.py writes it
+    empleados, _ = data_access.load_empleados(path)
+    index = {}
+    for emp in empleados:
+        docs.infer_missing(emp)
+        docs.ensure_doc_paths(emp)
+        index[str(emp["id"])] = emp
+    return index
+
+def _load_rows(path):
+    return {(str(row.get("employee_id")), row.get("periodo")): row for row in data_access.load_nominas(path)}
+
+# ---------- cache ----------
+
+class PdfCache:
+    """LRU of rendered PDFs, bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()   # key → (etag, pdf)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, etag, pdf):
+        if len(pdf) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old[1])
+            self._entries[key] = (etag, pdf)
+            self.bytes += len(pdf)
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "hit_ratio": round(self.hits / lookups, 4) if lookups else None}
+
+# ---------- rendering ----------
+
+class RenderService:
+    def __init__(self, empleados_path=nominas.EMP_FILE, nominas_path=nominas.NOMINAS_JSON,
+                 cache_bytes=DEFAULT_CACHE_MB << 20):
+        self.empleados = Source(empleados_path, _load_employees, watch=[employee_journal.journal_path(empleados_path)])
+        self.nominas = Source(nominas_path, _load_rows)
+        self.cache = PdfCache(cache_bytes)
+        self.renders = 0
+        self.not_modified = 0
+        self._render_lock = threading.Lock()   # reportlab's shared templates/XObjects are not thread-safe
+
+    def payslip(self, employee_id, periodo):
+        """(cache key, render function) for a payslip; KeyError if there is no such NOMINAS.json row."""
+        row = self.nominas.get().get((employee_id, periodo))
+        if row is None:
+            raise KeyError(f"No hay nómina {periodo} para el empleado {employee_id}")
+        raw = json.dumps(row, ensure_ascii=False, sort_keys=True)
+        digest = hashlib.sha256(f"{nominas.TEMPLATE_VERSION}:{raw}".encode("utf-8")).hexdigest()[:16]
+        return ("nomina", employee_id, periodo, digest), lambda: nominas.render_pdf_bytes(*nominas.page_from_row(row))
+
+    def document(self, employee_id, name):
+        """(cache key, render function) for one of the standard documents; KeyError if unknown."""
+        filename = name if name.endswith(".pdf") else f"{name}.pdf"
+        title = docs.STANDARD_DOCS.get(filename)
+        emp = self.empleados.get().get(employee_id)
+        if title is None or emp is None:
+            raise KeyError(f"No hay documento {name} para el empleado {employee_id}")
+
+        def render():
+            buf = io.BytesIO()
+            docs.gen_pdf(emp, title, buf)
+            return buf.getvalue()
+        return ("documento", employee_id, filename, docs.doc_fingerprint(emp, title)), render
+
+    def fetch(self, key, render, if_none_match=None):
+        """Returns (status, etag, pdf or None, source) with source in hit / miss / revalidated."""
+        entry = self.cache.get(key)
+        if entry is not None:
+            if if_none_match == entry[0]:
+                self.not_modified += 1
+                return 304, entry[0], None, "revalidated"
+            return 200, entry[0], entry[1], "hit"
+        with self._render_lock:
+            pdf = render()
+            self.renders += 1
+        etag = f'"{hashlib.sha256(pdf).hexdigest()[:32]}"'
+        self.cache.put(key, etag, pdf)
+        if if_none_match == etag:
+            self.not_modified += 1
+            return 304, etag, None, "revalidated"
+        return 200, etag, pdf, "miss"
+
+    def warm(self):
+        # Data, fonts, logo and both page templates loaded before the first request
+        employees = self.empleados.get()
+        rows = self.nominas.get()
+        if rows:
+            self.fetch(*self.payslip(*next(iter(rows))))
+        if employees:
+            self.fetch(*self.document(next(iter(employees)), next(iter(docs.STANDARD_DOCS))))
+
+    def stats(self):
+        return {"cache": self.cache.stats(), "renders": self.renders, "not_modified": self.not_modified,
+                "employees": len(self.empleados.get()), "payslips": len(self.nominas.get())}
+
+# ---------- HTTP ----------
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive: the app opens many PDFs in a row
+    disable_nagle_algorithm = True  # headers and body are separate writes: without it each response waits ~40 ms
+
+    def do_GET(self):
+        service = self.server.service
+        parts = [unquote(p) for p in urlsplit(self.path).path.split("/") if p]
+        try:
+            if parts == ["estado"]:
+                return self._send(200, json.dumps(service.stats()).encode("utf-8"), "application/json")
+            if len(parts) == 3 and parts[0] == "nominas":
+                key, render = service.payslip(parts[1], parts[2])
+            elif len(parts) == 3 and parts[0] == "documentos":
+                key, render = service.document(parts[1], parts[2])
+            else:
+                return self._error(404, "Ruta desconocida: /nominas/<id>/<periodo> o /documentos/<id>/<documento>")
+        except KeyError as exc:
+            return self._error(404, exc.args[0])
+        except Exception as exc:
+            return self._error(500, f"Error al leer los datos: {exc}")
+        try:
+            status, etag, pdf, source = service.fetch(key, render, self.headers.get("If-None-Match"))
+        except Exception as exc:
+            return self._error(500, f"Error al generar el PDF: {exc}")
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Cache": source}
+        if status == 304:
+            return self._send(304, b"", None, headers)
+        self._send(200, pdf, "application/pdf", headers)
+
+    def _error(self, status, message):
+        self._send(status, json.dumps({"error": message}, ensure_ascii=False).encode("utf-8"), "application/json")
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Access-Control-Allow-Origin", "*")   # the renderer runs on file:// or the Vite dev server
+        self.send_header("Access-Control-Expose-Headers", "ETag, X-Cache")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+def make_server(service, host="127.0.0.1", port=DEFAULT_PORT, verbose=False):
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+# ---------- MAIN ----------
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio local que genera nóminas y documentos PDF bajo demanda.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="0 = un puerto libre cualquiera")
+    parser.add_argument("--cache-mb", type=float, default=DEFAULT_CACHE_MB, help="Tamaño máximo de la caché de PDFs")
+    parser.add_argument("--empleados", default=str(nominas.EMP_FILE))
+    parser.add_argument("--nominas", default=str(nominas.NOMINAS_JSON))
+    parser.add_argument("--verbose", action="store_true", help="Registra cada petición")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    t0 = time.perf_counter()
+    from reportlab import rl_config
+    rl_config.invariant = 1     # process-wide: no timestamps / random ids, so same inputs → same bytes → same ETag
+    service = RenderService(args.empleados, args.nominas, cache_bytes=int(args.cache_mb * (1 << 20)))
+    service.warm()
+    server = make_server(service, args.host, args.port, verbose=args.verbose)
+    host, port = server.server_address[:2]
+    print(f"🖨️  Servicio de PDFs en http://{host}:{port}  |  caché {args.cache_mb:g} MB  |  "
+          f"listo en {time.perf_counter() - t0:.2f}s", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"📊 {json.dumps(service.stats(), ensure_ascii=False)}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
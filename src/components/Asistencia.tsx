@@ -2,6 +2,9 @@
 import React, { useState, useEffect, useMemo, useRef } from "react";
 import Chart from "chart.js/auto";
 import ChartDataLabels from "chartjs-plugin-datalabels";
+import { loadAttendance as fetchAttendance } from "../utils/attendanceStore";
+import { loadEmpleadosData } from "../utils/employeeJournal";
+import { loadAttendanceSummary, teamAvgEfficiency, teamMedianHours, type AttendanceSummary } from "../utils/attendanceSummary";
 
 
 /* ==================== TYPES ==================== */
@@ -253,6 +256,7 @@ const Asistencia: React.FC = () => {
   const [selectedEmployeeId, setSelectedEmployeeId] = useState<string>("");
   const [selectedMonth, setSelectedMonth] = useState<string>("");
   const [attendanceData, setAttendanceData] = useState<MonthlyAttendanceByEmployee | null>(null);
+  const [attendanceSummary, setAttendanceSummary] = useState<AttendanceSummary | null>(null);
   const [attendance, setAttendance] = useState<AttendanceRecord[]>([]);
   const [loading, setLoading] = useState(true);
 
@@ -265,8 +269,7 @@ const Asistencia: React.FC = () => {
   useEffect(() => {
     async function loadEmployees() {
       try {
-        const resp = await fetch("./datos_empleados.json", { cache: "no-store" });
-        const json = await resp.json();
+        const json = await loadEmpleadosData();
         const list: Employee[] = Array.isArray(json) ? json : json.empleados || Object.values(json);
         const normalized = list.map(e => ({
           ...e,
@@ -288,8 +291,7 @@ const Asistencia: React.FC = () => {
   useEffect(() => {
     async function loadAttendance() {
       try {
-        const resp = await fetch("./attendance_2025.json", { cache: "no-store" });
-        const json = await resp.json();
+        const json = await fetchAttendance();
         setAttendanceData(json);
       } catch (e) {
         console.error("Error loading attendance_2025:", e);
@@ -300,6 +302,11 @@ const Asistencia: React.FC = () => {
     loadAttendance();
   }, []);
 
+  /* ==================== LOAD ATTENDANCE SUMMARY ==================== */
+  useEffect(() => {
+    loadAttendanceSummary().then(setAttendanceSummary);
+  }, []);
+
   /* ==================== DEFAULT MONTH ==================== */
   useEffect(() => {
     if (!selectedMonth) {
@@ -375,12 +382,17 @@ useEffect(() => {
     const efficiencyPct = expectedHours > 0 ? Math.round((actualHours / expectedHours) * 1000) / 10 : 0;
 
     // Team median hours (existing)
-    const medianHours = computeMedianHoursForMonth(attendanceData, selectedMonth);
+    // Team tallies from the precomputed summary when available (no per-record pass)
+    const medianHours = attendanceSummary
+      ? teamMedianHours(attendanceSummary, WORK_YEAR, selectedMonth)
+      : computeMedianHoursForMonth(attendanceData, selectedMonth);
     const medianGap =
       medianHours === null ? null : Number((actualHours - medianHours).toFixed(2));
 
     // Team average efficiency %
-    const teamAvgEfficiencyPct = computeTeamAvgEfficiencyForMonth(attendanceData, selectedMonth);
+    const teamAvgEfficiencyPct = attendanceSummary
+      ? teamAvgEfficiency(attendanceSummary, WORK_YEAR, selectedMonth, expectedHours)
+      : computeTeamAvgEfficiencyForMonth(attendanceData, selectedMonth);
     const efficiencyDelta =
       teamAvgEfficiencyPct === null ? null : Number((efficiencyPct - teamAvgEfficiencyPct).toFixed(1));
 
@@ -406,7 +418,7 @@ useEffect(() => {
       efficiencyDelta,
       classification,
     };
-  }, [attendance, selectedMonth, attendanceData]);
+  }, [attendance, selectedMonth, attendanceData, attendanceSummary]);
 
   /* ==================== PIE CHART DATA (SIMPLIFIED) ==================== */
   const hoursChartSegments = useMemo(() => {
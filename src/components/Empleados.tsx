@@ -2,6 +2,7 @@
 import React, { useEffect, useMemo, useState, useCallback } from "react";
 import whatsappIcon from "./icons/whatsap.png";
 import { assetUrl, normalizeAssetPath } from "../utils/assetPaths";
+import { loadEmpleadosData } from "../utils/employeeJournal";
 
 /* ================= Types ================= */
 type Empleado = {
@@ -597,9 +598,7 @@ const Empleados: React.FC = () => {
   useEffect(() => {
     (async () => {
       try {
-        const res = await fetch("./datos_empleados.json", { cache: "no-store" });
-        if (!res.ok) throw new Error("No se pudo cargar datos_empleados.json");
-        const arr = (await res.json()) as any[];
+        const arr = (await loadEmpleadosData()) as any[];
 
         const normalized: Empleado[] = arr.map(normalizeEmpleado);
 
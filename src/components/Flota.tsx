@@ -15,6 +15,7 @@ import "maplibre-gl/dist/maplibre-gl.css";
 import { useSpring, animated } from "@react-spring/web";
 import elebiLogo from "../assets/elebilogo.png";
 import { assetUrl, normalizeAssetPath } from "../utils/assetPaths";
+import { loadEmpleadosData } from "../utils/employeeJournal";
 
 type VehicleFormState = {
   id: string;
@@ -1181,8 +1182,7 @@ const Flota: React.FC = () => {
 
   useEffect(() => {
     let cancelled = false;
-    fetch("./datos_empleados.json", { cache: "no-store" })
-      .then((res) => (res.ok ? res.json() : Promise.reject()))
+    loadEmpleadosData()
       .then((data) => {
         if (cancelled) return;
         const list: EmployeeRecord[] = Array.isArray(data)
@@ -1,6 +1,7 @@
 import React, { useEffect, useRef, useState } from "react";
 import { getQrAnimation } from "../data/lottieLoader";
 import { normalizeAssetPath } from "../utils/assetPaths";
+import { loadEmpleadosData } from "../utils/employeeJournal";
 
 interface MainContentProps {
   showLoginModal: boolean;
@@ -90,9 +91,7 @@ const getRoleLabel = (emp: any) =>
 
 const fetchFallbackEmployee = async (id: string, email: string) => {
   try {
-    const response = await fetch("./datos_empleados.json", { cache: "no-store" });
-    if (!response.ok) return null;
-    const json = await response.json();
+    const json = await loadEmpleadosData();
     const list: any[] = Array.isArray(json)
       ? json
       : json?.empleados
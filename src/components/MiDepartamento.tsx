@@ -5,6 +5,7 @@ import { useSpring, animated } from "@react-spring/web";
 import elebiLogo from "../assets/elebilogo.png";
 import whatsappIcon from "./icons/whatsap.png";
 import { assetUrl } from "../utils/assetPaths";
+import { loadEmpleadosData } from "../utils/employeeJournal";
 
 type EmployeeRecord = {
   id?: number | string;
@@ -620,19 +621,17 @@ const MiDepartamento: React.FC = () => {
     const fetchData = async () => {
       setLoading(true);
       try {
-        const [empRes, flotaRes, budgetRes, inventoryRes] = await Promise.all([
-          fetch("./datos_empleados.json", { cache: "no-store" }),
+        const [empJson, flotaRes, budgetRes, inventoryRes] = await Promise.all([
+          loadEmpleadosData(),
           fetch("./flota.json", { cache: "no-store" }),
           fetch("./presupuestos.json", { cache: "no-store" }),
           fetch("./inventario_clave.json", { cache: "no-store" }),
         ]);
 
-        if (!empRes.ok) throw new Error("datos_empleados");
         if (!flotaRes.ok) throw new Error("flota");
         if (!budgetRes.ok) throw new Error("presupuestos");
         if (!inventoryRes.ok) throw new Error("inventario");
 
-        const empJson = await empRes.json();
         const flotaJson = await flotaRes.json();
         const budgetJson = await budgetRes.json();
         const inventoryJson = await inventoryRes.json();
@@ -5,6 +5,10 @@ import ChartDataLabels from "chartjs-plugin-datalabels";
 import { ChevronDownIcon, ChevronUpIcon } from "@heroicons/react/24/solid";
 import { assetUrl, normalizeAssetPath } from "../utils/assetPaths";
 import { buildNominaPdf } from "../utils/nominaPdf";
+import { loadEmployeeNominas } from "../utils/nominaShards";
+import { loadAttendance } from "../utils/attendanceStore";
+import { loadEmpleadosData } from "../utils/employeeJournal";
+import { loadAttendanceSummary, teamAvgEfficiency, teamMedianHours, type AttendanceSummary } from "../utils/attendanceSummary";
 
 /* ================= Icons (inline, no deps) ================= */
 const HourglassIcon: React.FC<{ className?: string }> = ({ className }) => (
@@ -742,6 +746,7 @@ const MyProfile: React.FC<{ onLogout: () => void }> = ({ onLogout }) => {
   const [selectedMonth, setSelectedMonth] = useState<string>("");
   const [asistencia, setAsistencia] = useState<AttendanceRecord[]>([]);
   const [attendanceData, setAttendanceData] = useState<Record<string, any> | null>(null);
+  const [attendanceSummary, setAttendanceSummary] = useState<AttendanceSummary | null>(null);
   const [loading, setLoading] = useState(true);
   const [editingExplanation, setEditingExplanation] = useState<{
     index: number;
@@ -1067,9 +1072,7 @@ const MyProfile: React.FC<{ onLogout: () => void }> = ({ onLogout }) => {
       try {
         const idStr = localStorage.getItem("currentEmployeeId");
         if (!idStr) throw new Error("No hay currentEmployeeId en localStorage");
-        const res = await fetch("./datos_empleados.json", { cache: "no-store" });
-        if (!res.ok) throw new Error("No se pudo cargar datos_empleados.json");
-        const list = (await res.json()) as any[];
+        const list = (await loadEmpleadosData()) as any[];
 
         const raw = list.find((e) => {
           const candidateId =
@@ -1091,14 +1094,17 @@ const MyProfile: React.FC<{ onLogout: () => void }> = ({ onLogout }) => {
     })();
   }, []);
 
+  /* ===== Team attendance tallies (attendance_summary.json) ===== */
+  useEffect(() => {
+    loadAttendanceSummary().then(setAttendanceSummary);
+  }, []);
+
   /* ===== 2) Load attendance for employee ===== */
   useEffect(() => {
     if (!empleado || !employeeAttendanceKey) return;
     (async () => {
       try {
-        const res = await fetch("./attendance_2025.json", { cache: "no-store" });
-        if (!res.ok) throw new Error("No se pudo cargar attendance_2025.json");
-        const json = await res.json();
+        const json = await loadAttendance();
         setAttendanceData(json);
         const yearData = json[employeeAttendanceKey]?.[WORK_YEAR];
         if (!yearData) {
@@ -1176,11 +1182,16 @@ const MyProfile: React.FC<{ onLogout: () => void }> = ({ onLogout }) => {
     const efficiencyPct =
       expectedHours > 0 ? Math.round((actualHours / expectedHours) * 1000) / 10 : 0;
 
-    const medianHours = computeMedianHoursForMonth(attendanceData, selectedMonth);
+    // Team tallies from the precomputed summary when available (no per-record pass)
+    const medianHours = attendanceSummary
+      ? teamMedianHours(attendanceSummary, WORK_YEAR, selectedMonth)
+      : computeMedianHoursForMonth(attendanceData, selectedMonth);
     const medianGap =
       medianHours === null ? null : Number((actualHours - medianHours).toFixed(2));
 
-    const teamAvgEfficiencyPct = computeTeamAvgEfficiencyForMonth(attendanceData, selectedMonth);
+    const teamAvgEfficiencyPct = attendanceSummary
+      ? teamAvgEfficiency(attendanceSummary, WORK_YEAR, selectedMonth, expectedHours)
+      : computeTeamAvgEfficiencyForMonth(attendanceData, selectedMonth);
     const efficiencyDelta =
       teamAvgEfficiencyPct === null
         ? null
@@ -1207,7 +1218,7 @@ const MyProfile: React.FC<{ onLogout: () => void }> = ({ onLogout }) => {
       efficiencyDelta,
       classification,
     };
-  }, [selectedMonth, asistencia, attendanceData]);
+  }, [selectedMonth, asistencia, attendanceData, attendanceSummary]);
 
   const justificationOptions = useMemo(
     () => ["Emergencia", "Permiso Reglamentario", "Enfermedad", "Otro"],
@@ -1385,15 +1396,19 @@ const MyProfile: React.FC<{ onLogout: () => void }> = ({ onLogout }) => {
 
     async function loadNominas() {
       try {
-        const res = await fetch("./NOMINAS.json", { cache: "no-store" });
-        if (!res.ok) throw new Error("No se pudo cargar NOMINAS.json");
-        const data = await res.json();
-
-        const myNominas = (Array.isArray(data) ? data : Object.values(data || {})).filter(
-          (n: any) =>
-            (n.nombre || "").toLowerCase().trim() === (empleado.nombre || "").toLowerCase().trim() &&
-            (n.apellidos || "").toLowerCase().trim() === (empleado.apellidos || "").toLowerCase().trim()
-        );
+        // Per-employee shard (a few KB) when available; full NOMINAS.json otherwise
+        let myNominas = empleado.id != null ? await loadEmployeeNominas(empleado.id) : null;
+        if (!myNominas) {
+          const res = await fetch("./NOMINAS.json", { cache: "no-store" });
+          if (!res.ok) throw new Error("No se pudo cargar NOMINAS.json");
+          const data = await res.json();
+
+          myNominas = (Array.isArray(data) ? data : Object.values(data || {})).filter(
+            (n: any) =>
+              (n.nombre || "").toLowerCase().trim() === (empleado.nombre || "").toLowerCase().trim() &&
+              (n.apellidos || "").toLowerCase().trim() === (empleado.apellidos || "").toLowerCase().trim()
+          );
+        }
 
         setNominas(myNominas);
         setFilteredNominas(myNominas);
@@ -0,0 +1,111 @@
+type MonthLayout = [month: string, count: number];
+
+type ColumnarYear =
+  | { verbatim: unknown }
+  | {
+      months: MonthLayout[];
+      // base64 of little-endian int16 arrays
+      day: string;
+      in: string;
+      out: string;
+      obs: string;
+      expl: string;
+      raw?: Record<string, unknown>;
+    };
+
+type ColumnarStore = {
+  format: "attendance-columnar";
+  version: number;
+  values: (string | null)[];
+  employees: Record<string, { verbatim: unknown } | { years: Record<string, ColumnarYear> }>;
+};
+
+const STORE_URL = "./attendance_2025.cols.json";
+const JSON_URL = "./attendance_2025.json";
+const NULL = -1;
+
+const unpack = (packed: string) => {
+  const bin = atob(packed);
+  const bytes = new Uint8Array(bin.length);
+  for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+  const view = new DataView(bytes.buffer);
+  const col = new Int16Array(bytes.length / 2);
+  for (let i = 0; i < col.length; i++) col[i] = view.getInt16(i * 2, true);
+  return col;
+};
+
+const hhmm = (minutes: number) =>
+  `${String(Math.floor(minutes / 60)).padStart(2, "0")}:${String(minutes % 60).padStart(2, "0")}:00`;
+
+const decodeYear = (yearKey: string, block: ColumnarYear, values: ColumnarStore["values"]) => {
+  if ("verbatim" in block) return block.verbatim;
+  const year = Number(yearKey);
+  const raw = block.raw || {};
+  const [days, ins, outs, obs, expl] = [block.day, block.in, block.out, block.obs, block.expl].map(unpack);
+  const isoDays = new Map<number, [number, string]>();
+  const months: Record<string, unknown[]> = {};
+  let pos = 0;
+  for (const [month, count] of block.months) {
+    const records: unknown[] = (months[month] = []);
+    for (let i = pos; i < pos + count; i++) {
+      if (String(i) in raw) {
+        records.push(raw[String(i)]);
+        continue;
+      }
+      const off = days[i];
+      let prefix = isoDays.get(off);
+      if (!prefix) {
+        const d = new Date(Date.UTC(year, 0, 1 + off));
+        prefix = [d.getUTCDate(), `${d.toISOString().slice(0, 10)}T`];
+        isoDays.set(off, prefix);
+      }
+      records.push({
+        day: prefix[0],
+        hora_entrada: ins[i] === NULL ? null : prefix[1] + hhmm(ins[i]),
+        hora_salida: outs[i] === NULL ? null : prefix[1] + hhmm(outs[i]),
+        observaciones: values[obs[i]],
+        explicacion: values[expl[i]],
+      });
+    }
+    pos += count;
+  }
+  return months;
+};
+
+/** Rebuilds the nested attendance_2025.json shape from the columnar store (attendance_store.py). */
+export const decodeAttendanceStore = (store: ColumnarStore): Record<string, any> => {
+  const data: Record<string, any> = {};
+  for (const [emp, entry] of Object.entries(store.employees)) {
+    if ("verbatim" in entry) {
+      data[emp] = entry.verbatim;
+      continue;
+    }
+    data[emp] = {};
+    for (const [yearKey, block] of Object.entries(entry.years)) {
+      data[emp][yearKey] = decodeYear(yearKey, block, store.values);
+    }
+  }
+  return data;
+};
+
+/**
+ * Attendance in the nested employee → year → month → records shape. Reads the
+ * compact columnar file (~15x smaller) when it exists and falls back to
+ * attendance_2025.json otherwise.
+ */
+export const loadAttendance = async (): Promise<Record<string, any>> => {
+  try {
+    const res = await fetch(STORE_URL, { cache: "no-store" });
+    if (res.ok) {
+      const store = await res.json();
+      if (store?.format === "attendance-columnar" && store.version === 1) {
+        return decodeAttendanceStore(store as ColumnarStore);
+      }
+    }
+  } catch (err) {
+    console.warn("attendance_2025.cols.json no disponible, usando attendance_2025.json:", err);
+  }
+  const res = await fetch(JSON_URL, { cache: "no-store" });
+  if (!res.ok) throw new Error("No se pudo cargar attendance_2025.json");
+  return res.json();
+};
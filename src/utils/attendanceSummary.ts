@@ -0,0 +1,60 @@
+export type MonthSummary = {
+  records: number;
+  worked_days: number;
+  minutes: number;
+  avg_minutes: number;
+  /** Sum of per-record hours rounded to 2 decimals, as the views compute them */
+  hours: number;
+  observaciones: Record<string, number>;
+};
+
+export type AttendanceSummary = {
+  version: number;
+  employees: Record<string, { hash: string; years: Record<string, Record<string, MonthSummary>> }>;
+};
+
+const SUMMARY_URL = "./attendance_summary.json";
+
+/**
+ * Per employee/month aggregates written by attendance_summary.py (a few KB).
+ * Returns null when the file is missing so callers can compute from the raw log.
+ */
+export const loadAttendanceSummary = async (): Promise<AttendanceSummary | null> => {
+  try {
+    const res = await fetch(SUMMARY_URL, { cache: "no-store" });
+    if (!res.ok) return null;
+    const summary = await res.json();
+    return summary?.version === 1 && summary.employees ? (summary as AttendanceSummary) : null;
+  } catch (err) {
+    console.warn("attendance_summary.json no disponible:", err);
+    return null;
+  }
+};
+
+/** Total hours per employee with records in that month (same rule as the views). */
+const monthTotals = (summary: AttendanceSummary, year: number, month: string) =>
+  Object.values(summary.employees)
+    .map((emp) => emp.years?.[String(year)]?.[month])
+    .filter((m): m is MonthSummary => !!m && m.records > 0)
+    .map((m) => m.hours);
+
+export const teamMedianHours = (summary: AttendanceSummary, year: number, month: string) => {
+  const values = monthTotals(summary, year, month);
+  if (!values.length) return null;
+  const sorted = [...values].sort((a, b) => a - b);
+  const mid = Math.floor(sorted.length / 2);
+  return sorted.length % 2 === 0 ? (sorted[mid - 1] + sorted[mid]) / 2 : sorted[mid];
+};
+
+export const teamAvgEfficiency = (
+  summary: AttendanceSummary,
+  year: number,
+  month: string,
+  expectedHours: number
+) => {
+  if (!expectedHours) return null;
+  const values = monthTotals(summary, year, month).map((hours) => (hours / expectedHours) * 100);
+  if (!values.length) return null;
+  const avg = values.reduce((acc, value) => acc + value, 0) / values.length;
+  return Math.round(avg * 10) / 10;
+};
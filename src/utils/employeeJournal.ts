@@ -0,0 +1,98 @@
+type JournalHeader = { journal: number; base: number };
+
+type JournalEntry = {
+  seq: number;
+  id: number | string;
+  set?: Record<string, unknown>;
+  unset?: string[];
+};
+
+type Cached = { seq: number; data: any };
+
+const SNAPSHOT_URL = "./datos_empleados.json";
+const JOURNAL_URL = "./datos_empleados.journal.jsonl";
+
+let cached: Cached | null = null;
+let pending: Promise<any> | null = null;
+
+const readJournal = async () => {
+  try {
+    const res = await fetch(JOURNAL_URL, { cache: "no-store" });
+    if (!res.ok) return null;
+    const lines = (await res.text()).split("\n");
+    lines.pop(); // only complete lines: a torn append has no trailing "\n"
+    const [first, ...rest] = lines;
+    const header = JSON.parse(first) as JournalHeader;
+    if (header?.journal !== 1) return null;
+    const entries: JournalEntry[] = [];
+    for (const line of rest) {
+      try {
+        entries.push(JSON.parse(line));
+      } catch {
+        break;
+      }
+    }
+    return { header, entries };
+  } catch {
+    return null;
+  }
+};
+
+const recordsOf = (data: any): any[] =>
+  Array.isArray(data) ? data : Array.isArray(data?.empleados) ? data.empleados : [];
+
+/**
+ * Applies entries with seq > since without mutating anything already handed out:
+ * changed employees become new objects inside a new array.
+ */
+const applyEntries = (data: any, entries: JournalEntry[], since: number) => {
+  const todo = entries.filter((e) => e.seq > since);
+  if (!todo.length) return data;
+  const list = [...recordsOf(data)];
+  const position = new Map(list.map((emp, i) => [String(emp?.id), i] as const));
+  for (const entry of todo) {
+    const i = position.get(String(entry.id));
+    if (i === undefined) continue;
+    const next = { ...list[i], ...(entry.set || {}) };
+    for (const name of entry.unset || []) delete next[name];
+    list[i] = next;
+  }
+  return Array.isArray(data) ? list : { ...data, empleados: list };
+};
+
+const refresh = async () => {
+  const journal = await readJournal();
+  if (!journal) {
+    // No journal: the snapshot is all there is
+    const res = await fetch(SNAPSHOT_URL, { cache: "no-store" });
+    if (!res.ok) throw new Error("No se pudo cargar datos_empleados.json");
+    cached = { seq: 0, data: await res.json() };
+    return cached.data;
+  }
+  const { header, entries } = journal;
+  const seq = entries.length ? entries[entries.length - 1].seq : header.base;
+  if (cached && cached.seq >= header.base && cached.seq <= seq) {
+    // Still on the same snapshot: only the deltas since the last load
+    cached = { seq, data: applyEntries(cached.data, entries, cached.seq) };
+    return cached.data;
+  }
+  const res = await fetch(SNAPSHOT_URL, { cache: "no-store" });
+  if (!res.ok) throw new Error("No se pudo cargar datos_empleados.json");
+  cached = { seq, data: applyEntries(await res.json(), entries, header.base) };
+  return cached.data;
+};
+
+/**
+ * datos_empleados.json as written by the scripts (a list or { empleados: [...] })
+ * with its change journal applied. The snapshot is downloaded and parsed once;
+ * later calls fetch only the small journal and apply the entries added since.
+ * The result is shared between views: treat it as read-only.
+ */
+export const loadEmpleadosData = async (): Promise<any> => {
+  if (!pending) {
+    pending = refresh().finally(() => {
+      pending = null;
+    });
+  }
+  return pending;
+};
@@ -0,0 +1,46 @@
+type ShardRange = [shard: string, offset: number, length: number];
+
+type NominaShardIndex = {
+  version: number;
+  shard_by: "employee" | "periodo";
+  employees: Record<string, ShardRange[]>;
+};
+
+const SHARDS_BASE = "./nominas_shards";
+
+const decoder = new TextDecoder("utf-8");
+
+/**
+ * Fetches one byte range of a shard. Uses an HTTP Range request when the server
+ * honours it (206) and falls back to slicing the full body otherwise (file://, 200).
+ */
+const fetchRange = async ([shard, offset, length]: ShardRange) => {
+  const res = await fetch(`${SHARDS_BASE}/${encodeURIComponent(shard)}`, {
+    cache: "no-store",
+    headers: { Range: `bytes=${offset}-${offset + length - 1}` },
+  });
+  if (!res.ok) throw new Error(`No se pudo cargar ${shard}`);
+  const buf = new Uint8Array(await res.arrayBuffer());
+  const bytes = res.status === 206 ? buf : buf.subarray(offset, offset + length);
+  return JSON.parse(decoder.decode(bytes));
+};
+
+/**
+ * Loads only the payroll rows of one employee from nominas_shards/ (written by
+ * `generate_nominas_2025_ultralight.py --shards ...`). Returns null when there are
+ * no shards or the employee is not indexed, so callers can fall back to NOMINAS.json.
+ */
+export const loadEmployeeNominas = async (employeeId: number | string): Promise<any[] | null> => {
+  try {
+    const res = await fetch(`${SHARDS_BASE}/index.json`, { cache: "no-store" });
+    if (!res.ok) return null;
+    const index = (await res.json()) as NominaShardIndex;
+    const ranges = index?.employees?.[String(employeeId)];
+    if (!Array.isArray(ranges)) return null;
+    const parts = await Promise.all(ranges.map(fetchRange));
+    return parts.flatMap((part) => (Array.isArray(part) ? part : [part]));
+  } catch (err) {
+    console.warn("Shards de nóminas no disponibles, usando NOMINAS.json:", err);
+    return null;
+  }
+};
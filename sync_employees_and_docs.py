@@ -2,8 +2,15 @@
 # sync_employees_and_docs.py
 # Sync nombres/apellidos → nombrecompleto, fix doc paths by id, and regenerate PDFs reflecting updated names.
 
-import os, json, datetime
+from __future__ import annotations
+
+import os, sys, copy, json, datetime, argparse, hashlib, traceback
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:   # annotations only: reportlab is loaded where a PDF is drawn
+    from reportlab.pdfgen import canvas
 
 # ---------------- Config ----------------
 ROOT = Path(__file__).resolve().parent
@@ -12,13 +19,30 @@ DOC_ROOT = PUBLIC / "documentos_empleados"
 JSON_PATH = PUBLIC / "datos_empleados.json"
 LOGO_PATH = PUBLIC / "src/assets/elebilogo.png"  # adjust if different
 MOTTO = "Desde EG para el Mundo"                # ✅ per your instruction
+DOC_TEMPLATE_VERSION = 1                        # bump when the document layout changes → rebuild all
+FINGERPRINTS_FILE = ".fingerprints.json"        # per employee, next to its PDFs
+
+# Standard set generated for every employee: filename → title
+STANDARD_DOCS = {
+    "Contrato_Actual.pdf": "Contrato de Trabajo",
+    "DIP.pdf": "Documento de Identidad Profesional",
+    "Curriculum.pdf": "Curriculum Vitae",
+    "Evaluacion_Anual.pdf": "Evaluación Anual",
+    "ID_Empleado_ELEBI.pdf": "ID de Empleado"
+}
 
 # ------------- PDF Generation ------------
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.pdfgen import canvas
-from reportlab.lib import colors
-from PIL import Image
+# reportlab and pdf_templates are imported where a PDF is actually drawn:
+# --dry-run and syncs where every document is up to date never load them.
+import data_access
+import employee_journal
+import instrumentation
+import jsonio
+import photo_derivatives
+from photo_index import PhotoIndex
+
+# Same value as reportlab.lib.pagesizes.A4
+A4 = (210 * (72.0 / 2.54 * 0.1), 297 * (72.0 / 2.54 * 0.1))
 
 def ensure_dir(p: Path):
     p.mkdir(parents=True, exist_ok=True)
@@ -30,6 +54,7 @@ def abs_doc_path(emp_id: int, filename: str) -> Path:
     return DOC_ROOT / str(emp_id) / filename
 
 def draw_header(c: canvas.Canvas, w, h, title: str):
+    from reportlab.lib import colors
     c.setFillColor(colors.HexColor("#004080"))
     c.rect(0, h-30, w, 30, stroke=0, fill=1)
     c.setFillColor(colors.white)
@@ -39,6 +64,7 @@ def draw_header(c: canvas.Canvas, w, h, title: str):
     c.drawRightString(w-20, h-22, title)
 
 def draw_footer(c: canvas.Canvas, w):
+    from reportlab.lib import colors
     c.setStrokeColor(colors.HexColor("#004080"))
     c.line(20, 30, w-20, 30)
     c.setFont("Helvetica-Oblique", 9)
@@ -46,71 +72,132 @@ def draw_footer(c: canvas.Canvas, w):
     c.drawCentredString(w/2, 18, MOTTO)
 
 def try_draw_logo(c: canvas.Canvas, w, h):
+    import pdf_templates
+    from reportlab.lib.utils import ImageReader
     try:
         if LOGO_PATH.exists():
-            c.drawImage(str(LOGO_PATH), w-120, h-75, width=90, height=40, preserveAspectRatio=True, mask='auto')
+            pdf_templates.draw_image(c, str(LOGO_PATH), ImageReader(str(LOGO_PATH)), w-120, h-75,
+                                     width=90, height=40, preserveAspectRatio=True, mask='auto')
     except Exception:
         pass
 
-def write_key_value(c, x, y, key, val, key_w=150):
-    c.setFont("Helvetica-Bold", 10)
-    c.setFillColor(colors.black)
-    c.drawString(x, y, f"{key}:")
-    c.setFont("Helvetica", 10)
-    c.drawString(x + key_w, y, str(val) if val is not None else "")
-
-def gen_pdf(emp: dict, kind: str, out_path: Path):
+# Key/value rows below the name: (label, block, field, gap after). block=None → top-level field.
+# A (heading, None, None, gap) row with label only is a section heading.
+DOC_ROWS = [
+    ("ID", None, "id", 14),
+    ("Puesto", None, "puesto", 14),
+    ("Departamento", None, "departamento", 20),
+    ("Lugar de nacimiento", "informacion_personal", "lugar_nacimiento", 14),
+    ("Fecha de nacimiento", "informacion_personal", "fecha_nacimiento", 14),
+    ("Género", "informacion_personal", "genero", 14),
+    ("Estado civil", "informacion_personal", "estado_civil", 14),
+    ("Dependientes", "informacion_personal", "dependientes", 14),
+    ("Teléfono", "informacion_personal", "telefono_personal", 14),
+    ("Email", "informacion_personal", "email_personal", 14),
+    ("Dirección", "informacion_personal", "direccion_personal", 20),
+    ("Fecha de ingreso", "datos_carrera", "fecha_ingreso", 14),
+    ("Tipo de contrato", "datos_carrera", "tipo_contrato", 14),
+    ("Datos Bancarios", None, None, 10),
+    ("Banco", "informacion_bancaria", "banco", 14),
+    ("Nº de cuenta", "informacion_bancaria", "numero_cuenta", 14),
+    ("Tipo de cuenta", "informacion_bancaria", "tipo_cuenta", 14),
+    ("Salario mensual (CFA)", "informacion_bancaria", "salario_mensual_cfa", 14),
+    ("Salario anual (CFA)", "informacion_bancaria", "salario_anual_cfa", 20),
+]
+
+DOC_X = 30
+DOC_NAME_Y = A4[1] - 80
+
+def doc_layout():
+    # [(label, block, field, y), ...] — same positions as the original hand-placed layout
+    rows = []
+    y = DOC_NAME_Y - 8 - 12
+    for label, block, field, gap in DOC_ROWS:
+        if field is None:
+            y -= 6  # extra space above section headings
+        rows.append((label, block, field, y))
+        y -= gap
+    return rows
+
+DOC_LAYOUT = doc_layout()
+
+def draw_doc_static(c: canvas.Canvas, title: str):
+    # Logo, header, rule under the name, every label, footer
+    from reportlab.lib import colors
     w, h = A4
-    c = canvas.Canvas(str(out_path), pagesize=A4)
     try_draw_logo(c, w, h)
-    draw_header(c, w, h, kind.replace("_", " ").upper())
+    draw_header(c, w, h, title)
+    c.setLineWidth(0.8)
+    c.setStrokeColor(colors.HexColor("#004080"))
+    c.line(DOC_X, DOC_NAME_Y - 8, w-30, DOC_NAME_Y - 8)
+    for label, block, field, y in DOC_LAYOUT:
+        if field is None:
+            c.setFont("Helvetica-Bold", 11)
+            c.setFillColor(colors.HexColor("#004080"))
+            c.drawString(DOC_X, y, label)
+        else:
+            c.setFont("Helvetica-Bold", 10)
+            c.setFillColor(colors.black)
+            c.drawString(DOC_X, y, f"{label}:")
+    draw_footer(c, w)
+
+_DOC_TEMPLATES = {}
+
+def doc_template(kind: str):
+    title = kind.replace("_", " ").upper()
+    tpl = _DOC_TEMPLATES.get(title)
+    if tpl is None:
+        import pdf_templates
+        tpl = _DOC_TEMPLATES[title] = pdf_templates.PageTemplate(
+            f"doc-{len(_DOC_TEMPLATES)}", lambda c: draw_doc_static(c, title))
+    return tpl
+
+def doc_name(emp: dict) -> str:
+    return emp.get("nombrecompleto") or f'{emp.get("nombres","")} {emp.get("apellidos","")}'
+
+def doc_values(emp: dict):
+    # [(y, text), ...] — every variable field gen_pdf() prints, in layout order
+    values = []
+    for label, block, field, y in DOC_LAYOUT:
+        if field is None:
+            continue
+        val = (emp.get(block, {}) if block else emp).get(field)
+        values.append((y, str(val) if val is not None else ""))
+    return values
+
+def doc_fingerprint(emp: dict, kind: str) -> str:
+    # Hash of exactly what gen_pdf() would draw for this employee and kind
+    inputs = [DOC_TEMPLATE_VERSION, kind, doc_name(emp), [text for _, text in doc_values(emp)]]
+    raw = json.dumps(inputs, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+def load_fingerprints(out_dir: Path) -> dict:
+    try:
+        with open(out_dir / FINGERPRINTS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_fingerprints(out_dir: Path, fingerprints: dict):
+    jsonio.write_json(out_dir / FINGERPRINTS_FILE, fingerprints)
 
-    y = h - 80
-    x = 30
+def gen_pdf(emp: dict, kind: str, out_path):
+    # out_path: a path, or a binary file object (render_service.py renders into memory)
+    from reportlab.lib import colors
+    import pdf_templates
+    c = pdf_templates.new_canvas(out_path if hasattr(out_path, "write") else str(out_path), pagesize=A4)
+    doc_template(kind).paint(c)
 
     # Core identity block
     c.setFont("Helvetica-Bold", 12)
     c.setFillColor(colors.HexColor("#004080"))
-    c.drawString(x, y, emp.get("nombrecompleto") or f'{emp.get("nombres","")} {emp.get("apellidos","")}')
-    y -= 8
-    c.setLineWidth(0.8)
-    c.setStrokeColor(colors.HexColor("#004080"))
-    c.line(x, y, w-30, y)
-    y -= 12
+    c.drawString(DOC_X, DOC_NAME_Y, doc_name(emp))
 
     c.setFont("Helvetica", 10)
-    write_key_value(c, x, y, "ID", emp.get("id")); y -= 14
-    write_key_value(c, x, y, "Puesto", emp.get("puesto")); y -= 14
-    write_key_value(c, x, y, "Departamento", emp.get("departamento")); y -= 20
-
-    info_p = emp.get("informacion_personal", {})
-    write_key_value(c, x, y, "Lugar de nacimiento", info_p.get("lugar_nacimiento")); y -= 14
-    write_key_value(c, x, y, "Fecha de nacimiento", info_p.get("fecha_nacimiento")); y -= 14
-    write_key_value(c, x, y, "Género", info_p.get("genero")); y -= 14
-    write_key_value(c, x, y, "Estado civil", info_p.get("estado_civil")); y -= 14
-    write_key_value(c, x, y, "Dependientes", info_p.get("dependientes")); y -= 14
-    write_key_value(c, x, y, "Teléfono", info_p.get("telefono_personal")); y -= 14
-    write_key_value(c, x, y, "Email", info_p.get("email_personal")); y -= 14
-    write_key_value(c, x, y, "Dirección", info_p.get("direccion_personal")); y -= 20
-
-    datos_c = emp.get("datos_carrera", {})
-    write_key_value(c, x, y, "Fecha de ingreso", datos_c.get("fecha_ingreso")); y -= 14
-    write_key_value(c, x, y, "Tipo de contrato", datos_c.get("tipo_contrato")); y -= 14
-
-    info_b = emp.get("informacion_bancaria", {})
-    y -= 6
-    c.setFont("Helvetica-Bold", 11)
-    c.setFillColor(colors.HexColor("#004080"))
-    c.drawString(x, y, "Datos Bancarios")
-    y -= 10
-    c.setFont("Helvetica", 10)
-    write_key_value(c, x, y, "Banco", info_b.get("banco")); y -= 14
-    write_key_value(c, x, y, "Nº de cuenta", info_b.get("numero_cuenta")); y -= 14
-    write_key_value(c, x, y, "Tipo de cuenta", info_b.get("tipo_cuenta")); y -= 14
-    write_key_value(c, x, y, "Salario mensual (CFA)", info_b.get("salario_mensual_cfa")); y -= 14
-    write_key_value(c, x, y, "Salario anual (CFA)", info_b.get("salario_anual_cfa")); y -= 20
+    c.setFillColor(colors.black)
+    for y, text in doc_values(emp):
+        c.drawString(DOC_X + 150, y, text)
 
-    draw_footer(c, w)
     c.showPage()
     c.save()
 
@@ -183,78 +270,171 @@ def infer_missing(emp: dict):
     dc.setdefault("responsabilidades", [])
     dc.setdefault("jerarquia", f"{emp.get('departamento','')}")
 
-def main():
-    if not JSON_PATH.exists():
-        raise FileNotFoundError(f"No se encontró {JSON_PATH}")
-
-    with open(JSON_PATH, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    # Your file is either a list or has {"empleados":[...]} — handle both.
-    if isinstance(data, dict) and "empleados" in data:
-        empleados = data["empleados"]
-        root_is_obj = True
-    elif isinstance(data, list):
-        empleados = data
-        root_is_obj = False
-    else:
-        raise ValueError("Formato de JSON no reconocido (lista o { empleados: [] })")
-
-    for emp in empleados:
-        # Infer + normalize
-        infer_missing(emp)
-        ensure_doc_paths(emp)
-
-        # Regenerate PDFs with updated names/fields
-        emp_id = emp["id"]
-        out_dir = DOC_ROOT / str(emp_id)
-        ensure_dir(out_dir)
-
-        # Create/overwrite the standard set
-        pdfs = {
-            "Contrato_Actual.pdf": "Contrato de Trabajo",
-            "DIP.pdf": "Documento de Identidad Profesional",
-            "Curriculum.pdf": "Curriculum Vitae",
-            "Evaluacion_Anual.pdf": "Evaluación Anual",
-            "ID_Empleado_ELEBI.pdf": "ID de Empleado"
-        }
-        for filename, title in pdfs.items():
+def sync_documents(emp: dict, force=False, dry_run=False):
+    # Regenerates only the standard PDFs whose fingerprint changed (or that are
+    # missing). Returns (rebuilt, skipped, paths written), .fingerprints.json included.
+    out_dir = DOC_ROOT / str(emp["id"])
+    fingerprints = load_fingerprints(out_dir)
+    rebuilt = skipped = 0
+    written = []
+    try:
+        for filename, title in STANDARD_DOCS.items():
+            fp = doc_fingerprint(emp, title)
+            if not force and fingerprints.get(filename) == fp and (out_dir / filename).exists():
+                skipped += 1
+                continue
+            rebuilt += 1
+            if dry_run:
+                continue
+            ensure_dir(out_dir)
             gen_pdf(emp, title, out_dir / filename)
-
-                # --- AUTO-FIX FOTO PATHS ---
+            fingerprints[filename] = fp
+            written.append(out_dir / filename)
+    finally:
+        # Keep what was written even if a later document of this employee failed
+        if written:
+            save_fingerprints(out_dir, fingerprints)
+            written.append(out_dir / FINGERPRINTS_FILE)
+    return rebuilt, skipped, written
+
+def _sync_job(job):
+    # Runs in a pool worker (or inline with --jobs 1). Never raises: failures are
+    # returned so one bad employee does not abort the batch.
+    emp, force, dry_run = job
+    try:
+        rebuilt, skipped, written = sync_documents(emp, force=force, dry_run=dry_run)
+        return emp.get("id"), rebuilt, skipped, written, None
+    except Exception as exc:
+        detail = traceback.format_exception_only(type(exc), exc)[-1].strip()
+        return emp.get("id"), 0, 0, [], detail
+
+def sync_all_documents(empleados, jobs=1, force=False, dry_run=False):
+    # Yields _sync_job() results in employee order, whatever the job count.
+    work = [(emp, force, dry_run) for emp in empleados]
+    if jobs <= 1:
+        yield from map(_sync_job, work)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        chunksize = max(1, len(work) // (jobs * 4))
+        yield from pool.map(_sync_job, work, chunksize=chunksize)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sincroniza datos_empleados.json y regenera los documentos PDF.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="No escribe nada (tampoco el informe de reports/); sólo informa cuántos "
+                             "documentos se regenerarían")
+    parser.add_argument("--force", action="store_true",
+                        help="Regenera todos los documentos aunque no hayan cambiado")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Procesos en paralelo para generar los documentos (por defecto: 1)")
+    instrumentation.add_profile_argument(parser)
+    return parser.parse_args(argv)
+
+def fix_photo_paths(empleados):
     fotos_dir = PUBLIC / "fotos_empleados"
-    if fotos_dir.exists():
-        available_photos = {f.name.lower(): f for f in fotos_dir.iterdir() if f.is_file()}
-        fixed, missing = [], []
-        for emp in empleados:
-            nombre = (emp.get("nombres","") + " " + emp.get("apellidos","")).lower().replace("  "," ").strip()
-            match = None
-            for fn in available_photos:
-                if all(part in fn for part in nombre.split()):
-                    match = available_photos[fn]
-                    break
-            if match:
-                emp["foto"] = f"public/fotos_empleados/{match.name}"
-                fixed.append(match.name)
-            else:
-                missing.append(nombre)
-        print(f"📸 Fotos corregidas: {len(fixed)}  |  Faltantes: {len(missing)}")
-        if missing:
-            print("⚠️ No se encontraron fotos para:", ", ".join(missing))
-    else:
+    if not fotos_dir.exists():
         print("⚠️ No se encontró el directorio de fotos_empleados, se omite verificación.")
-
-
-    # Write JSON back
-    if root_is_obj:
-        out_json = {"empleados": empleados}
+        return
+    photos = PhotoIndex.from_dir(fotos_dir)
+    fixed, missing, ambiguous = [], [], []
+    for emp in empleados:
+        nombre = (emp.get("nombres","") + " " + emp.get("apellidos","")).strip()
+        match = photos.match(nombre)
+        if match.path:
+            emp["foto"] = f"public/fotos_empleados/{match.path.name}"
+            fixed.append(match.path.name)
+        elif match.candidates:
+            # Keep whatever foto the employee already had
+            ambiguous.append(f"{nombre} ({' / '.join(p.name for p in match.candidates)})")
+        else:
+            missing.append(nombre)
+    print(f"📸 Fotos corregidas: {len(fixed)}  |  Faltantes: {len(missing)}  |  Ambiguas: {len(ambiguous)}")
+    if missing:
+        print("⚠️ No se encontraron fotos para:", ", ".join(missing))
+    if ambiguous:
+        print("⚠️ Varias fotos posibles (no se cambia la actual):", "; ".join(ambiguous))
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not JSON_PATH.exists():
+        raise FileNotFoundError(f"No se encontró {JSON_PATH}")
+    # A dry run writes nothing, not even its report
+    reports_dir = None if args.dry_run else instrumentation.REPORTS_DIR
+    with instrumentation.Run("sync_employees_and_docs", argv, profile=args.profile, reports_dir=reports_dir) as run:
+        sync(args, run)
+
+def sync(args, run):
+    with run.stage("lectura"):
+        # Your file is either a list or has {"empleados":[...]} — data_access handles both.
+        since = employee_journal.current_seq(JSON_PATH)   # edits the app journals after this are kept
+        empleados, root_is_obj = data_access.load_empleados(JSON_PATH)
+        before, _ = data_access.load_empleados(JSON_PATH)   # untouched copy to diff against
+
+    # Infer + normalize (cheap, and it has to change the records we write back).
+    # Each employee is normalized on a copy that replaces the record only if
+    # every step worked: one that fails keeps its fields as loaded and its
+    # documents are skipped; the rest go on.
+    failures = []
+    ready = []
+    run.count("empleados", len(empleados))
+    with run.stage("normalización"):
+        for i, emp in enumerate(empleados):
+            try:
+                normalized = copy.deepcopy(emp)
+                infer_missing(normalized)
+                ensure_doc_paths(normalized)
+                empleados[i] = normalized
+                ready.append(normalized)
+            except Exception as exc:
+                failures.append((emp.get("id"), traceback.format_exception_only(type(exc), exc)[-1].strip()))
+
+    # Regenerate PDFs whose fields changed
+    total_rebuilt = total_skipped = 0
+    with run.stage("documentos"):
+        for emp_id, rebuilt, skipped, written, error in sync_all_documents(
+                ready, jobs=args.jobs, force=args.force, dry_run=args.dry_run):
+            total_rebuilt += rebuilt
+            total_skipped += skipped
+            run.wrote(*written)
+            if error:
+                failures.append((emp_id, error))
+
+    # --- AUTO-FIX FOTO PATHS ---
+    with run.stage("fotos"):
+        fix_photo_paths(empleados)
+
+    # Thumbnails of the linked photos, recorded as "foto_derivados"
+    with run.stage("derivados"):
+        derivatives = photo_derivatives.update("empleados", empleados, jobs=args.jobs, dry_run=args.dry_run)
+    run.count("fotos_codificadas", derivatives["codificadas"])
+    print(photo_derivatives.report("empleados", derivatives))
+
+    if args.dry_run:
+        print(f"🔎 Dry-run: {total_rebuilt} documentos se regenerarían, {total_skipped} sin cambios. No se ha escrito nada.")
     else:
-        out_json = empleados
-
-    with open(JSON_PATH, "w", encoding="utf-8") as f:
-        json.dump(out_json, f, ensure_ascii=False, indent=2)
-
-    print("✅ Sincronizado: nombres, rutas de PDFs y generación de documentos actualizados.")
+        # Only what changed goes to the journal, once every employee has been processed
+        out_json = data_access.dump_empleados(empleados, root_is_obj)
+        with run.stage("escritura"):
+            journal = employee_journal.record(JSON_PATH, out_json, before, empleados, since=since)
+        run.wrote(*journal["written"])
+        run.count("cambios_diario", journal["entries"])
+        print(f"📄 Documentos regenerados: {total_rebuilt}  |  sin cambios: {total_skipped}")
+        if journal["compacted"]:
+            print(f"🧾 {JSON_PATH.name} reescrito completo (secuencia {journal['seq']})")
+        elif journal["entries"]:
+            print(f"🧾 Diario: {journal['entries']} empleado(s) con cambios (secuencia {journal['seq']})")
+        else:
+            print(f"🧾 Sin cambios en {JSON_PATH.name}: no se escribe nada")
+
+    print(run.timings_line())
+    run.count("fallos", len(failures))
+    if failures:
+        print(f"❌ Fallos en {len(failures)} empleado(s):")
+        for emp_id, error in failures:
+            print(f"   - {emp_id}: {error}")
+        sys.exit(1)
+    if not args.dry_run:
+        print("✅ Sincronizado: nombres, rutas de PDFs y generación de documentos actualizados.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,18 @@
+# textnorm.py — accent/case folding shared by the name and label matchers
+#
+# photo_index.py (photo filenames), payroll_attendance.py (attendance keys) and
+# attendance_query.py (month, weekday and category names) all compare text
+# ignoring accents and case: "Mañe Nchama" == "mane nchama", "miércoles" ==
+# "miercoles".
+
+import re, unicodedata
+
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+
+def fold(text: str) -> str:
+    # "Mañe Nchama" → "mane nchama"
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+def tokenize(text: str):
+    return [t for t in _TOKEN_SPLIT.split(fold(text)) if t]
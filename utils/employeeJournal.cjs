@@ -0,0 +1,145 @@
+// Appends employee edits to datos_empleados.journal.jsonl (see employee_journal.py)
+// instead of rewriting datos_empleados.json: the app's readers pick up one small
+// entry, and the Python scripts fold the journal back into the snapshot.
+const crypto = require("crypto");
+const fs = require("fs");
+const path = require("path");
+
+const VERSION = 1;
+const LOCK_TIMEOUT_MS = 10000; // wait for another writer
+const LOCK_STALE_MS = 60000; // a lock this old was left behind by a writer that crashed
+
+const journalPath = (snapshotPath) => {
+  const { dir, name } = path.parse(snapshotPath);
+  return path.join(dir, `${name}.journal.jsonl`);
+};
+
+const lockPath = (snapshotPath) => {
+  const { dir, name } = path.parse(snapshotPath);
+  return path.join(dir, `${name}.journal.lock`);
+};
+
+const sleep = (ms) => Atomics.wait(new Int32Array(new SharedArrayBuffer(4)), 0, 0, ms);
+
+/** Runs fn holding the journal lock shared with employee_journal.locked(): one writer at a time. */
+function withLock(snapshotPath, fn) {
+  const file = lockPath(snapshotPath);
+  const deadline = Date.now() + LOCK_TIMEOUT_MS;
+  for (;;) {
+    try {
+      fs.writeFileSync(file, String(process.pid), { flag: "wx" });
+      break;
+    } catch (err) {
+      if (err.code !== "EEXIST") throw err;
+    }
+    try {
+      if (Date.now() - fs.statSync(file).mtimeMs > LOCK_STALE_MS) {
+        fs.unlinkSync(file);
+        continue;
+      }
+    } catch (err) {
+      if (err.code === "ENOENT") continue;
+      throw err;
+    }
+    if (Date.now() > deadline) throw new Error(`${file} lleva ${LOCK_TIMEOUT_MS / 1000}s bloqueado por otro proceso`);
+    sleep(50);
+  }
+  try {
+    return fn();
+  } finally {
+    fs.rmSync(file, { force: true });
+  }
+}
+
+const recordsOf = (data) => (Array.isArray(data) ? data : Array.isArray(data?.empleados) ? data.empleados : []);
+
+function readJournal(file) {
+  if (!fs.existsSync(file)) return { header: null, entries: [] };
+  const lines = fs.readFileSync(file, "utf8").split("\n");
+  lines.pop(); // only complete lines: a torn append has no trailing "\n"
+  let header = null;
+  const entries = [];
+  for (const line of lines) {
+    let obj;
+    try {
+      obj = JSON.parse(line);
+    } catch {
+      break;
+    }
+    if (header === null) {
+      if (obj?.journal !== VERSION) throw new Error(`${file}: versión de diario desconocida`);
+      header = obj;
+    } else {
+      entries.push(obj);
+    }
+  }
+  return { header, entries };
+}
+
+const lastSeq = ({ header, entries }) =>
+  entries.length ? entries[entries.length - 1].seq : header ? header.base : 0;
+
+function snapshotState(snapshotPath) {
+  const st = fs.statSync(snapshotPath, { bigint: true });
+  const sha256 = crypto.createHash("sha256").update(fs.readFileSync(snapshotPath)).digest("hex");
+  // mtime_ns is written as a JSON integer; Number() would round it
+  return `{"size":${st.size},"mtime_ns":${st.mtimeNs},"sha256":"${sha256}"}`;
+}
+
+/** Snapshot with the journal entries after header.base applied, as the Python readers see it. */
+function loadEmployees(snapshotPath) {
+  const data = JSON.parse(fs.readFileSync(snapshotPath, "utf8"));
+  const journal = readJournal(journalPath(snapshotPath));
+  const byId = new Map(recordsOf(data).map((emp) => [String(emp?.id), emp]));
+  const base = journal.header ? journal.header.base : 0;
+  for (const entry of journal.entries) {
+    if (entry.seq <= base) continue;
+    const emp = byId.get(String(entry.id));
+    if (!emp) continue;
+    Object.assign(emp, entry.set || {});
+    for (const name of entry.unset || []) delete emp[name];
+  }
+  return { data, journal };
+}
+
+/**
+ * Applies `merge(current, updates)` to one employee and journals the fields that
+ * changed. Returns the updated record, or null if there is no such employee.
+ */
+function updateEmployee(snapshotPath, employeeId, updates, merge) {
+  return withLock(snapshotPath, () => journalUpdate(snapshotPath, employeeId, updates, merge));
+}
+
+function journalUpdate(snapshotPath, employeeId, updates, merge) {
+  const { data, journal } = loadEmployees(snapshotPath);
+  const current = recordsOf(data).find((emp) => String(emp?.id) === String(employeeId));
+  if (!current) return null;
+  const updated = merge(current, updates);
+
+  const set = {};
+  for (const [key, value] of Object.entries(updated)) {
+    if (JSON.stringify(current[key]) !== JSON.stringify(value)) set[key] = value;
+  }
+  const unset = Object.keys(current).filter((key) => !(key in updated));
+  if (!Object.keys(set).length && !unset.length) return updated;
+
+  const file = journalPath(snapshotPath);
+  const seq = lastSeq(journal);
+  const entry = { seq: seq + 1, id: current.id, set };
+  if (unset.length) entry.unset = unset;
+  if (journal.header === null) {
+    fs.writeFileSync(file, `{"journal":${VERSION},"base":${seq},"snapshot":${snapshotState(snapshotPath)}}\n`, "utf8");
+  } else {
+    // Drop a torn line left by an interrupted append
+    const text = fs.readFileSync(file, "utf8");
+    if (!text.endsWith("\n")) fs.truncateSync(file, Buffer.byteLength(text.slice(0, text.lastIndexOf("\n") + 1)));
+  }
+  fs.appendFileSync(file, `${JSON.stringify(entry)}\n`, "utf8");
+  return updated;
+}
+
+module.exports = {
+  journalPath,
+  loadEmployees,
+  updateEmployee,
+};
@@ -7,6 +7,7 @@ import { createRequire } from "node:module";
 
 const require = createRequire(import.meta.url);
 const { mergeEmployeeRecord } = require("./utils/mergeEmployeeRecord.cjs");
+const { updateEmployee } = require("./utils/employeeJournal.cjs");
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
@@ -116,20 +117,15 @@ const apiPlugin = () => {
             throw new Error("datos_empleados.json no existe");
           }
 
-          const list = JSON.parse(fs.readFileSync(EMPLOYEE_DATA_PATH, "utf8"));
-          const index = list.findIndex((emp: any) => String(emp.id) === String(employeeId));
-          if (index === -1) {
+          // Journaled, not rewritten: see utils/employeeJournal.cjs
+          const updatedRecord = updateEmployee(EMPLOYEE_DATA_PATH, employeeId, updates, mergeEmployeeRecord);
+          if (!updatedRecord) {
             res.statusCode = 404;
             res.setHeader("Content-Type", "application/json");
             res.end(JSON.stringify({ ok: false, message: "Empleado no encontrado" }));
             return;
           }
 
-          const updatedRecord = mergeEmployeeRecord(list[index], updates);
-          list[index] = updatedRecord;
-
-          fs.writeFileSync(EMPLOYEE_DATA_PATH, JSON.stringify(list, null, 2), "utf8");
-
           res.statusCode = 200;
           res.setHeader("Content-Type", "application/json");
           res.end(JSON.stringify({ ok: true, empleado: updatedRecord }));